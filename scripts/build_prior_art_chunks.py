@@ -1,12 +1,38 @@
 from __future__ import annotations
 
-import json
+import argparse
 from pathlib import Path
 
-from ptab_dataset.chunking import chunk_repo_patent_txt
+from ptab_dataset.chunk_build import build_chunk_jsonl
+from ptab_dataset.tokenization import load_tokenizer
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Chunk prior-art TXT files into prior_art_chunks.jsonl")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="re-chunk only new/changed files (tracked in prior_art_chunks.jsonl.manifest.json)",
+    )
+    parser.add_argument("--max-chars", type=int, default=1400)
+    parser.add_argument("--overlap", type=int, default=200)
+    parser.add_argument(
+        "--tokenizer",
+        default=None,
+        help="size chunks in tokens instead of chars: 'simple' (built-in whitespace/CJK) or 'hf:<name-or-path>'",
+    )
+    parser.add_argument("--max-tokens", type=int, default=512)
+    parser.add_argument("--overlap-tokens", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=1, help="chunking processes (default: 1, in-process)")
+    parser.add_argument("--chunksize", type=int, default=8, help="files per task sent to a worker")
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        help="also write prior_art_chunks.parquet (zstd, text in its own column; requires pyarrow)",
+    )
+    parser.add_argument("--row-group-size", type=int, default=4096, help="rows per Parquet row group")
+    args = parser.parse_args()
+
     repo_root = Path(__file__).resolve().parents[1]
     prior_art_dir = repo_root / "data" / "processed" / "fulltext" / "prior_arts"
     out_path = repo_root / "data" / "processed" / "fulltext" / "prior_art_chunks.jsonl"
@@ -15,30 +41,31 @@ def main() -> None:
     if not paths:
         raise SystemExit(f"No .txt files found in: {prior_art_dir}")
 
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-
-    n_docs = 0
-    n_chunks = 0
-    with out_path.open("w", encoding="utf-8") as f:
-        for p in paths:
-            chunks = chunk_repo_patent_txt(p)
-            if not chunks:
-                continue
-            n_docs += 1
-            for c in chunks:
-                rec = {
-                    "doc_id": c.doc_id,
-                    "section": c.section,
-                    "chunk_index": c.chunk_index,
-                    "text": c.text,
-                    "source_path": c.source_path,
-                }
-                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-                n_chunks += 1
+    stats = build_chunk_jsonl(
+        paths,
+        out_path,
+        max_chars=args.max_chars,
+        overlap=args.overlap,
+        incremental=args.incremental,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        tokenizer=load_tokenizer(args.tokenizer) if args.tokenizer else None,
+        max_tokens=args.max_tokens,
+        overlap_tokens=args.overlap_tokens,
+    )
 
     print(f"Wrote: {out_path}")
-    print(f"Docs: {n_docs}")
-    print(f"Chunks: {n_chunks}")
+    print(f"Docs: {stats.docs}")
+    print(f"Chunks: {stats.chunks}")
+    if args.incremental:
+        print(f"Re-chunked: {stats.rechunked}, reused: {stats.reused}, removed: {stats.removed}")
+    if args.parquet:
+        # pyarrow (and numpy) only load when Parquet output is requested.
+        from ptab_dataset.columnar import chunk_schema, jsonl_to_parquet
+
+        parquet_path = out_path.with_suffix(".parquet")
+        jsonl_to_parquet(out_path, parquet_path, schema=chunk_schema(), row_group_size=args.row_group_size)
+        print(f"Wrote: {parquet_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from ptab_dataset.embeddings import EmbeddingStore, load_encoder
+
+
+def main() -> None:
+    repo_root = Path(__file__).resolve().parents[1]
+    default_chunks = repo_root / "data" / "processed" / "fulltext" / "prior_art_chunks.jsonl"
+    default_store = repo_root / "data" / "processed" / "fulltext" / "prior_art_embeddings"
+
+    parser = argparse.ArgumentParser(description="Embed prior_art_chunks.jsonl and run vector search")
+    parser.add_argument("query", nargs="?", help="search query (omit with --build to only update the store)")
+    parser.add_argument("--build", action="store_true", help="encode new/changed chunks from --chunks first")
+    parser.add_argument("--chunks", type=Path, default=default_chunks)
+    parser.add_argument("--store", type=Path, default=default_store)
+    parser.add_argument(
+        "--encoder",
+        default="hashing:512",
+        help="'hashing[:<dim>]' (built-in, offline) or 'st:<name-or-path>' (local sentence-transformers model)",
+    )
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--dtype", choices=["float16", "float32"], default="float16")
+    parser.add_argument("--compact", action="store_true", help="drop rows no chunk refers to any more")
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    encoder = load_encoder(args.encoder)
+    store = EmbeddingStore(args.store)
+    if args.build:
+        t0 = time.perf_counter()
+        with args.chunks.open("r", encoding="utf-8") as f:
+            chunks = [json.loads(line) for line in f if line.strip()]
+        stats = store.update(chunks, encoder, batch_size=args.batch_size, dtype=args.dtype)
+        print(
+            f"Chunks: {stats.chunks}, encoded: {stats.encoded}, reused: {stats.reused} "
+            f"-> {args.store} ({time.perf_counter() - t0:.1f}s)"
+        )
+    if args.compact:
+        print(f"Dropped rows: {store.compact()}")
+    if not args.query:
+        return
+
+    t0 = time.perf_counter()
+    hits = store.search_text([args.query], encoder, args.k)[0]
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+    for rank, (cid, score) in enumerate(hits, start=1):
+        print(f"{rank:2d}. {score:6.3f}  {cid}")
+    print(f"{len(hits)} hits in {elapsed_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from pathlib import Path
+
+from ptab_dataset.benchmark import (
+    SCALES,
+    STAGES,
+    compare,
+    format_table,
+    load_baseline,
+    parse_stage_list,
+    run_benchmarks,
+    save_baseline,
+)
+
+
+def main() -> None:
+    repo_root = Path(__file__).resolve().parents[1]
+
+    parser = argparse.ArgumentParser(
+        description="Offline benchmarks (synthetic corpus + local stand-in HTTP servers) with baseline comparison"
+    )
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (the fastest one is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", default=None, help=f"comma-separated subset of: {','.join(STAGES)}")
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=None,
+        help="baseline JSON (default: benchmarks/baseline_<scale>.json in the repo root)",
+    )
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="fail (exit 1) when there is no baseline to compare against or an import is over its time budget",
+    )
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed throughput drop (0.2 = 20%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.2, help="allowed peak-memory growth")
+    parser.add_argument("--output", type=Path, default=None, help="also write this run's results as JSON")
+    args = parser.parse_args()
+
+    # Keep the clients' per-request INFO logs out of the timings and the table.
+    logging.basicConfig(level=logging.WARNING)
+
+    baseline_path = args.baseline or repo_root / "benchmarks" / f"baseline_{args.scale}.json"
+    result = run_benchmarks(scale=args.scale, repeat=args.repeat, seed=args.seed, stages=parse_stage_list(args.stages))
+    baseline = load_baseline(baseline_path) if baseline_path.exists() and not args.save_baseline else None
+
+    print(format_table(result, baseline))
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote: {args.output}")
+
+    # Import budgets are wall-clock limits, so they only fail the run under --check; heavy imports always do.
+    over_budget = result["import_budget_violations"]
+    if over_budget:
+        print("Import time over budget:")
+        for violation in over_budget:
+            print(f"  {violation}")
+    if result["import_violations"]:
+        print("Heavy dependencies loaded at import time:")
+        for violation in result["import_violations"]:
+            print(f"  {violation}")
+    if result["import_violations"] or (over_budget and args.check):
+        raise SystemExit(1)
+    if args.save_baseline:
+        print(f"Saved baseline: {save_baseline(result, baseline_path)}")
+        return
+    if baseline is None:
+        print(f"No baseline at {baseline_path} (run with --save-baseline to create one)")
+        if args.check:
+            raise SystemExit(1)
+        return
+
+    regressions = compare(result, baseline, tolerance=args.tolerance, memory_tolerance=args.memory_tolerance)
+    if regressions:
+        print(f"Regressions vs {baseline_path}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        raise SystemExit(1)
+    print(f"No regressions vs {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
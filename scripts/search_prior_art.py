@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+from ptab_dataset.bm25 import BM25Index, build_bm25_index_from_jsonl
+
+
+def main() -> None:
+    repo_root = Path(__file__).resolve().parents[1]
+    default_chunks = repo_root / "data" / "processed" / "fulltext" / "prior_art_chunks.jsonl"
+    default_index = repo_root / "data" / "processed" / "fulltext" / "prior_art_bm25"
+
+    parser = argparse.ArgumentParser(description="BM25 search over prior_art_chunks.jsonl")
+    parser.add_argument("query", nargs="?", help="search query (omit with --build to only build the index)")
+    parser.add_argument("--build", action="store_true", help="(re)build the index from --chunks first")
+    parser.add_argument("--chunks", type=Path, default=default_chunks)
+    parser.add_argument("--index", type=Path, default=default_index)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--doc-id", action="append", help="restrict to these doc_ids (repeatable)")
+    parser.add_argument(
+        "--section",
+        action="append",
+        help="restrict to these sections (repeatable; 'DESCRIPTION' also matches 'DESCRIPTION::*')",
+    )
+    args = parser.parse_args()
+
+    if args.build:
+        t0 = time.perf_counter()
+        n = build_bm25_index_from_jsonl(args.chunks, args.index)
+        print(f"Indexed {n} chunks -> {args.index} ({time.perf_counter() - t0:.1f}s)")
+    if not args.query:
+        return
+
+    with BM25Index(args.index) as index:
+        t0 = time.perf_counter()
+        hits = index.search(args.query, args.k, doc_ids=args.doc_id, sections=args.section)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        for rank, (hit, record) in enumerate(zip(hits, index.records(hits)), start=1):
+            snippet = " ".join(str(record.get("text", "")).split())[:160]
+            print(f"{rank:2d}. {hit.score:7.3f}  {hit.doc_id}  {hit.section}#{hit.chunk_index}  {snippet}")
+        print(f"{len(hits)} hits in {elapsed_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ __all__ = [
     "api",
     "patentsview",
     "downloader",
+    "async_http",
     "parser",
     "storage",
     "pipeline",
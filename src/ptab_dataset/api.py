@@ -2,19 +2,34 @@ from __future__ import annotations
 
 import logging
 import json
-from typing import Any, Dict, Iterable, Optional
+import math
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import requests
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from .config import Settings
+from .http_cache import ResponseCache, shared_response_cache
+from .metrics import count_retry
+from .ratelimit import RateLimiter, shared_rate_limiter, wait_retry_after
 
 log = logging.getLogger(__name__)
 
 
 class PTABClient:
-    def __init__(self, settings: Settings) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
         self.settings = settings
+        self.limiter = limiter or shared_rate_limiter(settings)
+        self.cache = cache or shared_response_cache(settings)
         self.session = requests.Session()
         self.session.headers.update(
             {
@@ -24,15 +39,32 @@ class PTABClient:
             }
         )
 
-    @retry(wait=wait_exponential(multiplier=1, min=1, max=20), stop=stop_after_attempt(5))
     def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         url = f"{self.settings.base_url}/{path.lstrip('/')}"
-        resp = self.session.get(
-            url,
-            params=params,
-            timeout=self.settings.timeout,
-            verify=self.settings.verify_tls,
-        )
+        # 캐시 조회는 재시도 밖에서 합니다(replay-only 모드의 CacheMiss는 재시도 대상이 아님).
+        if self.cache is not None:
+            hit, body = self.cache.get("GET", url, params)
+            if hit:
+                return body
+        body = self._request(url, params)
+        if self.cache is not None:
+            self.cache.put("GET", url, params, body)
+        return body
+
+    @retry(
+        wait=wait_retry_after(wait_exponential(multiplier=1, min=1, max=20)),
+        stop=stop_after_attempt(5),
+        before_sleep=count_retry("ptab_api"),
+    )
+    def _request(self, url: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        with self.limiter.request(url, op="ptab_api") as permit:
+            resp = self.session.get(
+                url,
+                params=params,
+                timeout=self.settings.timeout,
+                verify=self.settings.verify_tls,
+            )
+            permit.observe(resp.status_code, resp.headers.get("Retry-After"))
         if resp.status_code >= 400:
             log.warning("API 오류 status=%s url=%s body=%s", resp.status_code, url, resp.text[:500])
         resp.raise_for_status()
@@ -47,27 +79,177 @@ class PTABClient:
         rows: int = 100,
         extra_filters: Optional[Iterable[Dict[str, str]]] = None,
     ) -> Dict[str, Any]:
-        filters = [
-            {"fieldName": "decisionTypeCategory", "fieldValue": "Final Written Decision"},
-            {"fieldName": "trialStatus", "fieldValue": "Final Written Decision"},
-            {"fieldName": "trialStatus", "fieldValue": "Terminated"},
-            {"fieldName": "subdecisionTypeCategory", "fieldValue": "Unpatentable"},
-            {"fieldName": "subdecisionTypeCategory", "fieldValue": "Claims Unpatentable"},
-            {"fieldName": "prosecutionStatus", "fieldValue": "Certificate Issued"},
-        ]
-        if since:
-            filters.append({"fieldName": "decisionDate", "fieldValue": f"[{since} TO *]"})
-        if until:
-            filters.append({"fieldName": "decisionDate", "fieldValue": f"[* TO {until}]"})
-        if extra_filters:
-            filters.extend(extra_filters)
-
-        params = {
-            # requests는 list/dict를 쿼리스트링으로 보낼 때 반복 파라미터로 인코딩할 수 있어
-            # API가 기대하는 JSON 문자열 형식으로 명시적으로 직렬화합니다.
-            "filters": json.dumps(filters, ensure_ascii=False),
-            "page": page,
-            "rows": rows,
-        }
+        params = search_decisions_params(since=since, until=until, page=page, rows=rows, extra_filters=extra_filters)
         return self.get("search-decisions", params=params)
 
+
+def search_decisions_params(
+    *,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    page: int = 1,
+    rows: int = 100,
+    extra_filters: Optional[Iterable[Dict[str, str]]] = None,
+) -> Dict[str, Any]:
+    """`search-decisions` 쿼리 파라미터를 만듭니다(동기/비동기 클라이언트 공용)."""
+    filters = [
+        {"fieldName": "decisionTypeCategory", "fieldValue": "Final Written Decision"},
+        {"fieldName": "trialStatus", "fieldValue": "Final Written Decision"},
+        {"fieldName": "trialStatus", "fieldValue": "Terminated"},
+        {"fieldName": "subdecisionTypeCategory", "fieldValue": "Unpatentable"},
+        {"fieldName": "subdecisionTypeCategory", "fieldValue": "Claims Unpatentable"},
+        {"fieldName": "prosecutionStatus", "fieldValue": "Certificate Issued"},
+    ]
+    if since:
+        filters.append({"fieldName": "decisionDate", "fieldValue": f"[{since} TO *]"})
+    if until:
+        filters.append({"fieldName": "decisionDate", "fieldValue": f"[* TO {until}]"})
+    if extra_filters:
+        filters.extend(extra_filters)
+
+    return {
+        # requests는 list/dict를 쿼리스트링으로 보낼 때 반복 파라미터로 인코딩할 수 있어
+        # API가 기대하는 JSON 문자열 형식으로 명시적으로 직렬화합니다.
+        "filters": json.dumps(filters, ensure_ascii=False),
+        "page": page,
+        "rows": rows,
+    }
+
+
+# 응답에서 전체 건수를 담는 필드 이름(버전/엔드포인트마다 달라 후보를 순서대로 확인합니다).
+TOTAL_COUNT_KEYS = ("count", "totalCount", "recordTotalQuantity", "total")
+
+
+def total_hits(resp: Dict[str, Any]) -> Optional[int]:
+    for key in TOTAL_COUNT_KEYS:
+        value = resp.get(key)
+        if isinstance(value, (int, float)) or (isinstance(value, str) and value.isdigit()):
+            return int(value)
+    return None
+
+
+def iter_decision_pages(
+    client: PTABClient,
+    *,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    rows: int = 100,
+    start_page: int = 1,
+    max_pages: Optional[int] = None,
+    workers: int = 4,
+    extra_filters: Optional[Iterable[Dict[str, str]]] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    search_decisions 결과를 (page, results)로 페이지 순서대로 내보내는 제너레이터.
+
+    첫 페이지 응답의 전체 건수로 마지막 페이지를 계산한 뒤, 나머지 페이지는 최대 workers개씩
+    동시에 요청합니다. 전체 건수가 없으면 빈 페이지가 나올 때까지 같은 방식으로 미리 요청합니다.
+    """
+    extra_filters = list(extra_filters or [])
+
+    def fetch(page: int) -> Dict[str, Any]:
+        return client.search_decisions(since=since, until=until, page=page, rows=rows, extra_filters=extra_filters)
+
+    first = fetch(start_page)
+    docs = first.get("results", [])
+    if not docs:
+        log.info("더 이상 결과가 없습니다. page=%s", start_page)
+        return
+
+    end_page = start_page + max_pages - 1 if max_pages is not None else None
+    total = total_hits(first)
+    if total is not None:
+        last_page = max(1, math.ceil(total / rows))
+        end_page = last_page if end_page is None else min(end_page, last_page)
+        log.info("전체 %s건, 페이지 %s~%s 조회", total, start_page, end_page)
+
+    yield start_page, docs
+
+    own_executor = executor is None
+    ex = executor or ThreadPoolExecutor(max_workers=max(1, workers))
+    pending: Deque[Tuple[int, Future]] = deque()
+    next_page = start_page + 1
+    try:
+        while True:
+            while (end_page is None or next_page <= end_page) and len(pending) < max(1, workers):
+                pending.append((next_page, ex.submit(fetch, next_page)))
+                next_page += 1
+            if not pending:
+                return
+            page, fut = pending.popleft()
+            docs = fut.result().get("results", [])
+            if not docs:
+                log.info("더 이상 결과가 없습니다. page=%s", page)
+                return
+            yield page, docs
+    finally:
+        for _, fut in pending:
+            fut.cancel()
+        if own_executor:
+            ex.shutdown(wait=True)
+
+
+def date_shards(since: str, until: Optional[str], days: int) -> List[Tuple[str, str]]:
+    """
+    [since, until] 기간을 days일 단위의 겹치지 않는 구간(양 끝 포함)으로 나눕니다. until이 없으면 오늘까지.
+    """
+    if days <= 0:
+        raise ValueError("days는 1 이상이어야 합니다.")
+    start = date.fromisoformat(since)
+    end = date.fromisoformat(until) if until else date.today()
+    shards: List[Tuple[str, str]] = []
+    while start <= end:
+        shard_end = min(end, start + timedelta(days=days - 1))
+        shards.append((start.isoformat(), shard_end.isoformat()))
+        start = shard_end + timedelta(days=1)
+    return shards
+
+
+def iter_sharded_decision_pages(
+    client: PTABClient,
+    *,
+    since: str,
+    until: Optional[str] = None,
+    shard_days: int = 30,
+    rows: int = 100,
+    workers: int = 4,
+    extra_filters: Optional[Iterable[Dict[str, str]]] = None,
+) -> Iterator[Tuple[Tuple[str, str], int, List[Dict[str, Any]]]]:
+    """
+    기간을 date_shards로 나눠 ((shard_since, shard_until), page, results)를 내보냅니다.
+
+    모든 구간의 첫 페이지를 먼저 동시에 요청해 두고, 구간 순서 → 페이지 순서로 결과를 냅니다.
+    페이지 요청은 하나의 스레드 풀(workers)을 공유하므로 구간 수와 관계없이 동시 요청 수가 제한됩니다.
+    """
+    extra_filters = list(extra_filters or [])
+    shards = date_shards(since, until, shard_days)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        firsts = [
+            ex.submit(
+                client.search_decisions, since=s, until=u, page=1, rows=rows, extra_filters=extra_filters
+            )
+            for s, u in shards
+        ]
+        for (s, u), first in zip(shards, firsts):
+            resp = first.result()
+            docs = resp.get("results", [])
+            if not docs:
+                continue
+            yield (s, u), 1, docs
+            total = total_hits(resp)
+            if total is not None and total <= rows:
+                continue
+            # 첫 페이지는 이미 받았으므로 2페이지부터 이어서 같은 풀로 조회합니다.
+            for page, docs in iter_decision_pages(
+                client,
+                since=s,
+                until=u,
+                rows=rows,
+                start_page=2,
+                max_pages=None if total is None else math.ceil(total / rows) - 1,
+                workers=workers,
+                extra_filters=extra_filters,
+                executor=ex,
+            ):
+                yield (s, u), page, docs
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from tenacity import retry, stop_after_attempt, wait_exponential
+
+from .api import search_decisions_params
+from .config import Settings
+from .downloader import DownloadIndex, _conditional_headers
+from .http_cache import CacheMiss, shared_response_cache
+from .metrics import METRICS, count_retry
+from .ratelimit import RateLimiter, shared_rate_limiter, wait_retry_after
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - 선택 의존성
+    aiohttp = None
+
+log = logging.getLogger(__name__)
+
+
+class AsyncHTTP:
+    """
+    여러 비동기 클라이언트가 함께 쓰는 연결 풀(aiohttp) + 전역 동시 요청 상한.
+
+    - 호스트별 연결 수: Settings.async_limit_per_host
+    - 전체 연결 수: Settings.async_max_connections
+    - keep-alive 유지 시간: Settings.async_keepalive
+    - 전체 in-flight 요청 상한: Settings.async_max_in_flight
+    - 호스트별 속도/적응형 동시성: RateLimiter(동기 클라이언트와 같은 공유 인스턴스가 기본값)
+    - JSON 응답 캐시: Settings.http_cache / offline이 켜져 있으면 동기 클라이언트와 같은 디스크 캐시 사용
+
+    `async with AsyncHTTP(settings) as http:` 형태로 열고, 같은 http를 각 클라이언트 생성자에 넘깁니다.
+    """
+
+    def __init__(self, settings: Settings, *, limiter: Optional[RateLimiter] = None) -> None:
+        if aiohttp is None:
+            raise ImportError("비동기 모드에는 aiohttp가 필요합니다: pip install 'ptab-dataset[async]'")
+        self.settings = settings
+        self.limiter = limiter or shared_rate_limiter(settings)
+        self.cache = shared_response_cache(settings)
+        self.session: Optional["aiohttp.ClientSession"] = None
+        self.in_flight = asyncio.Semaphore(settings.async_max_in_flight)
+
+    async def __aenter__(self) -> "AsyncHTTP":
+        connector = aiohttp.TCPConnector(
+            limit=self.settings.async_max_connections,
+            limit_per_host=self.settings.async_limit_per_host,
+            keepalive_timeout=self.settings.async_keepalive,
+            ssl=None if self.settings.verify_tls else False,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(
+                total=None, sock_connect=self.settings.timeout, sock_read=self.settings.timeout
+            ),
+            headers={"User-Agent": self.settings.user_agent},
+        )
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def get_json_cached(
+        self,
+        url: str,
+        request: Callable[[str, Optional[Dict[str, Any]]], Awaitable[Dict[str, Any]]],
+        *,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """캐시를 먼저 확인하고, 없으면 request(재시도가 걸린 클라이언트 메서드)로 받아 저장합니다."""
+        if self.cache is not None:
+            hit, body = self.cache.get("GET", url, params)
+            if hit:
+                return body
+        body = await request(url, params)
+        if self.cache is not None:
+            self.cache.put("GET", url, params, body)
+        return body
+
+    async def get_json(
+        self,
+        url: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        op: str = "http",
+    ) -> Dict[str, Any]:
+        # 호스트 제한을 먼저 통과한 요청만 전역 in-flight 슬롯을 차지해, 막힌 호스트가 다른 호스트를 굶기지 않게 합니다.
+        async with self.limiter.request_async(url, op=op) as permit, self.in_flight, self.session.get(
+            url, params=params, headers=headers
+        ) as resp:
+            permit.observe(resp.status, resp.headers.get("Retry-After"))
+            if resp.status >= 400:
+                body = await resp.text()
+                log.warning("API 오류 status=%s url=%s body=%s", resp.status, url, body[:500])
+            resp.raise_for_status()
+            return await resp.json(content_type=None)
+
+
+class AsyncPTABClient:
+    """PTABClient의 비동기 버전. 재시도 규칙(tenacity)은 동기 버전과 같습니다."""
+
+    def __init__(self, settings: Settings, http: AsyncHTTP) -> None:
+        self.settings = settings
+        self.http = http
+        self.headers = {
+            "X-API-KEY": self.settings.api_key,
+            "Accept": "application/json",
+            "User-Agent": self.settings.user_agent,
+        }
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        url = f"{self.settings.base_url}/{path.lstrip('/')}"
+        return await self.http.get_json_cached(url, self._request, params=params)
+
+    @retry(
+        wait=wait_retry_after(wait_exponential(multiplier=1, min=1, max=20)),
+        stop=stop_after_attempt(5),
+        before_sleep=count_retry("ptab_api"),
+    )
+    async def _request(self, url: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return await self.http.get_json(url, params=params, headers=self.headers, op="ptab_api")
+
+    async def search_decisions(
+        self,
+        *,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        page: int = 1,
+        rows: int = 100,
+        extra_filters: Optional[Iterable[Dict[str, str]]] = None,
+    ) -> Dict[str, Any]:
+        params = search_decisions_params(since=since, until=until, page=page, rows=rows, extra_filters=extra_filters)
+        return await self.get("search-decisions", params=params)
+
+
+class AsyncPatentsViewClient:
+    """PatentsViewClient의 비동기 버전."""
+
+    def __init__(self, settings: Settings, http: AsyncHTTP) -> None:
+        self.settings = settings
+        self.http = http
+        self.headers = {"Accept": "application/json", "User-Agent": self.settings.user_agent}
+        if self.settings.patentsview_api_key:
+            self.headers["Authorization"] = f"Bearer {self.settings.patentsview_api_key}"
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if not self.settings.patentsview_base_url:
+            raise ValueError("patentsview_base_url이 비어 있습니다.")
+        url = f"{self.settings.patentsview_base_url.rstrip('/')}/{path.lstrip('/')}"
+        return await self.http.get_json_cached(url, self._request, params=params)
+
+    @retry(
+        wait=wait_retry_after(wait_exponential(multiplier=1, min=1, max=20)),
+        stop=stop_after_attempt(5),
+        before_sleep=count_retry("patentsview"),
+    )
+    async def _request(self, url: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return await self.http.get_json(url, params=params, headers=self.headers, op="patentsview")
+
+    async def health(self) -> Dict[str, Any]:
+        return await self.get("health")
+
+
+class AsyncDecisionDownloader:
+    """
+    DecisionDownloader의 비동기 버전.
+
+    항상 스트리밍으로 raw_dir에 저장하며, 동기 버전과 같은 download_index.jsonl을 공유합니다.
+    동시성은 스레드 수가 아니라 AsyncHTTP의 연결/in-flight 상한으로 제어됩니다.
+    """
+
+    def __init__(self, settings: Settings, http: AsyncHTTP) -> None:
+        self.settings = settings
+        self.http = http
+        Path(settings.raw_dir).mkdir(parents=True, exist_ok=True)
+        use_index = settings.download_index or settings.offline
+        self.index: Optional[DownloadIndex] = DownloadIndex(settings.raw_dir) if use_index else None
+
+    def _cached_item(self, url: str, cached: Dict[str, str]) -> Dict[str, str]:
+        path = Path(self.settings.raw_dir) / f"{cached['sha256']}{cached.get('ext', '.pdf')}"
+        return {"url": url, "sha256": cached["sha256"], "path": str(path), "cached": "1"}
+
+    @retry(
+        wait=wait_retry_after(wait_exponential(multiplier=1, min=1, max=20)),
+        stop=stop_after_attempt(5),
+        before_sleep=count_retry("download"),
+    )
+    async def download_to_disk(
+        self, url: str, *, ext: str = ".pdf", cached: Optional[Dict[str, str]] = None
+    ) -> Dict[str, str]:
+        raw_dir = Path(self.settings.raw_dir)
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=raw_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                http = self.http
+                async with http.limiter.request_async(url, op="download") as permit, http.in_flight, http.session.get(
+                    url, headers=_conditional_headers(cached)
+                ) as resp:
+                    permit.observe(resp.status, resp.headers.get("Retry-After"))
+                    not_modified = bool(cached) and resp.status == 304
+                    if not not_modified:
+                        resp.raise_for_status()
+                        if resp.status != 200:
+                            # 인덱스 항목 없이 온 304 등 본문 없는 응답을 빈 파일로 저장하지 않습니다.
+                            raise aiohttp.ClientResponseError(
+                                resp.request_info,
+                                resp.history,
+                                status=resp.status,
+                                message="예상하지 못한 응답입니다",
+                                headers=resp.headers,
+                            )
+                        validators = {
+                            "etag": resp.headers.get("ETag", ""),
+                            "last_modified": resp.headers.get("Last-Modified", ""),
+                        }
+                        async for chunk in resp.content.iter_chunked(self.settings.download_chunk_size):
+                            hasher.update(chunk)
+                            f.write(chunk)
+                            size += len(chunk)
+            if not_modified:
+                os.remove(tmp_name)
+                return self._cached_item(url, cached)
+            METRICS.observe("download_bytes", size)
+            digest = hasher.hexdigest()
+            path = raw_dir / f"{digest}{ext}"
+            if path.exists():
+                os.remove(tmp_name)
+            else:
+                os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+            raise
+        return {"url": url, "sha256": digest, "path": str(path), **validators}
+
+    async def fetch(self, url: str) -> Dict[str, str]:
+        cached = self.index.get(url) if self.index is not None else None
+        if self.settings.offline:
+            if cached is None:
+                raise CacheMiss(f"다운로드 인덱스에 없는 URL입니다(offline): {url}")
+            return self._cached_item(url, cached)
+        if cached is not None and not self.settings.revalidate_downloads:
+            return self._cached_item(url, cached)
+        item = await self.download_to_disk(url, cached=cached)
+        if self.index is not None and not item.get("cached"):
+            self.index.record(url, item["sha256"], etag=item["etag"], last_modified=item["last_modified"])
+        return item
+
+    async def batch_download(
+        self, urls: Iterable[str], *, on_error: Optional[Callable[[str, Exception], None]] = None
+    ) -> List[Dict[str, str]]:
+        urls = list(urls)
+        outcomes = await asyncio.gather(*(self.fetch(url) for url in urls), return_exceptions=True)
+        results: List[Dict[str, str]] = []
+        for url, outcome in zip(urls, outcomes):
+            if isinstance(outcome, Exception):
+                log.warning("다운로드 실패 url=%s err=%s", url, outcome)
+                if on_error is not None:
+                    on_error(url, outcome)
+                continue
+            if isinstance(outcome, BaseException):
+                raise outcome
+            results.append(outcome)
+        return results
@@ -0,0 +1,783 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .chunking import add_subsection_markers, chunk_text, guess_doc_lang, parse_repo_txt
+from .config import Settings
+
+# 오프라인 벤치마크: 고정 시드로 만든 합성 코퍼스(`##` 섹션 형식 다국어 특허 TXT, 결정문 PDF)와
+# 로컬 대역 HTTP 서버(search-decisions / PDF 다운로드)로 단계별 처리량·최대 메모리를 재고 기준선과 비교합니다.
+
+# 2: 단계마다 같은 실행의 보정 작업 시간으로 정규화한 처리량(normalized_throughput)을 기록하고 그것으로 비교합니다.
+BASELINE_VERSION = 2
+
+# 언어별 본문 어휘. ko는 guess_doc_lang에서 영어 경로(제목 표식 주입)를 타므로 영어 제목을 섞습니다.
+_WORDS: Dict[str, Sequence[str]] = {
+    "en": (
+        "substrate layer electrode configured wherein controller signal module housing surface portion "
+        "first second plurality coupled receive transmit data memory processor circuit voltage current "
+        "assembly member opening channel sensor output input method device system apparatus"
+    ).split(),
+    "ja": "基板 電極 層 制御部 信号 筐体 表面 部分 第一 第二 複数 接続 受信 送信 データ 記憶 処理 回路 電圧 電流".split(),
+    "zh": "基板 电极 层 控制器 信号 外壳 表面 部分 第一 第二 多个 连接 接收 发送 数据 存储器 处理器 电路 电压".split(),
+    "ko": "기판 전극 층 제어부 신호 하우징 표면 부분 제1 제2 복수 결합 수신 송신 데이터 메모리 프로세서 회로 전압".split(),
+}
+_SENTENCE_END = {"en": ". ", "ja": "。", "zh": "。", "ko": ". "}
+_JOINER = {"en": " ", "ja": "", "zh": "", "ko": " "}
+_DOC_PREFIX = {"en": "US", "ja": "JP", "zh": "CN", "ko": "KR"}
+_EN_HEADINGS = (
+    "TECHNICAL FIELD",
+    "BACKGROUND OF THE INVENTION",
+    "SUMMARY OF THE INVENTION",
+    "BRIEF DESCRIPTION OF THE DRAWINGS",
+    "DETAILED DESCRIPTION",
+)
+_BRACKET_HEADINGS = {
+    "ja": ("【技術分野】", "【背景技術】", "【発明の概要】", "【発明が解決しようとする課題】", "【発明を実施するための形態】"),
+    "zh": ("【技术领域】", "【背景技术】", "【发明内容】", "【附图说明】", "【具体实施方式】"),
+}
+
+
+def _sentence(rng: random.Random, lang: str, words: int) -> str:
+    return _JOINER[lang].join(rng.choice(_WORDS[lang]) for _ in range(words)) + _SENTENCE_END[lang]
+
+
+def _paragraph(rng: random.Random, lang: str, sentences: int) -> str:
+    return "".join(_sentence(rng, lang, rng.randint(8, 24)) for _ in range(sentences)).strip()
+
+
+def synthetic_patent_txt(rng: random.Random, lang: str, index: int, *, paragraphs: int = 40) -> str:
+    """
+    저장소 TXT 형식(헤더 + `==` 구분선 + `## <SECTION>`)의 합성 특허 문서 한 건.
+
+    DESCRIPTION에는 언어별 소제목(영어 제목 또는 【…】)을 넣습니다. 영어 제목 일부는 앞 문단에 줄바꿈 없이
+    붙여 add_subsection_markers의 제목 주입 경로도 지나가게 합니다.
+    """
+    doc_id = f"{_DOC_PREFIX[lang]}{1000000 + index}"
+    headings = _BRACKET_HEADINGS.get(lang, _EN_HEADINGS)
+    per_heading = max(1, paragraphs // len(headings))
+    description: List[str] = []
+    for i, heading in enumerate(headings):
+        body = "\n\n".join(_paragraph(rng, lang, rng.randint(3, 8)) for _ in range(per_heading))
+        if lang in _BRACKET_HEADINGS or i % 2 == 0:
+            description.append(f"{heading}\n{body}")
+        else:
+            description[-1] += f" {heading} {body}"
+    claims = "\n".join(f"{n}. {_paragraph(rng, lang, 2)}" for n in range(1, rng.randint(10, 21)))
+    return "\n".join(
+        [
+            f"Document Number: {doc_id}",
+            "Source: synthetic",
+            f"Title: {_sentence(rng, lang, 6).strip()}",
+            "=" * 60,
+            "## ABSTRACT",
+            _paragraph(rng, lang, 4),
+            "",
+            "## CLAIMS",
+            claims,
+            "",
+            "## DESCRIPTION",
+            "\n\n".join(description),
+            "",
+        ]
+    )
+
+
+def synthetic_patent_corpus(
+    out_dir: Path, *, docs: int, seed: int = 0, langs: Sequence[str] = ("en", "ja", "zh", "ko")
+) -> List[Path]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(docs):
+        lang = langs[i % len(langs)]
+        path = out_dir / f"{_DOC_PREFIX[lang]}{1000000 + i}.txt"
+        path.write_text(synthetic_patent_txt(rng, lang, i), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+# 결정문 본문에 섞는 인용 문장(SCAN_RULES의 조문/선행문헌/증거 규칙과 청구항 표현이 실제로 걸리도록).
+_DECISION_CITES = (
+    "Petitioner challenges claims {a}-{b} under 35 U.S.C. 103 as obvious over Smith (Ex. 10{ex:02d}).",
+    "Patent Owner argues the claims are definite under 35 U.S.C. 112(b).",
+    "Smith, U.S. Patent No. {pat:,}, discloses the claimed limitation (Ex. 10{ex:02d}, 4:12-35).",
+    "See WO 2015/{wo:06d} A1 (Exs. 10{ex:02d}, 10{ex2:02d}).",
+    "Claims {a}-{b} are anticipated under 35 U.S.C. 102 by EP {ep} B1.",
+    "Patent eligibility under 35 U.S.C. 101 is not at issue in this proceeding.",
+)
+_DECISION_CONCLUSION = (
+    "ORDER. It is ORDERED that Petitioner has shown by a preponderance of the evidence that "
+    "claims {a}-{b} of the '{pat3} patent are unpatentable, and all challenged claims are unpatentable."
+)
+_LINE_CHARS = 95
+_LINES_PER_PAGE = 50
+
+
+def synthetic_decision_pages(rng: random.Random, *, pages: int) -> List[List[str]]:
+    """PTAB 최종 결정문을 흉내 낸 페이지별 줄 목록(PDF 기본 글꼴로 쓸 수 있게 ASCII만)."""
+    words = _WORDS["en"]
+    out: List[List[str]] = []
+    for page in range(pages):
+        text: List[str] = []
+        while sum(len(s) + 1 for s in text) < _LINE_CHARS * _LINES_PER_PAGE:
+            if rng.random() < 0.2:
+                a = rng.randint(1, 10)
+                template = rng.choice(_DECISION_CITES)
+                text.append(
+                    template.format(
+                        a=a,
+                        b=a + rng.randint(1, 15),
+                        ex=rng.randint(1, 40),
+                        ex2=rng.randint(1, 40),
+                        pat=rng.randint(5_000_000, 11_999_999),
+                        wo=rng.randint(1, 999_999),
+                        ep=rng.randint(1_000_000, 3_999_999),
+                    )
+                )
+            else:
+                text.append(" ".join(rng.choice(words) for _ in range(rng.randint(10, 25))).capitalize() + ".")
+        if page == pages - 1:
+            text.append(_DECISION_CONCLUSION.format(a=1, b=rng.randint(5, 30), pat3=rng.randint(100, 999)))
+        lines = _wrap(" ".join(text), _LINE_CHARS)
+        out.append(lines[:_LINES_PER_PAGE] if page < pages - 1 else lines)
+    return out
+
+
+def _wrap(text: str, width: int) -> List[str]:
+    lines: List[str] = []
+    current = ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        lines.append(current)
+    return lines
+
+
+def _pdf_string(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: Sequence[Sequence[str]]) -> bytes:
+    """
+    줄 목록으로 된 페이지들을 최소한의 PDF(Helvetica, 비압축 콘텐츠 스트림)로 만듭니다.
+
+    pypdf가 읽는 실제 구조(카탈로그, 페이지 트리, 폰트, xref)를 갖추되 외부 PDF 라이브러리 없이 씁니다.
+    """
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # 페이지 트리는 페이지 객체 번호가 정해진 뒤 채웁니다.
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for lines in pages:
+        page_id = len(objects) + 1
+        kids.append(page_id)
+        ops = ["BT /F1 9 Tf 40 760 Td 14 TL"] + [f"({_pdf_string(line)}) '" for line in lines] + ["ET"]
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (page_id + 1)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def synthetic_decision_pdfs(out_dir: Path, *, docs: int, pages: int = 30, seed: int = 0) -> List[Path]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(docs):
+        path = out_dir / f"decision_{i:04d}.pdf"
+        path.write_bytes(make_pdf(synthetic_decision_pages(rng, pages=pages)))
+        paths.append(path)
+    return paths
+
+
+class StandInServer:
+    """
+    PTAB API와 PDF 다운로드 엔드포인트를 흉내 내는 로컬 HTTP 서버(with 문으로 띄우고 닫습니다).
+
+    - GET /search-decisions?page=N&rows=R: count와 결정문 링크가 든 results(페이지를 넘으면 빈 목록)
+    - GET /pdf/<i>: pdfs[i % len(pdfs)]의 바이트
+    """
+
+    def __init__(self, pdfs: Sequence[bytes], *, decisions: int) -> None:
+        self.pdfs = list(pdfs)
+        self.decisions = decisions
+        self.requests = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        assert self._server is not None
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self) -> "StandInServer":
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802
+                stand_in.requests += 1
+                url = urlsplit(self.path)
+                if url.path.endswith("/search-decisions"):
+                    query = parse_qs(url.query)
+                    body = json.dumps(stand_in.search_page(int(query["page"][0]), int(query["rows"][0]))).encode()
+                    content_type = "application/json"
+                elif url.path.startswith("/pdf/"):
+                    body = stand_in.pdfs[int(url.path.rsplit("/", 1)[1]) % len(stand_in.pdfs)]
+                    content_type = "application/pdf"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def search_page(self, page: int, rows: int) -> Dict[str, Any]:
+        first = (page - 1) * rows
+        results = [
+            {
+                "patentTrialDocumentDataBag": [
+                    {"documentTypeDescriptionText": "Institution Decision", "documentLinkText": ""},
+                    {
+                        "documentTypeDescriptionText": "Final Written Decision",
+                        "documentLinkText": f"{self.base_url}/pdf/{i}",
+                    },
+                ]
+            }
+            for i in range(first, min(first + rows, self.decisions))
+        ]
+        return {"count": self.decisions, "results": results}
+
+
+@dataclass
+class StageResult:
+    """단계 하나의 측정값. seconds는 반복 중 가장 빠른 값, peak_bytes는 tracemalloc으로 잰 최대 할당량입니다."""
+
+    stage: str
+    items: int
+    unit: str
+    input_bytes: int
+    seconds: float
+    peak_bytes: int
+    repeat: int
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.input_bytes / self.seconds / 1e6 if self.seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "items_per_second": self.items_per_second, "mb_per_second": self.mb_per_second}
+
+
+def measure(
+    stage: str,
+    fn: Callable[[], Any],
+    *,
+    items: int,
+    unit: str,
+    input_bytes: int = 0,
+    repeat: int = 3,
+    setup: Optional[Callable[[], Any]] = None,
+) -> StageResult:
+    """
+    fn을 repeat번 실행해 가장 빠른 시간을 쓰고, 최대 메모리는 tracemalloc을 켠 별도 실행 한 번으로 잽니다.
+
+    tracemalloc은 할당마다 비용이 들어 시간 측정과 섞지 않습니다. setup은 매 실행 전에(측정 밖에서) 부릅니다.
+    """
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return StageResult(stage, items, unit, input_bytes, best, peak, max(1, repeat))
+
+
+@dataclass(frozen=True)
+class Scale:
+    patent_docs: int
+    decision_pdfs: int
+    decision_pages: int
+    http_decisions: int
+
+
+# 규모별 코퍼스 크기. 기준선은 같은 규모끼리만 비교합니다.
+SCALES: Dict[str, Scale] = {
+    "small": Scale(patent_docs=100, decision_pdfs=4, decision_pages=20, http_decisions=100),
+    "medium": Scale(patent_docs=200, decision_pdfs=12, decision_pages=40, http_decisions=200),
+    "large": Scale(patent_docs=1000, decision_pdfs=40, decision_pages=80, http_decisions=1000),
+}
+
+STAGES = (
+    "parse_repo_txt",
+    "add_subsection_markers",
+    "chunk_text",
+    "parse_decision",
+    "parse_decision_metadata",
+    "save_jsonl",
+    "http_fetch_download",
+    "import_time",
+)
+
+# 진입점 모듈 → import만으로는 불러오면 안 되는 의존성. 가벼운 진입점(청킹 스크립트, 파싱/청킹 워커 프로세스)이
+# HTTP·PDF·콘솔 스택이나 dotenv를 싣지 않는지 import_time 단계에서 새 프로세스로 확인합니다.
+# ".py"로 끝나는 키는 저장소 루트 기준 스크립트 경로로, main()을 부르지 않고 모듈 수준 코드만 실행합니다.
+_HEAVY_MODULES = ("requests", "tenacity", "aiohttp", "pypdf", "rapidfuzz", "rich", "tqdm", "dotenv", "pyarrow")
+IMPORT_CHECKS: Dict[str, Tuple[str, ...]] = {
+    "ptab_dataset.config": _HEAVY_MODULES,
+    "ptab_dataset.chunking": (*_HEAVY_MODULES, "multiprocessing"),
+    "ptab_dataset.chunk_build": (*_HEAVY_MODULES, "multiprocessing"),
+    "ptab_dataset.parser": (*_HEAVY_MODULES, "multiprocessing"),
+    "ptab_dataset.storage": _HEAVY_MODULES,
+    "ptab_dataset.pipeline": (*_HEAVY_MODULES, "asyncio", "multiprocessing"),
+    # --parquet 없이 돌리는 청킹 스크립트는 pyarrow/numpy를 싣지 않아야 합니다.
+    "scripts/build_prior_art_chunks.py": (*_HEAVY_MODULES, "numpy", "multiprocessing"),
+}
+
+# 가벼운 진입점의 import 시간 절대 상한(초, repeat번 중 가장 빠른 값). 기준선 비교와 달리 기준선 파일 없이도
+# 적용되지만, 벽시계 시간이라 run_benchmarks.py --check에서만 실패로 처리합니다.
+# 현재 측정값(config 약 8 ms, chunking 13 ms, parser 21 ms)의 약 4배로, pypdf나 requests(각각 100 ms 안팎)를
+# 모듈 수준 import로 되돌리면 넘습니다.
+IMPORT_BUDGETS: Dict[str, float] = {
+    "ptab_dataset.config": 0.03,
+    "ptab_dataset.chunking": 0.05,
+    "ptab_dataset.parser": 0.08,
+}
+
+_IMPORT_PROBE = """
+import json, runpy, sys, time, tracemalloc
+if sys.argv[2] == "1":
+    tracemalloc.start()
+started = time.perf_counter()
+if sys.argv[1].endswith(".py"):
+    runpy.run_path(sys.argv[1], run_name="__import_probe__")
+else:
+    __import__(sys.argv[1])
+seconds = time.perf_counter() - started
+peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+print(json.dumps({"seconds": seconds, "peak_bytes": peak, "modules": sorted(sys.modules)}))
+"""
+
+
+def run_benchmarks(
+    *,
+    scale: str = "small",
+    repeat: int = 3,
+    seed: int = 0,
+    stages: Optional[Sequence[str]] = None,
+    work_dir: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """
+    합성 코퍼스를 만들고 고른 단계(기본: STAGES 전체)를 측정해 기준선 형식의 dict로 돌려줍니다.
+
+    work_dir를 주지 않으면 임시 디렉터리를 만들고 끝나면 지웁니다.
+    """
+    if scale not in SCALES:
+        raise ValueError(f"지원하지 않는 벤치마크 규모입니다: {scale!r}")
+    selected = list(stages or STAGES)
+    unknown = sorted(set(selected) - set(STAGES))
+    if unknown:
+        raise ValueError(f"알 수 없는 벤치마크 단계입니다: {unknown}")
+    size = SCALES[scale]
+
+    # 실행 중 머신 속도가 바뀌는 것을 줄이려고 단계 앞뒤에서 보정 작업을 재서 평균을 씁니다.
+    before = calibrate(repeat=max(5, repeat))
+    with tempfile.TemporaryDirectory(prefix="ptab-bench-") as tmp:
+        root = Path(work_dir) if work_dir is not None else Path(tmp)
+        results = _run_stages(root, size, selected, repeat=repeat, seed=seed)
+    calibration = (before + calibrate(repeat=max(5, repeat))) / 2
+    stages = {}
+    for r in results:
+        row = r.to_dict()
+        # 처리량 × 보정 작업 시간 = 보정 작업 한 번 동안 처리하는 항목 수. 머신 속도가 대부분 약분됩니다.
+        row["normalized_throughput"] = r.items_per_second * calibration
+        stages[r.stage] = row
+    return {
+        "version": BASELINE_VERSION,
+        "scale": scale,
+        "seed": seed,
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "calibration_seconds": calibration,
+        "stages": stages,
+        "import_violations": check_imports() if "import_time" in selected else [],
+        "import_budget_violations": check_import_budgets(repeat=repeat) if "import_time" in selected else [],
+    }
+
+
+def _calibration_work(text: str) -> int:
+    words: Dict[str, int] = {}
+    for word in re.findall(r"\w+", text):
+        key = word.lower()
+        words[key] = words.get(key, 0) + 1
+    return len(json.dumps(sorted(words.items())))
+
+
+def calibrate(*, repeat: int = 5) -> float:
+    """
+    고정된 순수 Python 작업(정규식 토큰화, dict 집계, JSON 직렬화)의 가장 빠른 시간(초)을 잽니다.
+
+    단계 처리량에 이 값을 곱해 기준선과 비교하므로, 다른 머신에서 만든 기준선도 인터프리터 속도 차이만큼은 상쇄됩니다.
+    """
+    rng = random.Random(0)
+    text = " ".join(_paragraph(rng, "en", 8) for _ in range(200))
+    return measure("calibration", lambda: _calibration_work(text), items=1, unit="runs", repeat=repeat).seconds
+
+
+def _run_stages(root: Path, size: Scale, selected: Sequence[str], *, repeat: int, seed: int) -> List[StageResult]:
+    results: List[StageResult] = []
+    txt_paths = synthetic_patent_corpus(root / "txt", docs=size.patent_docs, seed=seed)
+    texts = [p.read_text(encoding="utf-8") for p in txt_paths]
+    text_bytes = sum(len(t.encode("utf-8")) for t in texts)
+    parsed = [parse_repo_txt(t) for t in texts]
+    descriptions = [
+        (sections.get("DESCRIPTION", ""), guess_doc_lang(header["Document Number"])) for header, sections in parsed
+    ]
+    description_bytes = sum(len(d.encode("utf-8")) for d, _ in descriptions)
+    bodies = [body for _, sections in parsed for body in sections.values()]
+    body_bytes = sum(len(b.encode("utf-8")) for b in bodies)
+
+    if "parse_repo_txt" in selected:
+        results.append(
+            measure(
+                "parse_repo_txt",
+                lambda: [parse_repo_txt(t) for t in texts],
+                items=len(texts),
+                unit="docs",
+                input_bytes=text_bytes,
+                repeat=repeat,
+            )
+        )
+    if "add_subsection_markers" in selected:
+        results.append(
+            measure(
+                "add_subsection_markers",
+                lambda: [add_subsection_markers(d, lang) for d, lang in descriptions],
+                items=len(descriptions),
+                unit="docs",
+                input_bytes=description_bytes,
+                repeat=repeat,
+            )
+        )
+    if "chunk_text" in selected:
+        results.append(
+            measure(
+                "chunk_text",
+                lambda: [chunk_text(b) for b in bodies],
+                items=len(bodies),
+                unit="sections",
+                input_bytes=body_bytes,
+                repeat=repeat,
+            )
+        )
+
+    pdf_stages = {"parse_decision", "parse_decision_metadata", "http_fetch_download"} & set(selected)
+    pdfs: List[Path] = []
+    if pdf_stages:
+        pdfs = synthetic_decision_pdfs(root / "pdf", docs=size.decision_pdfs, pages=size.decision_pages, seed=seed)
+    pdf_bytes = sum(p.stat().st_size for p in pdfs)
+    if "parse_decision" in selected or "parse_decision_metadata" in selected:
+        # pypdf와 rapidfuzz를 쓰는 단계만 파서를 불러옵니다.
+        from .parser import parse_decision, parse_decision_metadata
+
+        if "parse_decision" in selected:
+            results.append(
+                measure(
+                    "parse_decision",
+                    lambda: [parse_decision(p) for p in pdfs],
+                    items=len(pdfs) * size.decision_pages,
+                    unit="pages",
+                    input_bytes=pdf_bytes,
+                    repeat=repeat,
+                )
+            )
+        if "parse_decision_metadata" in selected:
+            results.append(
+                measure(
+                    "parse_decision_metadata",
+                    lambda: [parse_decision_metadata(p) for p in pdfs],
+                    items=len(pdfs),
+                    unit="docs",
+                    input_bytes=pdf_bytes,
+                    repeat=repeat,
+                )
+            )
+    if "save_jsonl" in selected:
+        results.append(_bench_save_jsonl(root, texts, repeat=repeat))
+    if "http_fetch_download" in selected:
+        results.append(_bench_http(root, size, [p.read_bytes() for p in pdfs], repeat=repeat))
+    if "import_time" in selected:
+        results.append(_bench_imports(repeat=repeat))
+    return results
+
+
+def import_profile(module: str, *, trace_memory: bool = False) -> Dict[str, Any]:
+    """
+    새 인터프리터에서 module 하나만 import하고 {"seconds", "peak_bytes", "modules"}를 돌려줍니다.
+
+    이미 불러온 모듈이 섞이지 않도록 현재 프로세스가 아니라 자식 프로세스에서 잽니다. 인터프리터 시작 시간은 빠집니다.
+    module이 ".py"로 끝나면 저장소 루트 기준 스크립트 경로로 보고 모듈 수준 코드만 실행합니다.
+    """
+    env = dict(os.environ)
+    src = str(Path(__file__).resolve().parents[1])
+    if module.endswith(".py"):
+        module = str(Path(__file__).resolve().parents[2] / module)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src, env.get("PYTHONPATH", "")]))
+    out = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE, module, "1" if trace_memory else "0"],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout)
+
+
+def check_imports(checks: Optional[Dict[str, Sequence[str]]] = None) -> List[str]:
+    """IMPORT_CHECKS(또는 checks)에서 금지한 의존성을 import만으로 불러오는 모듈을 "모듈: 의존성" 목록으로 돌려줍니다."""
+    violations = []
+    for module, forbidden in (checks or IMPORT_CHECKS).items():
+        loaded = set(import_profile(module)["modules"])
+        violations.extend(f"{module}: {dep}" for dep in forbidden if dep in loaded)
+    return violations
+
+
+def check_import_budgets(budgets: Optional[Dict[str, float]] = None, *, repeat: int = 3) -> List[str]:
+    """IMPORT_BUDGETS(또는 budgets)의 상한을 넘는 모듈을 "모듈: 측정 > 상한" 목록으로 돌려줍니다(repeat번 중 최솟값)."""
+    violations = []
+    for module, budget in (budgets or IMPORT_BUDGETS).items():
+        seconds = min(import_profile(module)["seconds"] for _ in range(max(1, repeat)))
+        if seconds > budget:
+            violations.append(f"{module}: {seconds * 1000:.1f} ms > {budget * 1000:.0f} ms")
+    return violations
+
+
+def _bench_imports(*, repeat: int) -> StageResult:
+    # 모듈마다 repeat번 중 가장 빠른 import 시간을 더하고, 최대 메모리는 tracemalloc을 켠 별도 실행에서 잽니다.
+    seconds = sum(
+        min(import_profile(module)["seconds"] for _ in range(max(1, repeat))) for module in IMPORT_CHECKS
+    )
+    peak = max(import_profile(module, trace_memory=True)["peak_bytes"] for module in IMPORT_CHECKS)
+    return StageResult("import_time", len(IMPORT_CHECKS), "modules", 0, seconds, peak, max(1, repeat))
+
+
+def _bench_save_jsonl(root: Path, texts: Sequence[str], *, repeat: int) -> StageResult:
+    from .storage import Storage
+
+    # 파이프라인 결정문 레코드와 같은 모양(본문 text가 대부분을 차지)으로 저장합니다.
+    records = [
+        {
+            "url": f"https://example.invalid/{i}",
+            "sha256": f"{i:064x}",
+            "statute_basis": ["103"],
+            "token_count": len(text.split()),
+            "citations": [{"kind": "statute", "label": "103", "count": 3}],
+            "unpatentable_claims": [1, 2, 3, 4, 5],
+            "all_challenged": True,
+            "text": text,
+        }
+        for i, text in enumerate(texts)
+    ]
+    store = root / "store"
+    settings = Settings(api_key="bench", raw_dir=str(store / "raw"), processed_dir=str(store / "processed"))
+    storage = Storage(settings)
+    out = store / "decisions.jsonl"
+
+    def setup() -> None:
+        out.unlink(missing_ok=True)
+
+    try:
+        result = measure(
+            "save_jsonl",
+            lambda: storage.save_jsonl(records, out),
+            items=len(records),
+            unit="records",
+            input_bytes=sum(len(t.encode("utf-8")) for t in texts),
+            repeat=repeat,
+            setup=setup,
+        )
+    finally:
+        storage.close()
+    return result
+
+
+def _bench_http(root: Path, size: Scale, pdfs: Sequence[bytes], *, repeat: int) -> StageResult:
+    """대역 서버에서 search-decisions 페이지를 받아 결정문 PDF를 모두 내려받는 조회·다운로드 단계."""
+    from .api import PTABClient, iter_decision_pages
+    from .downloader import DecisionDownloader
+    from .ratelimit import RateLimiter
+
+    rows = 25
+    with StandInServer(pdfs, decisions=size.http_decisions) as server:
+        raw_dir = root / "http" / "raw"
+        settings = Settings(api_key="bench", base_url=server.base_url, raw_dir=str(raw_dir), download_index=False)
+        limiter = RateLimiter(settings)
+        client = PTABClient(settings, limiter=limiter)
+        downloader = DecisionDownloader(settings, limiter=limiter)
+
+        def fetch_all() -> None:
+            for _, docs in iter_decision_pages(client, since="2024-01-01", rows=rows, workers=settings.fetch_workers):
+                urls = [
+                    item["documentLinkText"]
+                    for doc in docs
+                    for item in doc["patentTrialDocumentDataBag"]
+                    if item["documentTypeDescriptionText"] == "Final Written Decision"
+                ]
+                downloader.batch_download(urls)
+
+        def setup() -> None:
+            for path in raw_dir.glob("*.pdf"):
+                path.unlink()
+
+        average = sum(len(p) for p in pdfs) / max(1, len(pdfs))
+        return measure(
+            "http_fetch_download",
+            fetch_all,
+            items=size.http_decisions,
+            unit="docs",
+            input_bytes=int(average * size.http_decisions),
+            repeat=repeat,
+            setup=setup,
+        )
+
+
+@dataclass(frozen=True)
+class Regression:
+    stage: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1.0 if self.baseline else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.stage}: {self.metric} {self.baseline:.4g} → {self.current:.4g} ({self.change:+.1%})"
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], *, tolerance: float = 0.2, memory_tolerance: float = 0.2
+) -> List[Regression]:
+    """
+    기준선 대비 정규화 처리량(normalized_throughput)이 tolerance 넘게 떨어졌거나 최대 메모리가 memory_tolerance 넘게
+    늘어난 단계를 돌려줍니다. 규모(scale)가 다르면 ValueError, 기준선에 없는 단계는 건너뜁니다.
+    """
+    if current.get("scale") != baseline.get("scale"):
+        raise ValueError(f"규모가 다른 기준선입니다: {baseline.get('scale')!r} != {current.get('scale')!r}")
+    regressions: List[Regression] = []
+    for stage, now in current["stages"].items():
+        before = baseline.get("stages", {}).get(stage)
+        if before is None:
+            continue
+        metric = "normalized_throughput"
+        if now[metric] < before[metric] * (1 - tolerance):
+            regressions.append(Regression(stage, metric, before[metric], now[metric]))
+        if now["peak_bytes"] > before["peak_bytes"] * (1 + memory_tolerance):
+            regressions.append(Regression(stage, "peak_bytes", before["peak_bytes"], now["peak_bytes"]))
+    return regressions
+
+
+def load_baseline(path: Path) -> Dict[str, Any]:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"기준선 형식 버전이 다릅니다: {data.get('version')!r}")
+    return data
+
+
+def save_baseline(result: Dict[str, Any], path: Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(result, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    return path
+
+
+def format_table(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    """단계별 처리량/최대 메모리 표(기준선이 있으면 정규화 처리량의 변화율 열을 덧붙임)."""
+    header = f"{'stage':<26}{'items':>8} {'unit':<9}{'seconds':>10}{'items/s':>12}{'MB/s':>9}{'peak MiB':>10}"
+    if baseline:
+        header += f"{'vs base':>10}"
+    lines = [header, "-" * len(header)]
+    for stage, row in result["stages"].items():
+        line = (
+            f"{stage:<26}{row['items']:>8} {row['unit']:<9}{row['seconds']:>10.4f}"
+            f"{row['items_per_second']:>12.1f}{row['mb_per_second']:>9.2f}{row['peak_bytes'] / 2**20:>10.2f}"
+        )
+        before = (baseline or {}).get("stages", {}).get(stage)
+        if before and before["normalized_throughput"]:
+            line += f"{row['normalized_throughput'] / before['normalized_throughput'] - 1:>+10.1%}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def parse_stage_list(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """CLI의 `--stages a,b` 값을 단계 이름 튜플로 바꿉니다(비어 있으면 None → 전체)."""
+    if not value:
+        return None
+    return tuple(s for s in re.split(r"[,\s]+", value) if s)
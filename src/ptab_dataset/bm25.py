@@ -0,0 +1,564 @@
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import sys
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from dataclasses import dataclass
+from itertools import accumulate, chain
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .tokenization import _CJK_RANGES
+
+INDEX_VERSION = 1
+
+# Postings restart their delta encoding every _BLOCK entries, so block heads act as a skip list.
+_BLOCK = 64
+
+# Per-term "champion" postings: the highest-impact chunks of every frequent term.
+DEFAULT_CHAMPIONS = 512
+
+# doc_id-filtered queries over at most this many chunks are scored chunk by chunk.
+_DIRECT_SCORING_LIMIT = 20000
+
+# Word runs (lower-cased) and CJK runs (indexed as overlapping character bigrams).
+_TERM_RE = re.compile(rf"([{_CJK_RANGES}]+)|[^\W{_CJK_RANGES}]+")
+
+# name -> array typecode of the fixed-width files in an index directory
+_ARRAYS = {
+    "terms_offsets": "Q",
+    "postings_offsets": "Q",
+    "df": "I",
+    "max_score": "d",
+    "champions_offsets": "Q",
+    "tail_score": "d",
+    "norms": "f",
+    "doc_ords": "I",
+    "section_ords": "I",
+    "chunk_indexes": "I",
+    "record_offsets": "q",
+    "doc_chunk_offsets": "Q",
+    "doc_chunks": "I",
+}
+
+
+def analyze(text: str) -> List[str]:
+    """Lexical terms for indexing and querying.
+
+    Words are case-folded. CJK runs become overlapping bigrams (a single
+    character is kept as is), the usual trick for ja/zh/ko text without a
+    morphological analyzer.
+    """
+
+    terms: List[str] = []
+    for m in _TERM_RE.finditer(text):
+        run = m.group(1)
+        if run is None:
+            terms.append(m.group(0).casefold())
+        elif len(run) == 1:
+            terms.append(run)
+        else:
+            terms.extend(run[i : i + 2] for i in range(len(run) - 1))
+    return terms
+
+
+def _field(record: Any, name: str) -> Any:
+    return record[name] if isinstance(record, dict) else getattr(record, name)
+
+
+def _encode_term(term: str) -> bytes:
+    return term.encode("utf-8", "surrogatepass")
+
+
+def _write_array(path: Path, values: array) -> None:
+    with path.open("wb") as f:
+        values.tofile(f)
+
+
+def _encode_postings(docs: Sequence[int], tfs: array) -> bytes:
+    deltas = array("I", (d if i % _BLOCK == 0 else d - docs[i - 1] for i, d in enumerate(docs)))
+    return zlib.compress(deltas.tobytes() + tfs.tobytes())
+
+
+class _Postings:
+    """One decompressed postings list: sequential iteration plus per-chunk lookup via block heads."""
+
+    __slots__ = ("deltas", "tfs", "heads", "_blocks")
+
+    def __init__(self, blob: bytes, n: int) -> None:
+        view = memoryview(zlib.decompress(blob))
+        self.deltas = view[: 4 * n].cast("I")
+        self.tfs = view[4 * n :].cast("H")
+        self.heads = self.deltas[::_BLOCK]
+        self._blocks: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.tfs)
+
+    def docs(self) -> List[int]:
+        deltas = self.deltas
+        return list(chain.from_iterable(accumulate(deltas[i : i + _BLOCK]) for i in range(0, len(deltas), _BLOCK)))
+
+    def items(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.docs(), self.tfs)
+
+    def tf(self, chunk_no: int) -> int:
+        b = bisect_right(self.heads, chunk_no) - 1
+        if b < 0:
+            return 0
+        block = self._blocks.get(b)
+        if block is None:
+            block = self._blocks[b] = list(accumulate(self.deltas[b * _BLOCK : (b + 1) * _BLOCK]))
+        j = bisect_left(block, chunk_no)
+        return self.tfs[b * _BLOCK + j] if j < len(block) and block[j] == chunk_no else 0
+
+
+def _build(
+    items: Iterable[Tuple[int, Any]],
+    out_dir: Path,
+    *,
+    source: Optional[str],
+    k1: float,
+    b: float,
+    champions: int,
+) -> int:
+    postings: Dict[str, Tuple[array, array]] = {}
+    doc_lens = array("I")
+    doc_ords, section_ords, chunk_indexes = array("I"), array("I"), array("I")
+    record_offsets = array("q")
+    doc_table: Dict[str, int] = {}
+    section_table: Dict[str, int] = {}
+
+    for n, (offset, record) in enumerate(items):
+        terms = analyze(_field(record, "text"))
+        doc_lens.append(len(terms))
+        doc_ords.append(doc_table.setdefault(_field(record, "doc_id"), len(doc_table)))
+        section_ords.append(section_table.setdefault(_field(record, "section"), len(section_table)))
+        chunk_indexes.append(_field(record, "chunk_index"))
+        record_offsets.append(offset)
+        for term, tf in Counter(terms).items():
+            entry = postings.get(term)
+            if entry is None:
+                entry = postings[term] = (array("I"), array("H"))
+            entry[0].append(n)
+            entry[1].append(min(tf, 0xFFFF))
+
+    # doc ordinal -> chunk numbers (CSR layout), used to answer doc_id-filtered queries directly.
+    doc_chunk_offsets = array("Q", [0] * (len(doc_table) + 1))
+    for d in doc_ords:
+        doc_chunk_offsets[d + 1] += 1
+    for i in range(len(doc_table)):
+        doc_chunk_offsets[i + 1] += doc_chunk_offsets[i]
+    doc_chunks = array("I", sorted(range(len(doc_ords)), key=doc_ords.__getitem__))
+
+    n_docs = len(doc_lens)
+    avgdl = (sum(doc_lens) / n_docs) if n_docs else 1.0
+    avgdl = avgdl or 1.0
+    norms = array("f", (k1 * (1 - b + b * dl / avgdl) for dl in doc_lens))
+
+    tmp_dir = out_dir.with_name(out_dir.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+
+    terms_offsets, postings_offsets, champions_offsets = array("Q", [0]), array("Q", [0]), array("Q", [0])
+    df, max_score, tail_score = array("I"), array("d"), array("d")
+    with (tmp_dir / "terms.bin").open("wb") as t_out, (tmp_dir / "postings.bin").open(
+        "wb"
+    ) as p_out, (tmp_dir / "champions.bin").open("wb") as c_out:
+        # Python string order is code point order, which is also UTF-8 byte order.
+        for term in sorted(postings):
+            docs, tfs = postings.pop(term)
+            t_out.write(_encode_term(term))
+            terms_offsets.append(t_out.tell())
+            p_out.write(_encode_postings(docs, tfs))
+            postings_offsets.append(p_out.tell())
+
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            impact = [tf / (tf + norms[d]) for d, tf in zip(docs, tfs)]
+            df.append(len(docs))
+            max_score.append(idf * (k1 + 1) * max(impact))
+            if len(docs) > champions:
+                # Keep the `champions` best postings (in chunk order). Every other posting scores at most tail_score.
+                best = heapq.nlargest(champions + 1, range(len(docs)), key=impact.__getitem__)
+                keep = sorted(best[:champions])
+                c_out.write(_encode_postings([docs[i] for i in keep], array("H", (tfs[i] for i in keep))))
+                tail_score.append(idf * (k1 + 1) * impact[best[champions]])
+            else:
+                tail_score.append(0.0)
+            champions_offsets.append(c_out.tell())
+
+    arrays = {
+        "terms_offsets": terms_offsets,
+        "postings_offsets": postings_offsets,
+        "df": df,
+        "max_score": max_score,
+        "champions_offsets": champions_offsets,
+        "tail_score": tail_score,
+        "norms": norms,
+        "doc_ords": doc_ords,
+        "section_ords": section_ords,
+        "chunk_indexes": chunk_indexes,
+        "record_offsets": record_offsets,
+        "doc_chunk_offsets": doc_chunk_offsets,
+        "doc_chunks": doc_chunks,
+    }
+    for name, values in arrays.items():
+        _write_array(tmp_dir / f"{name}.bin", values)
+
+    (tmp_dir / "strings.json").write_text(
+        json.dumps({"doc_ids": list(doc_table), "sections": list(section_table)}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    meta = {
+        "version": INDEX_VERSION,
+        "n_docs": n_docs,
+        "n_terms": len(df),
+        "avgdl": avgdl,
+        "k1": k1,
+        "b": b,
+        "champions": champions,
+        "source": source,
+        "byteorder": sys.byteorder,
+    }
+    (tmp_dir / "meta.json").write_text(json.dumps(meta, ensure_ascii=False, indent=1), encoding="utf-8")
+
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    os.replace(tmp_dir, out_dir)
+    return n_docs
+
+
+def build_bm25_index(
+    chunks: Iterable[Any],
+    out_dir: Path,
+    *,
+    k1: float = 1.2,
+    b: float = 0.75,
+    champions: int = DEFAULT_CHAMPIONS,
+) -> int:
+    """Index in-memory chunks (`Chunk`, `ChunkSpan` or chunk dicts), e.g. `chunk_repo_patent_txt` output.
+
+    Chunks are numbered in iteration order. Such an index has no source file,
+    so `BM25Index.record()` only returns metadata. Returns the number of chunks.
+    """
+
+    return _build(((-1, c) for c in chunks), out_dir, source=None, k1=k1, b=b, champions=champions)
+
+
+def _iter_jsonl_with_offsets(path: Path) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    with path.open("rb") as f:
+        offset = 0
+        for line in f:
+            if line.strip():
+                yield offset, json.loads(line)
+            offset += len(line)
+
+
+def build_bm25_index_from_jsonl(
+    jsonl_path: Path,
+    out_dir: Path,
+    *,
+    k1: float = 1.2,
+    b: float = 0.75,
+    champions: int = DEFAULT_CHAMPIONS,
+) -> int:
+    """Index a chunk JSONL (e.g. prior_art_chunks.jsonl); hits can then be resolved back to full records."""
+
+    return _build(
+        _iter_jsonl_with_offsets(jsonl_path),
+        out_dir,
+        source=str(jsonl_path.resolve()),
+        k1=k1,
+        b=b,
+        champions=champions,
+    )
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    chunk_no: int
+    score: float
+    doc_id: str
+    section: str
+    chunk_index: int
+
+
+class BM25Index:
+    """Read-only BM25 index. All arrays and postings are memory-mapped, so opening is cheap.
+
+    Postings are delta-encoded uint32 chunk numbers plus uint16 term
+    frequencies, zlib-compressed per term. Frequent terms also keep a short
+    "champion" list of their highest-impact postings. A query first scores
+    only the champion candidates exactly. That result is returned when
+    nothing outside the champion lists can reach the top k (the sum of the
+    terms' tail bounds). Otherwise the query runs term-at-a-time from the
+    highest-impact term down, and stops scanning postings once the remaining
+    upper bounds cannot lift a new chunk into the top k. Either way the
+    top k is exact.
+    """
+
+    def __init__(self, index_dir: Path) -> None:
+        self.index_dir = Path(index_dir)
+        self.meta = json.loads((self.index_dir / "meta.json").read_text(encoding="utf-8"))
+        if self.meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version: {self.meta.get('version')}")
+        if self.meta.get("byteorder") != sys.byteorder:
+            raise ValueError("Index was built on a machine with a different byte order")
+        strings = json.loads((self.index_dir / "strings.json").read_text(encoding="utf-8"))
+        self.doc_ids: List[str] = strings["doc_ids"]
+        self.sections: List[str] = strings["sections"]
+        self.k1 = float(self.meta["k1"])
+        self.n_docs = int(self.meta["n_docs"])
+
+        self._mmaps: List[mmap.mmap] = []
+        self._views: List[memoryview] = []
+        self._terms = self._map("terms.bin")
+        self._postings = self._map("postings.bin")
+        self._champions = self._map("champions.bin")
+        arrays = {name: self._view(f"{name}.bin", code) for name, code in _ARRAYS.items()}
+        self._terms_offsets = arrays["terms_offsets"]
+        self._postings_offsets = arrays["postings_offsets"]
+        self._df = arrays["df"]
+        self._max_score = arrays["max_score"]
+        self._champions_offsets = arrays["champions_offsets"]
+        self._tail_score = arrays["tail_score"]
+        self._norms = arrays["norms"]
+        self._doc_ords = arrays["doc_ords"]
+        self._section_ords = arrays["section_ords"]
+        self._chunk_indexes = arrays["chunk_indexes"]
+        self._record_offsets = arrays["record_offsets"]
+        self._doc_chunk_offsets = arrays["doc_chunk_offsets"]
+        self._doc_chunks = arrays["doc_chunks"]
+        self._doc_lookup = {d: i for i, d in enumerate(self.doc_ids)}
+        self._source = None
+
+    def _map(self, name: str) -> Any:
+        path = self.index_dir / name
+        if path.stat().st_size == 0:
+            return b""
+        with path.open("rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mmaps.append(mm)
+        return mm
+
+    def _view(self, name: str, typecode: str) -> memoryview:
+        base = memoryview(self._map(name))
+        view = base.cast(typecode)
+        self._views += [view, base]
+        return view
+
+    def close(self) -> None:
+        # Views must be released before their mmaps can be closed.
+        for view in self._views:
+            view.release()
+        for mm in self._mmaps:
+            mm.close()
+        self._views, self._mmaps = [], []
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+
+    def __enter__(self) -> "BM25Index":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.n_docs
+
+    def _lookup(self, term: str) -> Optional[int]:
+        key = _encode_term(term)
+        offsets = self._terms_offsets
+        lo, hi = 0, len(self._df)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._terms[offsets[mid] : offsets[mid + 1]] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self._df) and self._terms[offsets[lo] : offsets[lo + 1]] == key:
+            return lo
+        return None
+
+    def _read_postings(self, term_no: int, cache: Dict[int, _Postings]) -> _Postings:
+        postings = cache.get(term_no)
+        if postings is None:
+            offsets = self._postings_offsets
+            blob = self._postings[offsets[term_no] : offsets[term_no + 1]]
+            postings = cache[term_no] = _Postings(blob, self._df[term_no])
+        return postings
+
+    def _read_champions(self, term_no: int) -> List[int]:
+        offsets = self._champions_offsets
+        n = min(self._df[term_no], int(self.meta["champions"]))
+        return _Postings(self._champions[offsets[term_no] : offsets[term_no + 1]], n).docs()
+
+    def _section_filter(self, sections: Iterable[str]) -> Set[int]:
+        # "DESCRIPTION" also matches its subsections ("DESCRIPTION::BACKGROUND", ...).
+        wanted = set(sections)
+        return {
+            i
+            for i, name in enumerate(self.sections)
+            if name in wanted or any(name.startswith(w + "::") for w in wanted)
+        }
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        *,
+        doc_ids: Optional[Iterable[str]] = None,
+        sections: Optional[Iterable[str]] = None,
+    ) -> List[SearchHit]:
+        """Top-k chunks for `query`, optionally restricted to some `doc_ids` and/or `sections`."""
+
+        doc_filter = None if doc_ids is None else {self._doc_lookup[d] for d in doc_ids if d in self._doc_lookup}
+        section_filter = None if sections is None else self._section_filter(sections)
+        if k <= 0 or doc_filter == set() or section_filter == set():
+            return []
+
+        def allowed(chunk_no: int) -> bool:
+            return (doc_filter is None or self._doc_ords[chunk_no] in doc_filter) and (
+                section_filter is None or self._section_ords[chunk_no] in section_filter
+            )
+
+        query_terms = []
+        for term, qtf in Counter(analyze(query)).items():
+            term_no = self._lookup(term)
+            if term_no is not None:
+                query_terms.append((self._max_score[term_no] * qtf, term_no, qtf))
+        query_terms.sort(reverse=True)
+
+        filtered = doc_filter is not None or section_filter is not None
+        cache: Dict[int, _Postings] = {}
+        scores: Optional[Dict[int, float]] = None
+        if doc_filter is not None:
+            offsets = self._doc_chunk_offsets
+            n_allowed = sum(offsets[d + 1] - offsets[d] for d in doc_filter)
+            if n_allowed <= _DIRECT_SCORING_LIMIT:
+                # Few chunks pass the filter: score exactly those instead of walking postings.
+                chunks = (self._doc_chunks[i] for d in doc_filter for i in range(offsets[d], offsets[d + 1]))
+                scores = dict.fromkeys((c for c in chunks if allowed(c)), 0.0)
+                for _, term_no, qtf in query_terms:
+                    self._update(scores, self._read_postings(term_no, cache), self._weight(term_no, qtf))
+                scores = {d: s for d, s in scores.items() if s > 0}
+        if scores is None:
+            scores = self._score_champions(query_terms, k, allowed if filtered else None, cache)
+        if scores is None:
+            scores = self._score_all(query_terms, k, allowed if filtered else None, cache)
+
+        top = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [
+            SearchHit(
+                chunk_no=d,
+                score=s,
+                doc_id=self.doc_ids[self._doc_ords[d]],
+                section=self.sections[self._section_ords[d]],
+                chunk_index=self._chunk_indexes[d],
+            )
+            for d, s in top
+        ]
+
+    def _weight(self, term_no: int, qtf: int) -> float:
+        df = self._df[term_no]
+        return math.log(1 + (self.n_docs - df + 0.5) / (df + 0.5)) * (self.k1 + 1) * qtf
+
+    def _update(self, scores: Dict[int, float], postings: _Postings, weight: float) -> None:
+        # Add one term's contribution to existing candidates only.
+        norms = self._norms
+        if len(scores) < len(postings):
+            for d in scores:
+                tf = postings.tf(d)
+                if tf:
+                    scores[d] += weight * tf / (tf + norms[d])
+        else:
+            for d, tf in postings.items():
+                if d in scores:
+                    scores[d] += weight * tf / (tf + norms[d])
+
+    def _score_champions(
+        self,
+        query_terms: List[Tuple[float, int, int]],
+        k: int,
+        allowed: Optional[Callable[[int], bool]],
+        cache: Dict[int, _Postings],
+    ) -> Optional[Dict[int, float]]:
+        """Exact scores for all champion candidates, or None if the top k cannot be proven from them."""
+
+        candidates: Set[int] = set()
+        unseen_bound = 0.0
+        for _, term_no, qtf in query_terms:
+            if self._tail_score[term_no] > 0:
+                candidates.update(self._read_champions(term_no))
+                unseen_bound += self._tail_score[term_no] * qtf
+            else:
+                candidates.update(self._read_postings(term_no, cache).docs())
+        if allowed is not None:
+            candidates = {d for d in candidates if allowed(d)}
+        if unseen_bound > 0 and len(candidates) < k:
+            return None
+
+        scores = dict.fromkeys(candidates, 0.0)
+        for _, term_no, qtf in query_terms:
+            self._update(scores, self._read_postings(term_no, cache), self._weight(term_no, qtf))
+
+        # Small slack so float rounding between build-time bounds and query-time scores cannot drop a hit.
+        if unseen_bound > 0 and heapq.nlargest(k, scores.values())[-1] < unseen_bound * (1 + 1e-9):
+            return None
+        return scores
+
+    def _score_all(
+        self,
+        query_terms: List[Tuple[float, int, int]],
+        k: int,
+        allowed: Optional[Callable[[int], bool]],
+        cache: Dict[int, _Postings],
+    ) -> Dict[int, float]:
+        norms = self._norms
+        scores: Dict[int, float] = {}
+        remaining = sum(bound for bound, _, _ in query_terms)
+        for bound, term_no, qtf in query_terms:
+            weight = self._weight(term_no, qtf)
+            postings = self._read_postings(term_no, cache)
+
+            threshold = heapq.nlargest(k, scores.values())[-1] if len(scores) >= k else 0.0
+            if len(scores) >= k and remaining < threshold:
+                # Chunks not seen yet cannot reach the top k any more: only update candidates.
+                scores = {d: s for d, s in scores.items() if s + remaining >= threshold}
+                self._update(scores, postings, weight)
+            else:
+                for d, tf in postings.items():
+                    if allowed is not None and not allowed(d):
+                        continue
+                    scores[d] = scores.get(d, 0.0) + weight * tf / (tf + norms[d])
+            remaining -= bound
+        return scores
+
+    def record(self, chunk_no: int) -> Dict[str, Any]:
+        """Full chunk record (read from the source JSONL when the index has one)."""
+
+        offset = self._record_offsets[chunk_no]
+        if offset < 0 or not self.meta.get("source"):
+            return {
+                "doc_id": self.doc_ids[self._doc_ords[chunk_no]],
+                "section": self.sections[self._section_ords[chunk_no]],
+                "chunk_index": self._chunk_indexes[chunk_no],
+            }
+        if self._source is None:
+            self._source = open(self.meta["source"], "rb")
+        self._source.seek(offset)
+        return json.loads(self._source.readline())
+
+    def records(self, hits: Sequence[SearchHit]) -> List[Dict[str, Any]]:
+        return [self.record(hit.chunk_no) for hit in hits]
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+from .chunking import Chunk, ChunkSpan, chunk_repo_patent_spans, pool_imap
+from .tokenization import Tokenizer
+
+# Bump when chunking output changes for the same input/params, so incremental builds re-chunk everything.
+CHUNKER_VERSION = 2
+
+
+def chunk_record(c: Union[Chunk, ChunkSpan]) -> Dict[str, Any]:
+    return {
+        "doc_id": c.doc_id,
+        "section": c.section,
+        "chunk_index": c.chunk_index,
+        "text": c.text,
+        "source_path": c.source_path,
+    }
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _encode_source(args: Tuple[Path, Dict[str, Any]]) -> Tuple[int, bytes, str]:
+    # Runs in worker processes: chunk, serialize and hash one source so the
+    # parent only has to concatenate bytes. Chunk text is only sliced out here.
+    path, options = args
+    chunks = chunk_repo_patent_spans(path, **options)
+    data = "".join(json.dumps(chunk_record(c), ensure_ascii=False) + "\n" for c in chunks).encode("utf-8")
+    return len(chunks), data, file_sha256(path)
+
+
+@dataclass
+class BuildStats:
+    docs: int = 0
+    chunks: int = 0
+    rechunked: int = 0
+    reused: int = 0
+    removed: int = 0
+
+
+class ChunkManifest:
+    """Per-source bookkeeping for incremental chunk builds.
+
+    For every source TXT we remember its sha256, mtime/size, and the byte
+    range its records occupy in the output JSONL, together with the chunking
+    parameters used for the whole build. Unchanged sources can then be copied
+    over byte-for-byte instead of being re-read and re-chunked.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.params: Dict[str, Any] = {}
+        self.output_size: int = -1
+        self.sources: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> "ChunkManifest":
+        manifest = cls(path)
+        if path.exists():
+            data = json.loads(path.read_text(encoding="utf-8"))
+            manifest.params = data.get("params", {})
+            manifest.output_size = data.get("output_size", -1)
+            manifest.sources = data.get("sources", {})
+        return manifest
+
+    def save(self) -> None:
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        payload = {"params": self.params, "output_size": self.output_size, "sources": self.sources}
+        tmp.write_text(json.dumps(payload, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def is_unchanged(self, path: Path) -> bool:
+        """True if `path` has the same content as when it was last chunked.
+
+        mtime+size equality is trusted without hashing; otherwise the file is
+        hashed, and a touched-but-identical file is still treated as unchanged
+        (its stat info is refreshed).
+        """
+
+        entry = self.sources.get(str(path))
+        if entry is None:
+            return False
+        st = path.stat()
+        if entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            return True
+        if entry["size"] != st.st_size or entry["sha256"] != file_sha256(path):
+            return False
+        entry["mtime_ns"] = st.st_mtime_ns
+        return True
+
+
+def build_chunk_jsonl(
+    paths: Iterable[Path],
+    out_path: Path,
+    *,
+    max_chars: int = 1400,
+    overlap: int = 200,
+    incremental: bool = False,
+    manifest_path: Optional[Path] = None,
+    workers: int = 1,
+    chunksize: int = 8,
+    tokenizer: Optional[Tokenizer] = None,
+    max_tokens: int = 512,
+    overlap_tokens: int = 64,
+) -> BuildStats:
+    """Chunk `paths` (in sorted order) into a JSONL file.
+
+    With `incremental=True`, a manifest (default: `<out>.manifest.json`) is
+    used to re-chunk only new or changed sources, copy records of unchanged
+    sources from the previous output, and drop records of sources that no
+    longer exist. Any change of chunking parameters, a missing manifest or an
+    output file that no longer matches the manifest falls back to a full build.
+    The output and manifest are replaced atomically.
+
+    Sources that need chunking are processed on `workers` processes in
+    batches of `chunksize`; records are still written in sorted-path order.
+
+    With a `tokenizer`, chunks are sized by `max_tokens`/`overlap_tokens`
+    instead of `max_chars`/`overlap`.
+    """
+
+    paths = sorted(paths)
+    manifest_path = manifest_path or out_path.with_name(out_path.name + ".manifest.json")
+    params: Dict[str, Any] = {"max_chars": max_chars, "overlap": overlap, "chunker_version": CHUNKER_VERSION}
+    options: Dict[str, Any] = {"max_chars": max_chars, "overlap": overlap}
+    if tokenizer is not None:
+        params = {
+            "tokenizer": tokenizer.name,
+            "max_tokens": max_tokens,
+            "overlap_tokens": overlap_tokens,
+            "chunker_version": CHUNKER_VERSION,
+        }
+        options.update(tokenizer=tokenizer, max_tokens=max_tokens, overlap_tokens=overlap_tokens)
+
+    old = ChunkManifest.load(manifest_path) if incremental else ChunkManifest(manifest_path)
+    reusable = (
+        incremental
+        and old.params == params
+        and out_path.exists()
+        and out_path.stat().st_size == old.output_size
+    )
+
+    new = ChunkManifest(manifest_path)
+    new.params = params
+    stats = BuildStats()
+    keep = {str(p) for p in paths}
+    stats.removed = sum(1 for src in old.sources if src not in keep) if reusable else 0
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_out = out_path.with_name(out_path.name + ".tmp")
+    reuse = {p for p in paths if reusable and old.is_unchanged(p)}
+    todo = [(p, options) for p in paths if p not in reuse]
+    encoded = pool_imap(_encode_source, todo, workers=workers, chunksize=chunksize)
+
+    old_f = out_path.open("rb") if reusable else None
+    try:
+        with tmp_out.open("wb") as f:
+            for p in paths:
+                offset = f.tell()
+                entry: Dict[str, Any]
+                if p in reuse:
+                    entry = dict(old.sources[str(p)])
+                    old_f.seek(entry["offset"])
+                    f.write(old_f.read(entry["length"]))
+                    stats.reused += 1
+                else:
+                    st = p.stat()
+                    n_chunks, data, digest = next(encoded)
+                    f.write(data)
+                    entry = {
+                        "sha256": digest,
+                        "mtime_ns": st.st_mtime_ns,
+                        "size": st.st_size,
+                        "n_chunks": n_chunks,
+                    }
+                    stats.rechunked += 1
+                entry["offset"] = offset
+                entry["length"] = f.tell() - offset
+                new.sources[str(p)] = entry
+                if entry["n_chunks"]:
+                    stats.docs += 1
+                    stats.chunks += entry["n_chunks"]
+            new.output_size = f.tell()
+    finally:
+        encoded.close()
+        if old_f is not None:
+            old_f.close()
+
+    os.replace(tmp_out, out_path)
+    new.save()
+    return stats
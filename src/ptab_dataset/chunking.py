@@ -1,9 +1,16 @@
 from __future__ import annotations
 
 import re
+from bisect import bisect_left
+from collections import deque
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from .tokenization import Tokenizer
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 
 @dataclass(frozen=True)
@@ -15,6 +22,54 @@ class Chunk:
     source_path: Optional[str] = None
 
 
+class ChunkSpan:
+    """Compact chunk: a [start, end) span into a shared, normalized section text.
+
+    Spans from the same section share one `base` string, so chunking a
+    document does not copy its text again. `text` is materialized on access
+    (e.g. when the chunk is serialized).
+    """
+
+    __slots__ = ("doc_id", "section", "chunk_index", "base", "start", "end", "source_path")
+
+    def __init__(
+        self,
+        doc_id: str,
+        section: str,
+        chunk_index: int,
+        base: str,
+        start: int,
+        end: int,
+        source_path: Optional[str] = None,
+    ) -> None:
+        self.doc_id = doc_id
+        self.section = section
+        self.chunk_index = chunk_index
+        self.base = base
+        self.start = start
+        self.end = end
+        self.source_path = source_path
+
+    @property
+    def text(self) -> str:
+        return self.base[self.start : self.end]
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __repr__(self) -> str:
+        return f"ChunkSpan({self.doc_id!r}, {self.section!r}, {self.chunk_index}, {self.start}:{self.end})"
+
+    def to_chunk(self) -> Chunk:
+        return Chunk(
+            doc_id=self.doc_id,
+            section=self.section,
+            chunk_index=self.chunk_index,
+            text=self.text,
+            source_path=self.source_path,
+        )
+
+
 _SECTION_HEADER_RE = re.compile(r"^##\s+([A-Z0-9 ()_-]+)\s*$")
 
 
@@ -96,6 +151,82 @@ def _normalize_whitespace_for_chunking(text: str) -> str:
     return text.strip()
 
 
+# (pattern, label) pairs, applied in order: each one injects '\n### <label>\n'
+# before its first occurrence that is not already preceded by a '### ' marker.
+_HEADING_PATTERNS: List[Tuple[str, str]] = [
+    (r"CROSS[- ]REFERENCE TO RELATED APPLICATIONS", "CROSS-REFERENCE TO RELATED APPLICATIONS"),
+    (r"FIELD OF THE INVENTION", "FIELD OF THE INVENTION"),
+    (r"TECHNICAL FIELD", "TECHNICAL FIELD"),
+    (r"BACKGROUND( OF THE (INVENTION|PRESENT INVENTION))?", "BACKGROUND"),
+    (r"BACKGROUND TECHNOLOGY", "BACKGROUND TECHNOLOGY"),
+    (r"SUMMARY( OF THE (INVENTION|PRESENT INVENTION))?", "SUMMARY"),
+    (r"BRIEF DESCRIPTION OF THE DRAWINGS", "BRIEF DESCRIPTION OF THE DRAWINGS"),
+    (r"DESCRIPTION OF THE DRAWINGS", "DESCRIPTION OF THE DRAWINGS"),
+    (r"DETAILED DESCRIPTION( OF (THE )?INVENTION)?", "DETAILED DESCRIPTION"),
+    (r"THE CONTENT OF THE INVENTION", "THE CONTENT OF THE INVENTION"),
+    (r"DESCRIPTION OF EMBODIMENTS", "DESCRIPTION OF EMBODIMENTS"),
+]
+
+_HEADING_RES = [
+    (re.compile(rf"(?i)(?<!\n###\s)({pat})\b"), f"\n### {label}\n") for pat, label in _HEADING_PATTERNS
+]
+
+# One zero-width scan that finds every position where any heading could start.
+# The leading character class lets the regex engine skip most positions cheaply.
+_HEADING_CANDIDATE_RE = re.compile(
+    "(?i)(?=[%s])(?=%s)"
+    % (
+        "".join(sorted({pat[0] for pat, _ in _HEADING_PATTERNS})),
+        "|".join(f"(?:{pat})" for pat, _ in _HEADING_PATTERNS),
+    )
+)
+
+
+def _inject_heading_markers(text: str) -> str:
+    """Single-scan equivalent of applying `_HEADING_PATTERNS` one `re.sub(..., count=1)` at a time.
+
+    The original text is scanned once for candidate positions. The sequential
+    substitutions are then replayed on a list of pieces: spans of the original
+    text plus the marker strings inserted so far. A later pattern may match
+    inside an earlier marker, exactly as the chained `re.sub` calls would. Every
+    piece boundary touches a newline (markers start and end with one), and no
+    heading contains a newline. So a match never crosses a boundary, and
+    `endpos` reproduces the `\b` seen in the modified text. The output string
+    is built once at the end.
+    """
+
+    candidates = [m.start() for m in _HEADING_CANDIDATE_RE.finditer(text)]
+    if not candidates:
+        return text
+
+    # Pieces are (start, end) spans of `text` or inserted marker strings.
+    pieces: List[Any] = [(0, len(text))]
+    for regex, marker in _HEADING_RES:
+        tail = ""  # text just before the current piece, for the 5-char lookbehind
+        for i, piece in enumerate(pieces):
+            if isinstance(piece, str):
+                m = regex.search(tail + piece, len(tail))
+                if m:
+                    at = m.start() - len(tail)
+                    pieces[i : i + 1] = [p for p in (piece[:at], marker, piece[at:]) if p]
+                    break
+                tail = (tail + piece)[-5:]
+                continue
+
+            # Candidates were found on the original text, so the lookbehind here
+            # sees original characters. That is equivalent: a piece only starts
+            # where an earlier pattern matched, which was not after a marker.
+            start, end = piece
+            lo, hi = bisect_left(candidates, start), bisect_left(candidates, end)
+            at = next((pos for pos in candidates[lo:hi] if regex.match(text, pos, end)), None)
+            if at is not None:
+                pieces[i : i + 1] = [p for p in ((start, at), marker, (at, end)) if isinstance(p, str) or p[0] < p[1]]
+                break
+            tail = (tail + text[max(start, end - 5) : end])[-5:]
+
+    return "".join(p if isinstance(p, str) else text[p[0] : p[1]] for p in pieces)
+
+
 def add_subsection_markers(description: str, lang: str) -> str:
     """Best-effort: inject '### <HEADING>' markers inside DESCRIPTION.
 
@@ -126,31 +257,7 @@ def add_subsection_markers(description: str, lang: str) -> str:
 
     # EN headings (also apply to zh fallback because CN pages can be translated)
     # Insert markers even if the heading is glued to adjacent words.
-    heading_patterns = [
-        (r"CROSS[- ]REFERENCE TO RELATED APPLICATIONS", "CROSS-REFERENCE TO RELATED APPLICATIONS"),
-        (r"FIELD OF THE INVENTION", "FIELD OF THE INVENTION"),
-        (r"TECHNICAL FIELD", "TECHNICAL FIELD"),
-        (r"BACKGROUND( OF THE (INVENTION|PRESENT INVENTION))?", "BACKGROUND"),
-        (r"BACKGROUND TECHNOLOGY", "BACKGROUND TECHNOLOGY"),
-        (r"SUMMARY( OF THE (INVENTION|PRESENT INVENTION))?", "SUMMARY"),
-        (r"BRIEF DESCRIPTION OF THE DRAWINGS", "BRIEF DESCRIPTION OF THE DRAWINGS"),
-        (r"DESCRIPTION OF THE DRAWINGS", "DESCRIPTION OF THE DRAWINGS"),
-        (r"DETAILED DESCRIPTION( OF (THE )?INVENTION)?", "DETAILED DESCRIPTION"),
-        (r"THE CONTENT OF THE INVENTION", "THE CONTENT OF THE INVENTION"),
-        (r"DESCRIPTION OF EMBODIMENTS", "DESCRIPTION OF EMBODIMENTS"),
-    ]
-
-    for pat, label in heading_patterns:
-        # If it's already a standalone heading line, don't duplicate.
-        # Otherwise inject markers before the first occurrence.
-        marker = f"\n### {label}\n"
-        # Replace occurrences that are not already preceded by a newline+### marker.
-        text = re.sub(
-            rf"(?i)(?<!\n###\s)({pat})\b",
-            lambda m: marker + m.group(0).strip(),
-            text,
-            count=1,
-        )
+    text = _inject_heading_markers(text)
 
     # Clean up accidental "Description" label duplication sometimes present.
     text = re.sub(r"^Description\s*", "", text, flags=re.IGNORECASE)
@@ -190,61 +297,159 @@ def iter_subsections(text: str) -> Iterator[Tuple[str, str]]:
             yield title, body
 
 
-def chunk_text(text: str, max_chars: int = 1400, overlap: int = 200) -> List[str]:
-    """Simple char-based chunking with overlap.
+def chunk_spans(text: str, max_chars: int = 1400, overlap: int = 200) -> Tuple[str, List[Tuple[int, int]]]:
+    """Offset-based core of `chunk_text`.
 
-    - Prefers splitting on paragraph boundaries.
-    - Falls back to hard splits.
+    Returns `(base, spans)`. `base` is the paragraphs joined by blank lines,
+    and each `(start, end)` in `spans` is one chunk, `base[start:end]`. Two
+    paragraphs that are adjacent in a chunk are also adjacent in `base`. The
+    overlap tail of the previous chunk, the blank line and the current chunk
+    are likewise contiguous in `base`. So every chunk, overlap included, is a
+    plain slice.
     """
 
     text = _normalize_whitespace_for_chunking(text)
-    if not text:
-        return []
+    paragraphs = [p for p in (q.strip() for q in re.split(r"\n\n+", text)) if p]
+    if not paragraphs:
+        return "", []
+
+    base = "\n\n".join(paragraphs)
+    spans: List[Tuple[int, int]] = []
+    start, end = 0, len(paragraphs[0])
+    pos = len(paragraphs[0]) + 2
+    for p in paragraphs[1:]:
+        p_start, p_end = pos, pos + len(p)
+        pos = p_end + 2
+        if (end - start) + 2 + len(p) <= max_chars:
+            end = p_end
+        else:
+            spans.append((start, end))
+            start, end = p_start, p_end
+    spans.append((start, end))
+
+    # Add overlap by extending each chunk back into the tail of the previous one
+    if overlap > 0 and len(spans) > 1:
+        out: List[Tuple[int, int]] = [spans[0]]
+        for (prev_start, prev_end), (_, cur_end) in zip(spans, spans[1:]):
+            tail_start = max(prev_start, prev_end - overlap)
+            while base[tail_start].isspace():
+                tail_start += 1
+            out.append((tail_start, cur_end))
+        spans = out
+
+    return base, spans
+
+
+def chunk_token_spans(
+    text: str,
+    tokenizer: Tokenizer,
+    max_tokens: int = 512,
+    overlap_tokens: int = 64,
+) -> Tuple[str, List[Tuple[int, int]]]:
+    """Token-budget variant of `chunk_spans`.
+
+    Each paragraph is tokenized once, and chunks are packed from the
+    per-paragraph token counts instead of re-tokenizing a growing buffer.
+    Paragraphs longer than the budget are split at token boundaries. Each
+    chunk after the first repeats the last `overlap_tokens` tokens of the
+    previous one (only the tokens that chunk added itself, so a shorter
+    chunk is repeated from its first token and a chunk without tokens is not
+    repeated), and the budget counts those tokens: packing uses
+    `max_tokens - overlap_tokens`, so no chunk exceeds `max_tokens`.
+    For subword tokenizers the per-paragraph sum is a close approximation of
+    the whole-chunk count.
+    """
+
+    if not 0 <= overlap_tokens < max_tokens:
+        raise ValueError("overlap_tokens must be >= 0 and < max_tokens")
 
-    paragraphs = [p.strip() for p in re.split(r"\n\n+", text) if p.strip()]
-    chunks: List[str] = []
-    buf = ""
+    text = _normalize_whitespace_for_chunking(text)
+    paragraphs = [p for p in (q.strip() for q in re.split(r"\n\n+", text)) if p]
+    if not paragraphs:
+        return "", []
 
-    def push_buf() -> None:
-        nonlocal buf
-        if buf.strip():
-            chunks.append(buf.strip())
-        buf = ""
+    base = "\n\n".join(paragraphs)
+    budget = max_tokens - overlap_tokens
+    spans: List[Tuple[int, int]] = []
+    # Current chunk: [start, end) plus the start offsets of its tokens; `prev` is the last flushed one.
+    cur: Optional[Tuple[int, int, List[int]]] = None
+    prev: Optional[Tuple[int, int, List[int]]] = None
 
+    def flush() -> None:
+        nonlocal cur, prev
+        if cur is None:
+            return
+        start, end, _ = cur
+        if overlap_tokens and prev is not None and prev[2]:
+            prev_starts = prev[2]
+            start = prev_starts[max(0, len(prev_starts) - overlap_tokens)]
+        spans.append((start, end))
+        prev, cur = cur, None
+
+    pos = 0
     for p in paragraphs:
-        if not buf:
-            buf = p
+        p_start, p_end = pos, pos + len(p)
+        pos = p_end + 2
+        toks = tokenizer.token_spans(p)
+
+        if cur is not None and len(cur[2]) + len(toks) <= budget:
+            cur = (cur[0], p_end, cur[2] + [p_start + s for s, _ in toks])
+            continue
+        flush()
+        if len(toks) <= budget:
+            cur = (p_start, p_end, [p_start + s for s, _ in toks])
             continue
 
-        if len(buf) + 2 + len(p) <= max_chars:
-            buf = buf + "\n\n" + p
-        else:
-            push_buf()
-            buf = p
+        for i in range(0, len(toks), budget):
+            window = toks[i : i + budget]
+            w_start = p_start if i == 0 else p_start + window[0][0]
+            w_end = p_end if i + budget >= len(toks) else p_start + window[-1][1]
+            cur = (w_start, w_end, [p_start + s for s, _ in window])
+            if i + budget < len(toks):
+                flush()
+
+    flush()
+    return base, spans
+
 
-    push_buf()
+def chunk_text(text: str, max_chars: int = 1400, overlap: int = 200) -> List[str]:
+    """Simple char-based chunking with overlap.
 
-    # Add overlap by prefixing each chunk with tail of previous
-    if overlap > 0 and len(chunks) > 1:
-        out: List[str] = [chunks[0]]
-        for prev, cur in zip(chunks, chunks[1:]):
-            tail = prev[-overlap:]
-            out.append((tail + "\n\n" + cur).strip())
-        chunks = out
+    - Prefers splitting on paragraph boundaries.
+    - Falls back to hard splits.
+    """
 
-    return chunks
+    base, spans = chunk_spans(text, max_chars=max_chars, overlap=overlap)
+    return [base[start:end] for start, end in spans]
 
 
-def chunk_repo_patent_txt(path: Path, *, max_chars: int = 1400, overlap: int = 200) -> List[Chunk]:
-    """Convert a saved TXT file into chunks, using inferred subsection markers."""
+def chunk_repo_patent_spans(
+    path: Path,
+    *,
+    max_chars: int = 1400,
+    overlap: int = 200,
+    tokenizer: Optional[Tokenizer] = None,
+    max_tokens: int = 512,
+    overlap_tokens: int = 64,
+) -> List[ChunkSpan]:
+    """Like `chunk_repo_patent_txt`, but returns compact `ChunkSpan`s."""
 
     raw = path.read_text(encoding="utf-8")
     header, sections = parse_repo_txt(raw)
 
     doc_id = header.get("Document Number") or path.stem
     lang = guess_doc_lang(doc_id)
+    source_path = str(path)
+
+    results: List[ChunkSpan] = []
 
-    results: List[Chunk] = []
+    def add(section: str, body: str) -> None:
+        if tokenizer is None:
+            base, spans = chunk_spans(body, max_chars=max_chars, overlap=overlap)
+        else:
+            base, spans = chunk_token_spans(body, tokenizer, max_tokens=max_tokens, overlap_tokens=overlap_tokens)
+        for idx, (start, end) in enumerate(spans):
+            results.append(ChunkSpan(doc_id, section, idx, base, start, end, source_path))
 
     for section_name, section_text in sections.items():
         section_text = _normalize_whitespace_for_chunking(section_text)
@@ -254,28 +459,86 @@ def chunk_repo_patent_txt(path: Path, *, max_chars: int = 1400, overlap: int = 2
         if section_name == "DESCRIPTION":
             section_text = add_subsection_markers(section_text, lang)
             for sub_title, sub_body in iter_subsections(section_text):
-                pieces = chunk_text(sub_body, max_chars=max_chars, overlap=overlap)
-                for idx, piece in enumerate(pieces):
-                    results.append(
-                        Chunk(
-                            doc_id=doc_id,
-                            section=f"DESCRIPTION::{sub_title}",
-                            chunk_index=idx,
-                            text=piece,
-                            source_path=str(path),
-                        )
-                    )
+                add(f"DESCRIPTION::{sub_title}", sub_body)
         else:
-            pieces = chunk_text(section_text, max_chars=max_chars, overlap=overlap)
-            for idx, piece in enumerate(pieces):
-                results.append(
-                    Chunk(
-                        doc_id=doc_id,
-                        section=section_name,
-                        chunk_index=idx,
-                        text=piece,
-                        source_path=str(path),
-                    )
-                )
+            add(section_name, section_text)
 
     return results
+
+
+def chunk_repo_patent_txt(
+    path: Path,
+    *,
+    max_chars: int = 1400,
+    overlap: int = 200,
+    tokenizer: Optional[Tokenizer] = None,
+    max_tokens: int = 512,
+    overlap_tokens: int = 64,
+) -> List[Chunk]:
+    """Convert a saved TXT file into chunks, using inferred subsection markers.
+
+    Chunks are sized by characters (`max_chars`/`overlap`), or by tokens
+    (`max_tokens`/`overlap_tokens`) when a `tokenizer` is given.
+    """
+
+    spans = chunk_repo_patent_spans(
+        path,
+        max_chars=max_chars,
+        overlap=overlap,
+        tokenizer=tokenizer,
+        max_tokens=max_tokens,
+        overlap_tokens=overlap_tokens,
+    )
+    return [span.to_chunk() for span in spans]
+
+
+def _run_batch(fn: Callable[[T], R], batch: Sequence[T]) -> List[R]:
+    return [fn(item) for item in batch]
+
+
+def pool_imap(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    *,
+    workers: int,
+    chunksize: int = 8,
+    max_pending: Optional[int] = None,
+) -> Iterator[R]:
+    """Ordered, memory-bounded `map` over a process pool.
+
+    Items are submitted in batches of `chunksize`, and at most `max_pending`
+    batches (default: 2 * workers) are in flight, so results never pile up
+    faster than the consumer drains them. Results are yielded in input order.
+    With `workers <= 1` everything runs in the current process.
+    """
+
+    if workers <= 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    # Imported here so single-process users never load multiprocessing.
+    from concurrent.futures import ProcessPoolExecutor
+
+    max_pending = max_pending or 2 * workers
+    it = iter(items)
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        pending: Deque[Any] = deque()
+
+        def submit_next() -> bool:
+            batch = []
+            for item in it:
+                batch.append(item)
+                if len(batch) >= chunksize:
+                    break
+            if not batch:
+                return False
+            pending.append(ex.submit(_run_batch, fn, batch))
+            return True
+
+        while len(pending) < max_pending and submit_next():
+            pass
+        while pending:
+            results = pending.popleft().result()
+            submit_next()
+            yield from results
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - 선택 의존성
+    pa = ds = pq = None
+
+# 본문처럼 큰 문자열 컬럼은 스키마 맨 뒤에 두고 사전 인코딩/통계를 끕니다.
+# 메타데이터만 읽는 스캔(컬럼 프로젝션)은 이 컬럼의 페이지를 아예 읽지 않습니다.
+TEXT_COLUMNS = ("text",)
+
+DEFAULT_ROW_GROUP_SIZE = 4096
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Parquet 출력에는 pyarrow가 필요합니다: pip install 'ptab-dataset[parquet]'")
+
+
+def decision_schema() -> "pa.Schema":
+    """
+    파이프라인 결정문 레코드(url, sha256, statute_basis, token_count, citations, unpatentable_claims,
+    all_challenged, text) 스키마.
+    """
+    _require_pyarrow()
+    return pa.schema(
+        [
+            ("url", pa.string()),
+            ("sha256", pa.string()),
+            ("statute_basis", pa.list_(pa.string())),
+            ("token_count", pa.int64()),
+            (
+                "citations",
+                pa.list_(pa.struct([("kind", pa.string()), ("label", pa.string()), ("count", pa.int32())])),
+            ),
+            ("unpatentable_claims", pa.list_(pa.int32())),
+            ("all_challenged", pa.bool_()),
+            ("text", pa.large_string()),
+        ]
+    )
+
+
+def chunk_schema() -> "pa.Schema":
+    """prior_art_chunks 레코드(chunk_build.chunk_record) 스키마."""
+    _require_pyarrow()
+    return pa.schema(
+        [
+            ("doc_id", pa.string()),
+            ("section", pa.string()),
+            ("chunk_index", pa.int32()),
+            ("source_path", pa.string()),
+            ("text", pa.large_string()),
+        ]
+    )
+
+
+def _text_last(schema: "pa.Schema") -> "pa.Schema":
+    fields = [f for f in schema if f.name not in TEXT_COLUMNS] + [f for f in schema if f.name in TEXT_COLUMNS]
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+class ColumnarWriter:
+    """
+    레코드(dict)를 모아 row group 단위로 Parquet 파일에 쓰는 writer.
+
+    - row_group_size건이 모일 때마다 한 row group으로 내려쓰므로 메모리는 row group 하나 분량만 씁니다.
+    - 압축은 기본 zstd입니다.
+    - 스키마를 주지 않으면 첫 row group에서 추론하고, 본문 컬럼(TEXT_COLUMNS)은 맨 뒤로 보냅니다.
+    - `<path>.tmp`에 쓴 뒤 close()에서 교체하므로, 중간에 실패해도 이전 파일은 그대로 남습니다.
+
+    `with ColumnarWriter(path) as w: w.write_many(records)` 형태로 씁니다.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        schema: Optional["pa.Schema"] = None,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        compression: str = "zstd",
+        compression_level: Optional[int] = None,
+    ) -> None:
+        _require_pyarrow()
+        self.path = Path(path)
+        self.schema = _text_last(schema) if schema is not None else None
+        self.row_group_size = max(1, row_group_size)
+        self.compression = compression
+        self.compression_level = compression_level
+        self.rows = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._writer: Optional["pq.ParquetWriter"] = None
+        self._tmp = self.path.with_name(self.path.name + ".tmp")
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._buffer.append(record)
+        if len(self._buffer) >= self.row_group_size:
+            self._flush()
+
+    def write_many(self, records: Iterable[Dict[str, Any]]) -> None:
+        for rec in records:
+            self.write(rec)
+
+    def _open(self, schema: "pa.Schema") -> "pq.ParquetWriter":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        meta_columns = [f.name for f in schema if f.name not in TEXT_COLUMNS]
+        return pq.ParquetWriter(
+            str(self._tmp),
+            schema,
+            compression=self.compression,
+            compression_level=self.compression_level,
+            use_dictionary=meta_columns,
+            write_statistics=meta_columns,
+        )
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        if self.schema is None:
+            self.schema = _text_last(pa.Table.from_pylist(self._buffer).schema)
+        table = pa.Table.from_pylist(self._buffer, schema=self.schema)
+        if self._writer is None:
+            self._writer = self._open(self.schema)
+        self._writer.write_table(table, row_group_size=len(table))
+        self.rows += len(table)
+        self._buffer = []
+
+    def close(self) -> None:
+        self._flush()
+        if self._writer is None:
+            if self.schema is None:
+                # 레코드가 0건이고 스키마도 모르면 파일을 만들지 않습니다.
+                return
+            self._writer = self._open(self.schema)
+        self._writer.close()
+        self._writer = None
+        os.replace(self._tmp, self.path)
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._buffer = []
+        self._tmp.unlink(missing_ok=True)
+
+
+def write_parquet(
+    records: Iterable[Dict[str, Any]],
+    path: Path,
+    *,
+    schema: Optional["pa.Schema"] = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    compression: str = "zstd",
+) -> int:
+    """records를 Parquet 파일 하나로 씁니다(기존 파일은 교체). 쓴 행 수를 돌려줍니다."""
+    with ColumnarWriter(path, schema=schema, row_group_size=row_group_size, compression=compression) as writer:
+        writer.write_many(records)
+    return writer.rows
+
+
+def jsonl_to_parquet(
+    src: Path,
+    dst: Path,
+    *,
+    schema: Optional["pa.Schema"] = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    compression: str = "zstd",
+) -> int:
+    """JSONL 파일을 한 줄씩 읽어 Parquet로 변환합니다(전체를 메모리에 올리지 않음)."""
+
+    def records() -> Iterator[Dict[str, Any]]:
+        with Path(src).open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    return write_parquet(records(), dst, schema=schema, row_group_size=row_group_size, compression=compression)
+
+
+Filters = Union["ds.Expression", List[Any], None]
+
+
+def _filter_expression(filters: Filters) -> Optional["ds.Expression"]:
+    if filters is None or isinstance(filters, ds.Expression):
+        return filters
+    # [("col", "op", value), ...](AND) 또는 [[...], [...]](OR of AND) 형식
+    return pq.filters_to_expression(filters)
+
+
+def open_dataset(paths: Union[Path, str, Sequence[Union[Path, str]]]) -> "ds.Dataset":
+    """Parquet 파일 하나, 파일 목록, 또는 디렉터리(그 아래 *.parquet 전체)를 하나의 데이터셋으로 엽니다."""
+    _require_pyarrow()
+    if isinstance(paths, (str, Path)):
+        paths = sorted(Path(paths).glob("*.parquet")) if Path(paths).is_dir() else [paths]
+    return ds.dataset([str(p) for p in paths], format="parquet")
+
+
+def read_columnar(
+    paths: Union[Path, str, Sequence[Union[Path, str]]],
+    *,
+    columns: Optional[List[str]] = None,
+    filters: Filters = None,
+) -> "pa.Table":
+    """
+    필요한 컬럼만, 조건에 맞는 행만 읽어 pyarrow Table로 돌려줍니다.
+
+    columns: 읽을 컬럼(프로젝션). `text`를 빼면 본문 페이지는 디스크에서 읽지 않습니다.
+    filters: pyarrow.dataset 식(`ds.field("token_count") > 1000`) 또는
+        `[("token_count", ">", 1000)]` 형식의 DNF 튜플 목록. row group 통계(min/max)로 맞지 않는 row group은 건너뜁니다.
+    """
+    return open_dataset(paths).to_table(columns=columns, filter=_filter_expression(filters))
+
+
+def iter_columnar(
+    paths: Union[Path, str, Sequence[Union[Path, str]]],
+    *,
+    columns: Optional[List[str]] = None,
+    filters: Filters = None,
+    batch_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """read_columnar와 같지만 레코드(dict)를 배치 단위로 흘려보내 메모리를 배치 하나 분량으로 유지합니다."""
+    scanner = open_dataset(paths).scanner(
+        columns=columns, filter=_filter_expression(filters), batch_size=batch_size
+    )
+    for batch in scanner.to_batches():
+        yield from batch.to_pylist()
@@ -1,14 +1,33 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
-from typing import Optional
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional
 
-from dotenv import load_dotenv
+_env_loaded = False
+_env_lock = threading.Lock()
 
-# 기본은 `.env`를 찾되, 이 프로젝트에서는 `env` 파일을 쓰는 경우가 많아 fallback을 둡니다.
-if not load_dotenv():
-    load_dotenv("env")
+
+def load_env(path: Optional[str] = None) -> None:
+    """
+    `.env`(없으면 `env`) 파일의 값을 환경 변수로 읽어 들입니다. 이미 있는 환경 변수는 덮어쓰지 않습니다.
+
+    import 시점이 아니라 Settings.from_env()에서 한 번 호출되므로, 설정이 필요 없는 진입점(청킹 스크립트,
+    파싱 워커 프로세스 등)은 dotenv를 불러오거나 파일을 찾지 않습니다. path를 주면 그 파일만 (다시) 읽습니다.
+    """
+    global _env_loaded
+    with _env_lock:
+        if _env_loaded and path is None:
+            return
+        from dotenv import load_dotenv
+
+        # 기본은 `.env`를 찾되, 이 프로젝트에서는 `env` 파일을 쓰는 경우가 많아 fallback을 둡니다.
+        if path is not None:
+            load_dotenv(path)
+        elif not load_dotenv():
+            load_dotenv("env")
+        _env_loaded = True
 
 
 @dataclass
@@ -24,9 +43,65 @@ class Settings:
     timeout: int = 30
     max_workers: int = 4
     verify_tls: bool = True
+    # 파이프라인 단계별 동시성: 페이지 조회 선행(prefetch) 수, PDF 파싱 프로세스 수, 단계 사이 큐 크기(페이지 단위).
+    # 다운로드 단계의 동시성은 기존 max_workers를 그대로 사용합니다.
+    # pypdf 파싱은 GIL에 묶이므로 parse_workers > 1이면 프로세스 풀을 씁니다(1이면 메인 프로세스에서 파싱).
+    fetch_workers: int = 1
+    parse_workers: int = 1
+    queue_size: int = 2
+    # 0보다 크면 since~until 기간을 이 일수 단위 구간으로 나눠 구간별 첫 페이지를 함께 조회합니다(긴 기간 수집용).
+    # 페이지 번호(체크포인트, decisions_page_N)는 구간 순서 → 구간 안 페이지 순서로 1부터 이어 붙인 번호입니다.
+    date_shard_days: int = 0
+    # 파싱 모드: "full"(전체 본문 추출) 또는 "metadata"(앞/뒤 몇 페이지만 읽어 statute_basis만, text/token_count는 null).
+    parse_mode: str = "full"
+    metadata_head_pages: int = 3
+    metadata_tail_pages: int = 2
+    # raw_dir/parse_cache.sqlite3에 (PDF sha256, 추출 범위, 규칙 해시)별 파싱 결과를 캐시해 재실행 시 다시 파싱하지 않습니다.
+    parse_cache: bool = True
+    # True이면 PDF를 메모리에 모으지 않고 청크 단위로 raw_dir에 바로 씁니다.
+    stream_downloads: bool = True
+    download_chunk_size: int = 1 << 20
+    # raw_dir/download_index.jsonl에 URL → sha256/ETag/Last-Modified를 기록해 재실행 시 재다운로드를 피합니다.
+    # revalidate_downloads=True이면 알려진 URL도 조건부 GET으로 변경 여부를 확인합니다.
+    download_index: bool = True
+    revalidate_downloads: bool = False
+    # 비동기 모드(aiohttp, 선택 의존성): 스레드 대신 하나의 연결 풀을 공유하며 동시 요청 수를 제한합니다.
+    async_downloads: bool = False
+    async_max_connections: int = 100
+    async_limit_per_host: int = 20
+    async_max_in_flight: int = 200
+    async_keepalive: float = 30.0
+    # 호스트별 요청 속도 제한(req/s). 예: {"search.patentsview.org": 0.75}. 없는 호스트는 default_rate_limit(0이면 무제한).
+    # 동시성 상한은 429/5xx 비율에 따라 1 ~ max_concurrency_per_host 사이에서 자동으로 줄고 늘어납니다.
+    rate_limits: Dict[str, float] = field(default_factory=dict)
+    default_rate_limit: float = 0.0
+    rate_limit_burst: float = 0.0
+    max_concurrency_per_host: int = 16
+    # search-decisions / PatentsView 응답 디스크 캐시(기본 위치: raw_dir/http_cache, gzip 저장, TTL + 크기 상한 LRU).
+    # offline=True이면 캐시와 download_index만으로 실행하고 네트워크를 쓰지 않습니다(replay-only).
+    http_cache: bool = False
+    http_cache_dir: str = ""
+    http_cache_ttl: float = 7 * 24 * 3600
+    http_cache_max_bytes: int = 512 * 1024 * 1024
+    offline: bool = False
+    # 결정문 저장 형식: "jsonl"(기본, 페이지 파일에 append), "parquet"(선택 의존성 pyarrow, 페이지당 파일 하나),
+    # "shards"(processed_dir/decisions_shards에 크기 상한 샤드 + sha256/url 오프셋 인덱스).
+    # parquet은 row group 단위로 zstd 압축하며, 본문(text)은 별도 컬럼이라 메타데이터만 읽는 분석이 가볍습니다.
+    # shards의 압축은 "zstd"(선택 의존성 zstandard), "gzip", "none" 중 하나입니다.
+    output_format: str = "jsonl"
+    parquet_row_group_size: int = 4096
+    parquet_compression: str = "zstd"
+    shard_compression: str = "zstd"
+    shard_max_bytes: int = 256 * 1024 * 1024
+    # 실행 지표(요청 지연, 다운로드 바이트, 페이지당 파싱 시간, 상태 코드별 재시도, 큐 깊이, 처리량).
+    # 실행이 끝나면 processed_dir/reports/에 JSON 보고서를 남기고, prometheus_textfile을 주면 페이지마다
+    # 그 경로에 Prometheus 텍스트 형식으로 갱신합니다(node_exporter textfile collector 등).
+    run_report: bool = True
+    prometheus_textfile: str = ""
 
     @classmethod
     def from_env(cls, *, override_api_key: Optional[str] = None) -> "Settings":
+        load_env()
         api_key = override_api_key or os.getenv("USPTO_API_KEY", "")
         if not api_key:
             raise ValueError("환경 변수 USPTO_API_KEY가 설정되지 않았습니다.")
@@ -34,5 +109,20 @@ class Settings:
             api_key=api_key,
             patentsview_api_key=os.getenv("PATENTSVIEW_API_KEY", ""),
             patentsview_base_url=os.getenv("PATENTSVIEW_BASE_URL", "https://search.patentsview.org/api/v1"),
+            rate_limits=parse_rate_limits(os.getenv("RATE_LIMITS", "")),
         )
 
+
+def parse_rate_limits(value: str) -> Dict[str, float]:
+    """`host=req_per_sec,host2=req_per_sec` 형식(환경 변수 RATE_LIMITS)을 dict로 바꿉니다."""
+    limits: Dict[str, float] = {}
+    for item in value.split(","):
+        host, sep, rate = item.partition("=")
+        if not sep or not host.strip():
+            continue
+        try:
+            limits[host.strip().lower()] = float(rate)
+        except ValueError:
+            raise ValueError(f"RATE_LIMITS 항목을 해석할 수 없습니다: {item!r}") from None
+    return limits
+
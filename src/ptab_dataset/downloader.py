@@ -1,15 +1,22 @@
 from __future__ import annotations
 
 import hashlib
+import json
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Callable, Dict, Iterable, List, Optional
 
 import requests
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from .config import Settings
+from .http_cache import CacheMiss
+from .metrics import METRICS, count_retry
+from .ratelimit import RateLimiter, shared_rate_limiter, wait_retry_after
 
 log = logging.getLogger(__name__)
 
@@ -18,34 +25,229 @@ def sha256_bytes(data: bytes) -> str:
     return hashlib.sha256(data).hexdigest()
 
 
+def _conditional_headers(cached: Optional[Dict[str, str]]) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    return headers
+
+
+def _validators(resp: requests.Response) -> Dict[str, str]:
+    return {"etag": resp.headers.get("ETag", ""), "last_modified": resp.headers.get("Last-Modified", "")}
+
+
+def _raise_unless_ok(resp: requests.Response) -> None:
+    # 4xx/5xx뿐 아니라 조건부 요청을 보내지 않았는데 온 304 등 본문 없는 응답도 실패로 봅니다(빈 파일 저장 방지).
+    resp.raise_for_status()
+    if resp.status_code != 200:
+        raise requests.HTTPError(f"예상하지 못한 응답입니다 status={resp.status_code} url={resp.url}", response=resp)
+
+
+class DownloadIndex:
+    """
+    URL → 다운로드 결과(sha256, 확장자, ETag, Last-Modified) 인덱스.
+
+    raw_dir의 `download_index.jsonl`에 추가 기록(append-only)하며 같은 URL은 마지막 줄이 우선합니다.
+    재실행 시 이미 받은 URL은 파일 존재 확인 한 번으로 건너뛰거나 조건부 GET으로 재검증할 수 있습니다.
+    """
+
+    FILENAME = "download_index.jsonl"
+
+    def __init__(self, raw_dir: str) -> None:
+        self.path = Path(raw_dir) / self.FILENAME
+        self.raw_dir = Path(raw_dir)
+        self._entries: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        n_lines = 0
+        if self.path.exists():
+            with self.path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 중단된 마지막 줄 등은 무시합니다.
+                        continue
+                    self._entries[entry["url"]] = entry
+                    n_lines += 1
+        if n_lines > 2 * len(self._entries) + 1000:
+            self.compact()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, url: str) -> Optional[Dict[str, str]]:
+        """인덱스에 있고 내용 주소 파일도 남아 있는 경우에만 항목을 돌려줍니다."""
+        entry = self._entries.get(url)
+        if entry is None or not self.file_path(entry).exists():
+            return None
+        return entry
+
+    def file_path(self, entry: Dict[str, str]) -> Path:
+        return self.raw_dir / f"{entry['sha256']}{entry.get('ext', '.pdf')}"
+
+    def record(self, url: str, sha256: str, *, ext: str = ".pdf", etag: str = "", last_modified: str = "") -> None:
+        entry = {"url": url, "sha256": sha256, "ext": ext, "etag": etag, "last_modified": last_modified}
+        with self._lock:
+            if self._entries.get(url) == entry:
+                return
+            self._entries[url] = entry
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def compact(self) -> None:
+        """중복 줄을 정리해 인덱스 파일을 다시 씁니다(임시 파일 → 원자적 교체)."""
+        with self._lock:
+            tmp = self.path.with_suffix(".jsonl.tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                for entry in self._entries.values():
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.replace(tmp, self.path)
+
+
 class DecisionDownloader:
-    def __init__(self, settings: Settings) -> None:
+    def __init__(self, settings: Settings, *, limiter: Optional[RateLimiter] = None) -> None:
         self.settings = settings
+        self.limiter = limiter or shared_rate_limiter(settings)
         self.session = requests.Session()
         self.session.headers.update({"User-Agent": settings.user_agent})
         Path(settings.raw_dir).mkdir(parents=True, exist_ok=True)
+        use_index = settings.download_index or settings.offline
+        self.index: Optional[DownloadIndex] = DownloadIndex(settings.raw_dir) if use_index else None
 
-    @retry(wait=wait_exponential(multiplier=1, min=1, max=20), stop=stop_after_attempt(5))
-    def download_one(self, url: str) -> Dict[str, str]:
-        resp = self.session.get(url, timeout=self.settings.timeout, verify=self.settings.verify_tls)
-        resp.raise_for_status()
+    @retry(
+        wait=wait_retry_after(wait_exponential(multiplier=1, min=1, max=20)),
+        stop=stop_after_attempt(5),
+        before_sleep=count_retry("download"),
+    )
+    def download_one(self, url: str, *, cached: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        with self.limiter.request(url, op="download") as permit:
+            resp = self.session.get(
+                url,
+                headers=_conditional_headers(cached),
+                timeout=self.settings.timeout,
+                verify=self.settings.verify_tls,
+            )
+            permit.observe(resp.status_code, resp.headers.get("Retry-After"))
+        if cached and resp.status_code == 304:
+            return self._cached_item(url, cached)
+        _raise_unless_ok(resp)
         content = resp.content
+        METRICS.observe("download_bytes", len(content))
         digest = sha256_bytes(content)
-        return {"url": url, "sha256": digest, "content": content}
+        return {"url": url, "sha256": digest, "content": content, **_validators(resp)}
+
+    @retry(
+        wait=wait_retry_after(wait_exponential(multiplier=1, min=1, max=20)),
+        stop=stop_after_attempt(5),
+        before_sleep=count_retry("download"),
+    )
+    def download_to_disk(
+        self, url: str, *, ext: str = ".pdf", cached: Optional[Dict[str, str]] = None
+    ) -> Dict[str, str]:
+        """
+        응답을 청크 단위로 임시 파일에 쓰면서 SHA-256을 계산하고, 끝나면 `<sha256><ext>`로 원자적으로 이름을 바꿉니다.
+
+        본문 전체를 메모리에 올리지 않으며 호출자에게는 경로와 다이제스트만 돌려줍니다.
+        cached(인덱스 항목)가 주어지면 조건부 GET을 보내고, 304이면 기존 파일을 그대로 돌려줍니다.
+        """
+        raw_dir = Path(self.settings.raw_dir)
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=raw_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f, self.limiter.request(url, op="download") as permit, self.session.get(
+                url,
+                headers=_conditional_headers(cached),
+                stream=True,
+                timeout=self.settings.timeout,
+                verify=self.settings.verify_tls,
+            ) as resp:
+                permit.observe(resp.status_code, resp.headers.get("Retry-After"))
+                not_modified = bool(cached) and resp.status_code == 304
+                if not not_modified:
+                    _raise_unless_ok(resp)
+                    validators = _validators(resp)
+                    for chunk in resp.iter_content(chunk_size=self.settings.download_chunk_size):
+                        hasher.update(chunk)
+                        f.write(chunk)
+                        size += len(chunk)
+            if not_modified:
+                os.remove(tmp_name)
+                return self._cached_item(url, cached)
+            METRICS.observe("download_bytes", size)
+            digest = hasher.hexdigest()
+            path = raw_dir / f"{digest}{ext}"
+            if path.exists():
+                # 같은 내용이 이미 있으면 덮어쓰지 않습니다.
+                os.remove(tmp_name)
+            else:
+                os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+            raise
+        return {"url": url, "sha256": digest, "path": str(path), **validators}
+
+    def _cached_item(self, url: str, cached: Dict[str, str]) -> Dict[str, str]:
+        path = Path(self.settings.raw_dir) / f"{cached['sha256']}{cached.get('ext', '.pdf')}"
+        return {"url": url, "sha256": cached["sha256"], "path": str(path), "cached": "1"}
+
+    def fetch(self, url: str) -> Dict[str, str]:
+        """
+        인덱스를 먼저 확인한 뒤 필요할 때만 내려받습니다.
+
+        - 알려진 URL이고 파일이 있으면: revalidate_downloads=False이면 네트워크 없이 바로 반환,
+          True이면 If-None-Match / If-Modified-Since로 재검증(304이면 기존 파일 사용).
+        - 새로 받은 결과는 인덱스에 기록합니다.
+        - offline 모드에서는 인덱스에 없는 URL이면 CacheMiss를 던집니다.
+        """
+        cached = self.index.get(url) if self.index is not None else None
+        if self.settings.offline:
+            if cached is None:
+                raise CacheMiss(f"다운로드 인덱스에 없는 URL입니다(offline): {url}")
+            return self._cached_item(url, cached)
+        if cached is not None and not self.settings.revalidate_downloads:
+            return self._cached_item(url, cached)
+
+        if self.settings.stream_downloads:
+            item = self.download_to_disk(url, cached=cached)
+        else:
+            item = self.download_one(url, cached=cached)
+        if self.index is not None and not item.get("cached"):
+            self.index.record(
+                url,
+                item["sha256"],
+                etag=item.get("etag", ""),
+                last_modified=item.get("last_modified", ""),
+            )
+        return item
 
-    def batch_download(self, urls: Iterable[str]) -> List[Dict[str, str]]:
+    def batch_download(
+        self, urls: Iterable[str], *, on_error: Optional[Callable[[str, Exception], None]] = None
+    ) -> List[Dict[str, str]]:
+        # 실패한 URL은 결과에서 빠지며, on_error가 있으면 (url, 예외)로 알려 줍니다.
         results: List[Dict[str, str]] = []
         with ThreadPoolExecutor(max_workers=self.settings.max_workers) as ex:
-            future_map = {ex.submit(self.download_one, url): url for url in urls}
-            for fut in as_completed(future_map):
-                url = future_map[fut]
+            # 완료 순서가 아니라 입력 URL 순서로 결과를 모아 출력 JSONL이 실행마다 같도록 합니다.
+            futures = [(ex.submit(self.fetch, url), url) for url in urls]
+            for fut, url in futures:
                 try:
                     results.append(fut.result())
                 except Exception as exc:  # noqa: BLE001
                     log.warning("다운로드 실패 url=%s err=%s", url, exc)
+                    if on_error is not None:
+                        on_error(url, exc)
         return results
 
     def persist(self, item: Dict[str, str], *, ext: str = ".pdf") -> Path:
+        if "path" in item:
+            # 스트리밍 다운로드나 인덱스 적중 항목은 이미 내용 주소 경로에 저장되어 있습니다.
+            return Path(item["path"])
         digest = item["sha256"]
         path = Path(self.settings.raw_dir) / f"{digest}{ext}"
         if not path.exists():
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Protocol, Sequence, Tuple
+
+from .bm25 import analyze
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+STORE_VERSION = 1
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("The embedding store requires numpy: pip install 'ptab-dataset[embeddings]'")
+
+
+class Encoder(Protocol):
+    """A local text encoder: `encode` maps a batch of texts to a (len(texts), dim) float array."""
+
+    name: str
+    dim: int
+
+    def encode(self, texts: List[str]) -> Any: ...
+
+
+class HashingEncoder:
+    """Dependency-free baseline: L2-normalized signed feature hashing of BM25 analyzer terms.
+
+    It is only a lexical baseline and a stand-in for real models in pipelines
+    and experiments.
+    """
+
+    def __init__(self, dim: int = 512) -> None:
+        _require_numpy()
+        self.dim = dim
+        self.name = f"hashing:{dim}"
+
+    def encode(self, texts: List[str]) -> Any:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            counts: Dict[str, int] = {}
+            for term in analyze(text):
+                counts[term] = counts.get(term, 0) + 1
+            for term, tf in counts.items():
+                h = int.from_bytes(hashlib.blake2b(term.encode("utf-8", "surrogatepass"), digest_size=8).digest(), "little")
+                out[i, h % self.dim] += (1.0 + math.log(tf)) * (1.0 if h >> 63 else -1.0)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEncoder:
+    """Adapter for a locally available sentence-transformers model (no downloads)."""
+
+    def __init__(self, model_name_or_path: str, *, device: Optional[str] = None) -> None:
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("st: encoders require the `sentence-transformers` package") from exc
+        self.model = SentenceTransformer(model_name_or_path, device=device, local_files_only=True)
+        self.dim = int(self.model.get_sentence_embedding_dimension())
+        self.name = f"st:{model_name_or_path}"
+
+    def encode(self, texts: List[str]) -> Any:
+        return self.model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+
+
+def load_encoder(spec: str) -> Encoder:
+    """Build an encoder from a CLI-style spec: `hashing[:<dim>]` or `st:<name-or-path>`."""
+
+    if spec == "hashing" or spec.startswith("hashing:"):
+        return HashingEncoder(int(spec.partition(":")[2] or 512))
+    if spec.startswith("st:"):
+        return SentenceTransformerEncoder(spec[3:])
+    raise ValueError(f"Unknown encoder spec: {spec!r} (expected 'hashing[:<dim>]' or 'st:<name-or-path>')")
+
+
+def chunk_id(chunk: Any) -> str:
+    """Stable id of a chunk (`Chunk`, `ChunkSpan` or chunk dict): `<doc_id>#<section>#<chunk_index>`."""
+
+    get = chunk.get if isinstance(chunk, dict) else lambda name: getattr(chunk, name)
+    return f"{get('doc_id')}#{get('section')}#{get('chunk_index')}"
+
+
+def _text(chunk: Any) -> str:
+    return chunk["text"] if isinstance(chunk, dict) else chunk.text
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).digest()
+
+
+def _batches(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+@dataclass
+class EmbedStats:
+    chunks: int = 0
+    encoded: int = 0
+    reused: int = 0
+
+
+class EmbeddingStore:
+    """Chunk embeddings on disk, addressed by chunk id, deduplicated by text hash.
+
+    Layout of the store directory:
+    - `vectors.bin`: row-major (rows, dim) float16/float32 matrix, memory-mapped for search
+    - `hashes.bin`: sha256 of the text of each row (32 bytes per row)
+    - `chunks.json`: chunk id -> row table for the current corpus
+    - `meta.json`: encoder name, dim, dtype, row count
+
+    `update()` appends rows only for texts whose hash is not stored yet, so
+    unchanged chunks are never re-encoded. Rows that no chunk refers to any
+    more are skipped by `search()` and dropped by `compact()`.
+    """
+
+    def __init__(self, path: Path) -> None:
+        _require_numpy()
+        self.path = Path(path)
+        self.meta: Dict[str, Any] = {}
+        self.chunk_ids: List[str] = []
+        self.chunk_rows: List[int] = []
+        self._vectors: Any = None
+        self._row_chunks: Optional[Dict[int, List[str]]] = None
+        self._live: Any = None
+        if (self.path / "meta.json").exists():
+            self._load()
+
+    # -- persistence -----------------------------------------------------------------
+
+    def _load(self) -> None:
+        self.meta = json.loads((self.path / "meta.json").read_text(encoding="utf-8"))
+        if self.meta.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported embedding store version: {self.meta.get('version')}")
+        table = json.loads((self.path / "chunks.json").read_text(encoding="utf-8"))
+        self.chunk_ids, self.chunk_rows = table["ids"], table["rows"]
+        self._vectors = None
+        self._row_chunks = None
+        self._live = None
+
+    @property
+    def rows(self) -> int:
+        return int(self.meta.get("rows", 0))
+
+    @property
+    def dim(self) -> int:
+        return int(self.meta.get("dim", 0))
+
+    @property
+    def vectors(self) -> Any:
+        """The (rows, dim) matrix, memory-mapped read-only."""
+
+        if self._vectors is None:
+            dtype = np.dtype(self.meta.get("dtype", "float32"))
+            if self.rows == 0:
+                self._vectors = np.zeros((0, self.dim), dtype=dtype)
+            else:
+                self._vectors = np.memmap(self.path / "vectors.bin", dtype=dtype, mode="r", shape=(self.rows, self.dim))
+        return self._vectors
+
+    def _write_table(self, ids: List[str], rows: List[int]) -> None:
+        tmp = self.path / "chunks.json.tmp"
+        tmp.write_text(json.dumps({"ids": ids, "rows": rows}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path / "chunks.json")
+
+    def _write_meta(self, meta: Dict[str, Any]) -> None:
+        tmp = self.path / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path / "meta.json")
+
+    # -- building ----------------------------------------------------------------------
+
+    def update(
+        self,
+        chunks: Iterable[Any],
+        encoder: Encoder,
+        *,
+        batch_size: int = 64,
+        dtype: str = "float16",
+    ) -> EmbedStats:
+        """Make the store describe exactly `chunks`, encoding only texts that are not stored yet.
+
+        A different encoder or dtype than the stored one starts the store over.
+        """
+
+        chunks = list(chunks)
+        stats = EmbedStats(chunks=len(chunks))
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        fresh = self.meta.get("encoder") != encoder.name or self.meta.get("dtype") != dtype
+        meta = {"version": STORE_VERSION, "encoder": encoder.name, "dim": encoder.dim, "dtype": dtype, "rows": 0}
+        if not fresh:
+            meta["rows"] = self.rows
+        known: Dict[bytes, int] = {}
+        if not fresh and meta["rows"]:
+            raw = (self.path / "hashes.bin").read_bytes()[: 32 * meta["rows"]]
+            known = {raw[i * 32 : (i + 1) * 32]: i for i in range(meta["rows"])}
+
+        hashes = [text_hash(_text(c)) for c in chunks]
+        todo: Dict[bytes, int] = {}
+        for h in hashes:
+            if h not in known and h not in todo:
+                todo[h] = len(todo)
+        todo_chunks = [None] * len(todo)
+        for c, h in zip(chunks, hashes):
+            i = todo.get(h)
+            if i is not None and todo_chunks[i] is None:
+                todo_chunks[i] = c
+
+        self._vectors = None  # release the map before appending
+        mode = "wb" if fresh else "ab"
+        # Vectors and hashes only ever grow, and meta.json (row count) is written last,
+        # so an interrupted update leaves the previous store readable.
+        with (self.path / "vectors.bin").open(mode) as vf, (self.path / "hashes.bin").open(mode) as hf:
+            if not fresh:
+                vf.truncate(meta["rows"] * encoder.dim * np.dtype(dtype).itemsize)
+                hf.truncate(meta["rows"] * 32)
+                vf.seek(0, os.SEEK_END)
+                hf.seek(0, os.SEEK_END)
+            order = list(todo)
+            for batch_no, batch in enumerate(_batches(todo_chunks, batch_size)):
+                vecs = np.asarray(encoder.encode([_text(c) for c in batch]), dtype=np.float32)
+                if vecs.shape != (len(batch), encoder.dim):
+                    raise ValueError(f"Encoder returned shape {vecs.shape}, expected {(len(batch), encoder.dim)}")
+                vf.write(vecs.astype(dtype).tobytes())
+                start = batch_no * batch_size
+                for h in order[start : start + len(batch)]:
+                    hf.write(h)
+                    known[h] = meta["rows"]
+                    meta["rows"] += 1
+                stats.encoded += len(batch)
+
+        stats.reused = stats.chunks - stats.encoded
+        self._write_table([chunk_id(c) for c in chunks], [known[h] for h in hashes])
+        self._write_meta(meta)
+        self._load()
+        return stats
+
+    def compact(self) -> int:
+        """Rewrite the store keeping only rows referenced by the chunk table. Returns rows dropped."""
+
+        live = sorted(set(self.chunk_rows))
+        if len(live) == self.rows:
+            return 0
+        remap = {old: new for new, old in enumerate(live)}
+        vectors = self.vectors
+        raw = (self.path / "hashes.bin").read_bytes()
+        with (self.path / "vectors.bin.tmp").open("wb") as vf, (self.path / "hashes.bin.tmp").open("wb") as hf:
+            for batch in _batches(live, 4096):
+                vf.write(np.ascontiguousarray(vectors[batch]).tobytes())
+                hf.write(b"".join(raw[r * 32 : (r + 1) * 32] for r in batch))
+        dropped = self.rows - len(live)
+        self._vectors = None
+        del vectors
+        os.replace(self.path / "vectors.bin.tmp", self.path / "vectors.bin")
+        os.replace(self.path / "hashes.bin.tmp", self.path / "hashes.bin")
+        self._write_table(self.chunk_ids, [remap[r] for r in self.chunk_rows])
+        self._write_meta({**self.meta, "rows": len(live)})
+        self._load()
+        return dropped
+
+    # -- querying ----------------------------------------------------------------------
+
+    def _row_table(self) -> Tuple[Dict[int, List[str]], Any]:
+        if self._row_chunks is None:
+            row_chunks: Dict[int, List[str]] = {}
+            for cid, row in zip(self.chunk_ids, self.chunk_rows):
+                row_chunks.setdefault(row, []).append(cid)
+            live = np.zeros(self.rows, dtype=bool)
+            live[list(row_chunks)] = True
+            self._row_chunks, self._live = row_chunks, live
+        return self._row_chunks, self._live
+
+    def search(self, queries: Any, k: int = 10, *, block_rows: int = 16384) -> List[List[Tuple[str, float]]]:
+        """Exact top-k by inner product (cosine for normalized encoders), one list per query.
+
+        `queries` is a (dim,) or (m, dim) array. The matrix is scanned in
+        blocks of `block_rows` rows (one float32 matmul per block), and a
+        running top-k is kept with `argpartition`, so memory stays bounded
+        by the block size. Chunks sharing identical text share a row and are
+        returned together.
+        """
+
+        q = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        m = q.shape[0]
+        if k <= 0:
+            return [[] for _ in range(m)]
+        row_chunks, live = self._row_table()
+        best_scores = np.empty((m, 0), dtype=np.float32)
+        best_rows = np.empty((m, 0), dtype=np.int64)
+        vectors = self.vectors
+        for start in range(0, self.rows, block_rows):
+            block = np.asarray(vectors[start : start + block_rows], dtype=np.float32)
+            scores = q @ block.T
+            scores[:, ~live[start : start + len(block)]] = -np.inf
+            rows = np.broadcast_to(np.arange(start, start + len(block)), scores.shape)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            best_rows = np.concatenate([best_rows, rows], axis=1)
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+
+        results: List[List[Tuple[str, float]]] = []
+        for i in range(m):
+            order = np.argsort(-best_scores[i], kind="stable")
+            hits: List[Tuple[str, float]] = []
+            for j in order:
+                score = float(best_scores[i, j])
+                if score == -np.inf or len(hits) >= k:
+                    break
+                hits.extend((cid, score) for cid in row_chunks[int(best_rows[i, j])])
+            results.append(hits[:k])
+        return results
+
+    def search_text(self, texts: List[str], encoder: Encoder, k: int = 10) -> List[List[Tuple[str, float]]]:
+        if encoder.name != self.meta.get("encoder"):
+            raise ValueError(f"Store was built with {self.meta.get('encoder')!r}, not {encoder.name!r}")
+        return self.search(encoder.encode(texts), k)
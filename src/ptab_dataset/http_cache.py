@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from .config import Settings
+
+log = logging.getLogger(__name__)
+
+
+class CacheMiss(LookupError):
+    """replay-only(오프라인) 모드에서 캐시에 없는 요청을 만났을 때 발생합니다."""
+
+
+def _canonical_value(value: Any) -> Any:
+    # `filters`처럼 JSON 문자열로 직렬화된 파라미터는 공백/키 순서가 달라도 같은 키가 되도록 다시 직렬화합니다.
+    if isinstance(value, str) and value[:1] in ("[", "{"):
+        try:
+            return json.dumps(json.loads(value), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        except ValueError:
+            return value
+    if isinstance(value, (list, tuple)):
+        return [_canonical_value(v) for v in value]
+    return str(value)
+
+
+def cache_key(method: str, url: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    canonical = {str(k): _canonical_value(v) for k, v in (params or {}).items() if v is not None}
+    payload = json.dumps([method.upper(), url, canonical], ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    JSON API 응답용 디스크 캐시(선택 기능).
+
+    - 키: (method, url, 정규화된 params) → sha256. 항목은 `<root>/<key[:2]>/<key>.json.gz`에 gzip으로 저장합니다.
+    - ttl초가 지난 항목은 다시 요청합니다(ttl <= 0이면 만료 없음).
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 쓰이지 않은(LRU, 파일 mtime 기준) 항목부터 지웁니다.
+    - replay_only=True이면 네트워크 대신 캐시만 사용하며, 만료 여부와 관계없이 저장된 응답을 돌려주고
+      없으면 CacheMiss를 던집니다.
+    """
+
+    def __init__(self, root: str, *, ttl: float, max_bytes: int, replay_only: bool = False) -> None:
+        self.root = Path(root)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.replay_only = replay_only
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._sizes: Optional[Dict[Path, int]] = None
+        self._total = 0
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json.gz"
+
+    def get(self, method: str, url: str, params: Optional[Mapping[str, Any]] = None) -> Tuple[bool, Any]:
+        """(적중 여부, 응답 본문)을 돌려줍니다."""
+        path = self._path(cache_key(method, url, params))
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            entry = None
+        except (OSError, ValueError) as exc:
+            log.warning("캐시 항목 손상 path=%s err=%s", path, exc)
+            entry = None
+
+        if entry is not None and (self.replay_only or self.ttl <= 0 or time.time() - entry["stored_at"] < self.ttl):
+            try:
+                os.utime(path)  # LRU 순서 갱신
+            except OSError:
+                pass
+            return True, entry["body"]
+        if self.replay_only:
+            raise CacheMiss(f"캐시에 없는 요청입니다(replay-only): {method} {url} {dict(params or {})}")
+        return False, None
+
+    def put(self, method: str, url: str, params: Optional[Mapping[str, Any]], body: Any) -> None:
+        if self.replay_only:
+            return
+        path = self._path(cache_key(method, url, params))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "method": method.upper(),
+            "url": url,
+            "params": dict(params or {}),
+            "stored_at": time.time(),
+            "body": body,
+        }
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                f.write(json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+            raise
+        self._account(path)
+
+    def _account(self, path: Path) -> None:
+        with self._lock:
+            if self._sizes is None:
+                # 첫 기록 때 한 번만 디렉터리를 훑어 현재 크기를 파악합니다.
+                self._sizes = {p: p.stat().st_size for p in self.root.glob("*/*.json.gz")}
+                self._total = sum(self._sizes.values())
+            else:
+                size = path.stat().st_size
+                self._total += size - self._sizes.get(path, 0)
+                self._sizes[path] = size
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # 상한의 90%까지 줄여서 매 기록마다 축출이 일어나지 않게 합니다.
+        target = int(self.max_bytes * 0.9)
+        by_age = []
+        for p in self._sizes:
+            try:
+                by_age.append((p.stat().st_mtime, p))
+            except FileNotFoundError:
+                continue
+        by_age.sort()
+        for _, p in by_age:
+            if self._total <= target:
+                break
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
+            self._total -= self._sizes.pop(p, 0)
+
+
+_shared: Dict[Tuple[str, bool], ResponseCache] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_response_cache(settings: Settings) -> Optional[ResponseCache]:
+    """
+    settings에서 캐시가 켜져 있으면(http_cache 또는 offline) 같은 디렉터리를 쓰는 프로세스 공용 인스턴스를 돌려줍니다.
+    """
+    if not (settings.http_cache or settings.offline):
+        return None
+    root = settings.http_cache_dir or str(Path(settings.raw_dir) / "http_cache")
+    key = (os.path.abspath(root), settings.offline)
+    with _shared_lock:
+        cache = _shared.get(key)
+        if cache is None:
+            cache = ResponseCache(
+                root,
+                ttl=settings.http_cache_ttl,
+                max_bytes=settings.http_cache_max_bytes,
+                replay_only=settings.offline,
+            )
+            _shared[key] = cache
+        return cache
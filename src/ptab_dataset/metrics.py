@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# 히스토그램 구간(상한). 지연은 초, 바이트는 4배 간격, 페이지당 파싱 시간은 초 단위입니다.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+BYTES_BUCKETS = tuple(float(1024 * 4**i) for i in range(10))  # 1 KiB ~ 256 MiB
+PAGE_SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# 이름별 기본 구간. 여기에 없는 히스토그램은 LATENCY_BUCKETS를 씁니다.
+DEFAULT_BUCKETS: Dict[str, Sequence[float]] = {
+    "download_bytes": BYTES_BUCKETS,
+    "parse_seconds_per_page": PAGE_SECONDS_BUCKETS,
+}
+
+PROMETHEUS_PREFIX = "ptab_"
+_TRACE_LIMIT = 10000
+
+_Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> _Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    """고정 구간 히스토그램(구간별 개수 + 합계/개수/최솟값/최댓값). 잠금은 Metrics가 잡습니다."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막 칸은 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """구간 안에서 선형 보간한 분위수 추정값(관측이 없으면 None)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lo = self.buckets[i - 1] if i > 0 else min(self.min, self.buckets[0])
+                hi = self.buckets[i] if i < len(self.buckets) else self.max
+                lo, hi = max(lo, self.min), min(hi, self.max)
+                return lo + (hi - lo) * ((rank - seen) / n)
+            seen += n
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": {_format_bound(b): n for b, n in zip([*self.buckets, float("inf")], self.counts)},
+        }
+
+
+class Metrics:
+    """
+    파이프라인 계측용 카운터/게이지/히스토그램 모음(스레드 안전).
+
+    - inc(name, n, **labels): 누적 카운터(처리 건수, 상태 코드별 응답/재시도 수 등)
+    - set_gauge(name, value, **labels): 마지막 값과 최댓값을 함께 보관(큐 깊이 등)
+    - observe(name, value, **labels) / timer(name, **labels): 히스토그램(요청 지연, 다운로드 바이트, 파싱 시간 등)
+    - trace(stage, **fields): 페이지 단위 단계 기록(최근 _TRACE_LIMIT건)
+
+    관측 하나는 잠금 한 번과 dict 조회 한 번이라 운영 중에 켜 두어도 부담이 거의 없습니다.
+    report()는 JSON 실행 보고서(처리량 포함), prometheus_text()는 Prometheus 텍스트 형식을 만듭니다.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = time.time()
+            self._started = time.perf_counter()
+            self._counters: Dict[Tuple[str, _Labels], float] = {}
+            self._gauges: Dict[Tuple[str, _Labels], List[float]] = {}
+            self._histograms: Dict[Tuple[str, _Labels], Histogram] = {}
+            self._trace: Deque[Dict[str, Any]] = deque(maxlen=_TRACE_LIMIT)
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            gauge = self._gauges.get(key)
+            if gauge is None:
+                self._gauges[key] = [value, value]
+            else:
+                gauge[0] = value
+                gauge[1] = max(gauge[1], value)
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(DEFAULT_BUCKETS.get(name, LATENCY_BUCKETS))
+            hist.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def trace(self, stage: str, **fields: Any) -> None:
+        event = {"t": round(time.perf_counter() - self._started, 6), "stage": stage, **fields}
+        with self._lock:
+            self._trace.append(event)
+
+    def counter_value(self, name: str, **labels: Any) -> float:
+        with self._lock:
+            return self._counters.get((name, _labels(labels)), 0)
+
+    # -- 내보내기 ----------------------------------------------------------------------
+
+    def report(self, **extra: Any) -> Dict[str, Any]:
+        """JSON 실행 보고서. 카운터마다 실행 시간 대비 초당 처리량(rate)을 함께 넣습니다."""
+        elapsed = time.perf_counter() - self._started
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value, "rate": value / elapsed if elapsed else None}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            gauges = [
+                {"name": name, "labels": dict(labels), "value": value, "max": peak}
+                for (name, labels), (value, peak) in sorted(self._gauges.items())
+            ]
+            histograms = [
+                {"name": name, "labels": dict(labels), **hist.to_dict()}
+                for (name, labels), hist in sorted(self._histograms.items())
+            ]
+            trace = list(self._trace)
+        return {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+            "elapsed_seconds": elapsed,
+            **extra,
+            "counters": counters,
+            "gauges": gauges,
+            "histograms": histograms,
+            "trace": trace,
+        }
+
+    def write_report(self, path: Path, **extra: Any) -> Path:
+        path = Path(path)
+        _write_atomic(path, json.dumps(self.report(**extra), ensure_ascii=False, indent=2))
+        return path
+
+    def prometheus_text(self) -> str:
+        """Prometheus 텍스트 노출 형식(node_exporter textfile collector 등에서 읽을 수 있음)."""
+        lines: List[str] = []
+        typed = set()
+
+        def header(name: str, kind: str) -> None:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                metric = PROMETHEUS_PREFIX + name
+                header(metric, "counter")
+                lines.append(f"{metric}{_prom_labels(labels)} {_prom_value(value)}")
+            # 같은 이름의 줄이 한데 모여야 하므로 현재 값과 최댓값(<name>_max)을 따로 나열합니다.
+            for suffix, pick in (("", 0), ("_max", 1)):
+                for (name, labels), gauge in sorted(self._gauges.items()):
+                    metric = PROMETHEUS_PREFIX + name + suffix
+                    header(metric, "gauge")
+                    lines.append(f"{metric}{_prom_labels(labels)} {_prom_value(gauge[pick])}")
+            for (name, labels), hist in sorted(self._histograms.items()):
+                metric = PROMETHEUS_PREFIX + name
+                header(metric, "histogram")
+                cumulative = 0
+                for bound, n in zip([*hist.buckets, float("inf")], hist.counts):
+                    cumulative += n
+                    bucket_labels = labels + (("le", _format_bound(bound)),)
+                    lines.append(f"{metric}_bucket{_prom_labels(bucket_labels)} {cumulative}")
+                lines.append(f"{metric}_sum{_prom_labels(labels)} {_prom_value(hist.sum)}")
+                lines.append(f"{metric}_count{_prom_labels(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path) -> Path:
+        path = Path(path)
+        _write_atomic(path, self.prometheus_text())
+        return path
+
+
+def _format_bound(bound: float) -> str:
+    if bound == float("inf"):
+        return "+Inf"
+    return str(int(bound)) if float(bound).is_integer() else repr(float(bound))
+
+
+def _prom_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _prom_labels(labels: _Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    # 수집기가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체합니다.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# 프로세스 전체에서 공유하는 기본 레지스트리(클라이언트/다운로더/파이프라인이 함께 기록).
+METRICS = Metrics()
+
+
+def status_label(exc: Optional[BaseException]) -> str:
+    """재시도 원인 라벨: HTTP 상태 코드(requests/aiohttp 예외) 또는 예외 클래스 이름."""
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None) or getattr(exc, "status", None)
+    if isinstance(status, int):
+        return str(status)
+    return type(exc).__name__ if exc is not None else "unknown"
+
+
+def count_retry(op: str) -> Callable[[Any], None]:
+    """tenacity before_sleep 훅: 재시도할 때마다 http_retries_total{op, status}를 1 늘립니다."""
+
+    def before_sleep(retry_state: Any) -> None:
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        METRICS.inc("http_retries_total", op=op, status=status_label(exc))
+
+    return before_sleep
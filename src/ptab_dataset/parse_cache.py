@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import Executor
+from functools import partial
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+from .metrics import METRICS
+from .parser import (
+    EXTRACTOR_VERSION,
+    PARSE_MODES,
+    ParsedDecision,
+    ParseError,
+    decision_from_text,
+    head_tail_pages,
+    iter_pdf_pages,
+    ruleset_hash,
+)
+
+log = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS texts (
+    sha256 TEXT NOT NULL,
+    source TEXT NOT NULL,
+    extractor INTEGER NOT NULL,
+    text BLOB NOT NULL,
+    PRIMARY KEY (sha256, source)
+);
+CREATE TABLE IF NOT EXISTS results (
+    sha256 TEXT NOT NULL,
+    source TEXT NOT NULL,
+    ruleset TEXT NOT NULL,
+    statute_basis TEXT NOT NULL,
+    token_count INTEGER,
+    citations TEXT NOT NULL,
+    unpatentable_claims TEXT NOT NULL,
+    all_challenged INTEGER NOT NULL,
+    PRIMARY KEY (sha256, source, ruleset)
+);
+"""
+
+
+def text_source(mode: str, head_pages: int, tail_pages: int) -> str:
+    """어떤 페이지들에서 추출한 텍스트인지: "full" 또는 "head3-tail2"."""
+    return "full" if mode == "full" else f"head{head_pages}-tail{tail_pages}"
+
+
+class ParseCache:
+    """
+    PDF sha256 → 파싱 결과 캐시(SQLite, 기본 위치 raw_dir/parse_cache.sqlite3).
+
+    두 층으로 저장합니다.
+    - texts: (sha256, 추출 범위) → zlib 압축한 추출 텍스트. EXTRACTOR_VERSION이 다르면 무효.
+    - results: (sha256, 추출 범위, ruleset_hash()) → statute_basis, token_count, citations, 청구항 판단.
+
+    SCAN_RULES 등 규칙만 바뀌면 results만 무효가 되고, 그 결과는 캐시된 텍스트에서 PDF를 다시 읽지 않고
+    계산합니다. 열 때 현재 버전/규칙과 맞지 않는 행은 지웁니다.
+    """
+
+    FILENAME = "parse_cache.sqlite3"
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ruleset = ruleset_hash()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(results)")}
+            if columns and not {"citations", "unpatentable_claims"} <= columns:
+                # citations/청구항 컬럼이 없던 캐시: 결과는 캐시된 텍스트에서 다시 계산되므로 results만 새로 만듭니다.
+                self._conn.execute("DROP TABLE results")
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute("DELETE FROM texts WHERE extractor != ?", (EXTRACTOR_VERSION,))
+            self._conn.execute("DELETE FROM results WHERE ruleset != ?", (self.ruleset,))
+        self.hits = 0
+        self.text_hits = 0
+        self.misses = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get(self, sha256: str, source: str) -> Optional[ParsedDecision]:
+        """캐시된 결과. 결과가 없고 텍스트만 있으면 텍스트에서 다시 계산해 저장합니다. 둘 다 없으면 None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT statute_basis, token_count, citations, unpatentable_claims, all_challenged FROM results "
+                "WHERE sha256 = ? AND source = ? AND ruleset = ?",
+                (sha256, source, self.ruleset),
+            ).fetchone()
+            text_row = None
+            if row is None or source == "full":
+                text_row = self._conn.execute(
+                    "SELECT text FROM texts WHERE sha256 = ? AND source = ?", (sha256, source)
+                ).fetchone()
+        keep_text = source == "full"
+        if row is not None and (text_row is not None or not keep_text):
+            self.hits += 1
+            METRICS.inc("parse_cache_total", result="hit")
+            text = zlib.decompress(text_row[0]).decode("utf-8") if keep_text else None
+            return ParsedDecision(
+                text=text,
+                statute_basis=json.loads(row[0]),
+                token_count=row[1],
+                citations=json.loads(row[2]),
+                unpatentable_claims=json.loads(row[3]),
+                all_challenged=bool(row[4]),
+            )
+        if text_row is None:
+            self.misses += 1
+            METRICS.inc("parse_cache_total", result="miss")
+            return None
+        self.text_hits += 1
+        METRICS.inc("parse_cache_total", result="text_hit")
+        parsed = decision_from_text(zlib.decompress(text_row[0]).decode("utf-8"), keep_text=keep_text)
+        self._put_result(sha256, source, parsed)
+        return parsed
+
+    def put(self, sha256: str, source: str, text: str, parsed: ParsedDecision) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO texts (sha256, source, extractor, text) VALUES (?, ?, ?, ?)",
+                (sha256, source, EXTRACTOR_VERSION, zlib.compress(text.encode("utf-8"), 6)),
+            )
+        self._put_result(sha256, source, parsed)
+
+    def _put_result(self, sha256: str, source: str, parsed: ParsedDecision) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results "
+                "(sha256, source, ruleset, statute_basis, token_count, citations, unpatentable_claims, all_challenged) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    sha256,
+                    source,
+                    self.ruleset,
+                    json.dumps(parsed.statute_basis),
+                    parsed.token_count,
+                    json.dumps(parsed.citations, ensure_ascii=False),
+                    json.dumps(parsed.unpatentable_claims),
+                    int(parsed.all_challenged),
+                ),
+            )
+
+
+def _extract_and_parse(
+    path: str, mode: str, head_pages: int, tail_pages: int
+) -> Union[Tuple[str, ParsedDecision], ParseError]:
+    # parser._parse_path와 같지만 캐시에 넣을 추출 텍스트도 함께 돌려줍니다(metadata 모드는 앞/뒤 페이지 텍스트).
+    started = time.perf_counter()
+    try:
+        selection = head_tail_pages(head_pages, tail_pages) if mode == "metadata" else None
+        pages = [page_text for _, page_text in iter_pdf_pages(Path(path), selection)]
+        text = "\n".join(pages)
+        parsed = decision_from_text(text, keep_text=mode == "full")
+    except Exception as exc:  # noqa: BLE001
+        return ParseError(str(exc))
+    parsed.pages = len(pages)
+    parsed.parse_seconds = time.perf_counter() - started
+    return text, parsed
+
+
+def cached_parse_decisions(
+    paths: Sequence[Path],
+    digests: Sequence[str],
+    cache: ParseCache,
+    *,
+    executor: Optional[Executor] = None,
+    mode: str = "full",
+    head_pages: int = 3,
+    tail_pages: int = 2,
+) -> Iterator[Union[ParsedDecision, ParseError]]:
+    """
+    parser.parse_decisions와 같은 결과를 같은 순서로 내보내되, digests(PDF sha256)로 캐시를 먼저 봅니다.
+
+    캐시에 없는 PDF만 executor로 파싱하고 결과를 캐시에 넣습니다. 실패(ParseError)는 캐시하지 않습니다.
+    """
+    if mode not in PARSE_MODES:
+        raise ValueError(f"지원하지 않는 파싱 모드입니다: {mode!r}")
+    source = text_source(mode, head_pages, tail_pages)
+    cached: List[Optional[ParsedDecision]] = [cache.get(digest, source) for digest in digests]
+    todo = [str(path) for path, hit in zip(paths, cached) if hit is None]
+    parse = partial(_extract_and_parse, mode=mode, head_pages=head_pages, tail_pages=tail_pages)
+    parsed_iter = iter(executor.map(parse, todo) if executor is not None and todo else map(parse, todo))
+    for digest, hit in zip(digests, cached):
+        if hit is not None:
+            yield hit
+            continue
+        outcome = next(parsed_iter)
+        if isinstance(outcome, ParseError):
+            yield outcome
+            continue
+        text, parsed = outcome
+        cache.put(digest, source, text, parsed)
+        yield parsed
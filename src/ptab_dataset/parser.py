@@ -1,66 +1,477 @@
 from __future__ import annotations
 
+import hashlib
 import logging
 import re
-from dataclasses import dataclass
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
-from pypdf import PdfReader
-from rapidfuzz import fuzz
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+# pypdf/rapidfuzz와 프로세스 풀은 쓰는 함수 안에서 불러옵니다. 텍스트만 다루는 경로(decision_from_text,
+# 파싱 캐시의 text_hit, CitationScanner)는 PDF 스택 없이 import됩니다.
 
 log = logging.getLogger(__name__)
 
-STATUTE_PATTERNS = [
-    (re.compile(r"\b35\s+U\.?S\.?C\.?\s*§?\s*102\b", re.IGNORECASE), "102"),
-    (re.compile(r"\b35\s+U\.?S\.?C\.?\s*§?\s*103\b", re.IGNORECASE), "103"),
-    (re.compile(r"\b35\s+U\.?S\.?C\.?\s*§?\s*112\b", re.IGNORECASE), "112"),
-]
+# 심판 근거로 보는 35 U.S.C. 조문. statute_basis는 이 순서로 나열됩니다.
+STATUTE_SECTIONS = ("101", "102", "103", "112")
+
+# "35 U.S.C. § 103" 사이 공백은 PDF 양쪽 정렬로 수십 칸까지 벌어지므로 넉넉히 받고, 목록 구분자 공백은 짧게 둡니다.
+# 두 상한을 합친 최장 매치(약 470자)가 _SCAN_OVERLAP 안에 들어가야 합니다.
+_WS = r"\s{0,40}"
+_LIST_WS = r"\s{0,8}"
+_SECTION = r"(?:101|102|103|112)\b(?:\s?\([A-Za-z0-9]{1,4}\)){0,3}(?:\s{0,3}¶{1,2}\s{0,3}\d{1,2}\b)?"
+_LIST_SEP = rf"(?:{_LIST_WS},{_LIST_WS}|{_LIST_WS},?\s{{1,3}}(?:and|or|&)\s{{1,3}})"
+_PATENT_NUMBER = (
+    r"(?:RE\s?\d{2},\d{3}|\d{1,2},\d{3},\d{3}|\d{4}/\d{7}|WO\s?\d{4}/\d{5,6}|EP\s?\d(?:\s?\d{3}){2})\b"
+)
+
+
+@dataclass(frozen=True)
+class ScanRule:
+    """
+    CitationScanner 규칙 하나.
+
+    - kind: 히트 종류(정규식 그룹 이름으로 쓰이므로 식별자여야 함)
+    - pattern: 캡처 그룹 없는 정규식. 길이가 _SCAN_OVERLAP 안으로 제한되어야 페이지 경계를 넘는 매치도 잡힙니다.
+    - item: 매치된 구간 안에서 개별 항목을 뽑는 정규식("§§ 102 and 103" → 102, 103). 그룹이 있으면 그룹 1이 라벨,
+      없으면 매치 문자열에서 공백·쉼표·슬래시를 뺀 값이 라벨입니다.
+    - triggers: 매치가 시작할 수 있는 첫 글자들(한 번에 훑을 때 이 글자 위치에서만 규칙을 시도합니다)
+    """
+
+    kind: str
+    pattern: str
+    item: str
+    triggers: str
+
+
+SCAN_RULES = (
+    # 35 U.S.C. § 103(a), 35 U.S.C. §§ 102(a)(1) and 103, 35 U.S.C. § 112 ¶ 2 (U.S.C.는 대소문자 무시)
+    ScanRule(
+        "statute",
+        rf"35\s{{1,40}}(?i:U\.?S\.?C\.?){_WS}(?:§§?{_WS})?{_SECTION}(?:{_LIST_SEP}(?:§{_LIST_WS})?{_SECTION}){{0,5}}",
+        r"(101|102|103|112)\b(?:\s?\([A-Za-z0-9]{1,4}\)){0,3}(?:\s{0,3}¶{1,2}\s{0,3}\d{1,2}\b)?",
+        "3",
+    ),
+    # 선행 기술 문헌: U.S. Patent No. 7,123,456 / U.S. Pub. No. 2005/0123456 / US RE45,123 / WO 2004/012345 / EP 1 234 567
+    ScanRule(
+        "reference",
+        r"(?:U\.?S\.?\s{0,3}(?:(?:Pat(?:ent)?|Pub(?:lication)?|App(?:l(?:ication)?)?)\.?\s{0,3}){0,4}"
+        rf"(?:Nos?\.?\s{{0,3}})?|(?=WO|EP)){_PATENT_NUMBER}(?:{_LIST_SEP}{_PATENT_NUMBER}){{0,10}}",
+        _PATENT_NUMBER,
+        "UWE",
+    ),
+    # 증거 번호: Ex. 1003 / Exs. 1003, 1004 / Exhibit 2001
+    ScanRule(
+        "exhibit",
+        r"E[xX](?:hibits?|s)?\.?\s{0,3}\d{4}\b(?:(?:\s{0,3}[,–-]\s{0,3}|\s{1,3}and\s{1,3})\d{4}\b){0,10}",
+        r"\d{4}",
+        "E",
+    ),
+)
+
+# "claims 1-5 unpatentable"뿐 아니라 "claims 1-5, 7 are unpatentable", "claims 1–3 and 9 unpatentable",
+# "claims 2 through 4 unpatentable"처럼 쉼표/and로 이은 번호·범위 목록과 be동사도 받습니다.
+_CLAIM_SPEC = r"\d+(?:\s*(?:-|–|—|through|to)\s*\d+)?"
+_CLAIM_SEP = r"(?:\s*,\s*(?:and\s+)?|\s+and\s+)"
+CLAIM_PATTERN = re.compile(
+    rf"claim[s]?\s+({_CLAIM_SPEC}(?:{_CLAIM_SEP}{_CLAIM_SPEC})*)\s+(?:(?:are|is|were|was|remain)\s+)?unpatentable",
+    re.IGNORECASE,
+)
+ALL_CHALLENGED_PHRASE = "all challenged claims"
+ALL_CHALLENGED_THRESHOLD = 80
+
+# 파싱 캐시 키에 들어가는 버전: 텍스트 추출 방식이 바뀌면 EXTRACTOR_VERSION, 추출된 텍스트에서
+# statute_basis/token_count를 뽑는 규칙이 (패턴 목록 밖에서) 바뀌면 PARSER_VERSION을 올립니다.
+EXTRACTOR_VERSION = 1
+PARSER_VERSION = 2
+
+
+# 파싱 모드: full은 전체 페이지 본문까지, metadata는 앞/뒤 몇 페이지만 읽어 statute_basis만 뽑습니다.
+PARSE_MODES = ("full", "metadata")
 
 
 @dataclass
 class ParsedDecision:
-    text: str
+    # metadata 모드에서는 본문을 추출하지 않으므로 text/token_count가 None입니다.
+    text: Optional[str]
     statute_basis: List[str]
-    token_count: int
+    token_count: Optional[int]
+    # CitationScan.summary(): [{"kind", "label", "count"}, ...] (처음 나온 순서)
+    citations: List[Dict[str, Any]] = field(default_factory=list)
+    # ClaimFindings.claim_numbers()(범위를 펼친 청구항 번호, 오름차순)와 "all challenged claims" 언급 여부
+    unpatentable_claims: List[int] = field(default_factory=list)
+    all_challenged: bool = False
+    # 계측용(출력 레코드에는 넣지 않음): 추출한 페이지 수, PDF 한 건 파싱에 걸린 시간(캐시 적중이면 None)
+    pages: Optional[int] = None
+    parse_seconds: Optional[float] = None
 
 
-def extract_text_from_pdf(path: Path) -> str:
+@dataclass
+class CitationHit:
+    kind: str
+    label: str
+    text: str
+    # 스캔한 전체 텍스트(페이지를 "\n"으로 이어 붙인 것) 기준 위치
+    start: int
+    end: int
+
+
+@dataclass
+class CitationScan:
+    hits: List[CitationHit]
+
+    def counts(self) -> Dict[Tuple[str, str], int]:
+        """(kind, label) → 등장 횟수(처음 나온 순서)."""
+        counts: Dict[Tuple[str, str], int] = {}
+        for hit in self.hits:
+            key = (hit.kind, hit.label)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def labels(self, kind: str) -> List[str]:
+        return list(dict.fromkeys(hit.label for hit in self.hits if hit.kind == kind))
+
+    def summary(self) -> List[Dict[str, Any]]:
+        return [{"kind": kind, "label": label, "count": n} for (kind, label), n in self.counts().items()]
+
+
+@dataclass
+class ClaimFindings:
+    # unpatentable: CLAIM_PATTERN에서 잡힌 번호/범위 목록 문자열(등장 순서, 중복 제거 전)
+    unpatentable: List[str]
+    all_challenged: bool
+
+    def claim_numbers(self) -> List[int]:
+        """unpatentable의 범위를 펼친 청구항 번호(오름차순, 중복 없음)."""
+        return sorted({n for spec in self.unpatentable for n in expand_claim_ranges(spec)})
+
+
+class ParseError(Exception):
+    """워커 프로세스에서 난 파싱 실패를 (pickle 가능한 형태로) 돌려줄 때 사용합니다."""
+
+
+def iter_pdf_pages(path: Path, pages: Optional[Iterable[int]] = None) -> Iterator[Tuple[int, str]]:
+    """
+    (페이지 번호, 텍스트)를 한 페이지씩 추출해 내보냅니다.
+
+    pages를 주면 그 페이지만(0부터, 음수는 뒤에서부터, 중복 없이 오름차순으로) 추출합니다.
+    소비자가 중간에 멈추면 나머지 페이지는 추출하지 않습니다. 추출에 실패한 페이지는 경고만 남기고 건너뜁니다.
+    """
+    from pypdf import PdfReader
+
     reader = PdfReader(str(path))
-    texts = []
-    for page in reader.pages:
+    n_pages = len(reader.pages)
+    numbers: Iterable[int] = range(n_pages)
+    if pages is not None:
+        numbers = sorted({p % n_pages for p in pages if -n_pages <= p < n_pages})
+    for number in numbers:
         try:
-            texts.append(page.extract_text() or "")
+            yield number, reader.pages[number].extract_text() or ""
         except Exception as exc:  # noqa: BLE001
-            log.warning("PDF 추출 실패 page=%s err=%s", page, exc)
-    return "\n".join(texts)
+            log.warning("PDF 추출 실패 page=%s err=%s", number, exc)
+
+
+def extract_text_from_pdf(path: Path) -> str:
+    return "\n".join(text for _, text in iter_pdf_pages(path))
+
+
+# 스트리밍 스캔에서 다음 페이지를 기다리며 남겨 두는 꼬리 길이. 규칙 하나의 매치 길이가 이보다 짧아야 합니다.
+_SCAN_OVERLAP = 512
+
+
+class CitationScanner:
+    """
+    SCAN_RULES(조문·선행 문헌·증거 번호)를 정규식 하나로 합쳐 텍스트를 한 번만 훑는 스캐너.
+
+    합친 정규식은 규칙들의 첫 글자(triggers) 집합을 전방 탐색으로 앞에 두어, 그 글자가 나오는 위치에서만
+    각 규칙을 시도합니다. 그래서 규칙을 더해도 전체 텍스트를 다시 훑지 않고, 비용은 트리거 위치 수에 비례합니다.
+    매치마다 규칙의 item 정규식으로 개별 히트를 뽑습니다.
+
+    scan(text)는 한 번에, stream()은 페이지를 받는 대로 훑습니다(결과는 페이지를 "\n"으로 이어 scan한 것과 같음).
+    """
+
+    def __init__(self, rules: Sequence[ScanRule] = SCAN_RULES) -> None:
+        self.rules = {rule.kind: rule for rule in rules}
+        self._items = {rule.kind: re.compile(rule.item) for rule in rules}
+        triggers = "".join(sorted({c for rule in rules for c in rule.triggers}))
+        branches = "|".join(f"(?P<{rule.kind}>{rule.pattern})" for rule in rules)
+        self.pattern = re.compile(rf"(?=[{re.escape(triggers)}])(?<!\w)(?:{branches})")
+
+    def _hits(self, text: str, pos: int, end: int, base: int) -> Iterator[Tuple[int, List[CitationHit]]]:
+        # 시작 위치가 end보다 앞인 매치마다 (매치 끝, 히트들)을 내보냅니다. 위치는 base를 더한 전체 기준입니다.
+        for m in self.pattern.finditer(text, pos):
+            if m.start() >= end:
+                return
+            kind = m.lastgroup
+            hits = []
+            for item in self._items[kind].finditer(m.group()):
+                label = item.group(1) if item.re.groups else re.sub(r"[\s,/]", "", item.group())
+                start = base + m.start() + item.start()
+                hits.append(CitationHit(kind, label, item.group(), start, start + len(item.group())))
+            yield m.end(), hits
+
+    def scan(self, text: str) -> CitationScan:
+        return CitationScan([hit for _, hits in self._hits(text, 0, len(text), 0) for hit in hits])
+
+    def stream(self) -> "CitationStream":
+        return CitationStream(self)
+
+    def scan_pages(self, pages: Iterable[str]) -> CitationScan:
+        stream = self.stream()
+        for page in pages:
+            stream.feed(page)
+        return stream.close()
+
+
+class CitationStream:
+    """
+    CitationScanner의 스트리밍 상태. feed(page)로 페이지를 넣고 close()로 결과를 받습니다.
+
+    버퍼에는 아직 확정하지 못한 꼬리(_SCAN_OVERLAP)와 앞 글자 하나(단어 경계 판정용)만 남기므로
+    메모리는 페이지 하나 분량입니다.
+    """
+
+    def __init__(self, scanner: CitationScanner) -> None:
+        self.scanner = scanner
+        self.hits: List[CitationHit] = []
+        self._buf = ""
+        self._base = 0  # _buf[0]의 전체 텍스트 기준 위치
+        self._pos = 0  # _buf에서 다음에 훑을 위치
+        self._pages = 0
+
+    def feed(self, page: str) -> None:
+        self._buf += ("\n" if self._pages else "") + page
+        self._pages += 1
+        self._advance(len(self._buf) - _SCAN_OVERLAP)
+
+    def close(self) -> CitationScan:
+        self._advance(len(self._buf))
+        return CitationScan(self.hits)
+
+    def _advance(self, end: int) -> None:
+        # end 앞에서 시작하는 매치는 뒤 페이지와 무관하게 확정되므로 내보내고, 그 뒤는 다음 feed까지 남겨 둡니다.
+        if end <= self._pos:
+            return
+        resume = end
+        for match_end, hits in self.scanner._hits(self._buf, self._pos, end, self._base):
+            self.hits.extend(hits)
+            resume = max(resume, match_end)
+        keep = max(resume - 1, 0)
+        self._base += keep
+        self._buf = self._buf[keep:]
+        self._pos = resume - keep
+
+
+SCANNER = CitationScanner()
 
 
 def detect_statutes(text: str) -> List[str]:
-    found: List[str] = []
-    for pattern, label in STATUTE_PATTERNS:
-        if pattern.search(text):
-            found.append(label)
-    return found
+    return _statute_basis(SCANNER.scan(text))
+
+
+def _statute_basis(scan: CitationScan) -> List[str]:
+    found = set(scan.labels("statute"))
+    return [section for section in STATUTE_SECTIONS if section in found]
+
+
+def ruleset_hash() -> str:
+    """SCAN_RULES·청구항 규칙·PARSER_VERSION의 해시. 규칙이 바뀌면 값이 바뀌어 캐시된 분석 결과가 무효가 됩니다."""
+    h = hashlib.sha256(f"parser={PARSER_VERSION}\0{','.join(STATUTE_SECTIONS)}".encode())
+    for rule in SCAN_RULES:
+        h.update(f"\0{rule.kind}\0{rule.pattern}\0{rule.item}\0{rule.triggers}".encode("utf-8"))
+    h.update(f"\0{CLAIM_PATTERN.pattern}\0{CLAIM_PATTERN.flags}".encode("utf-8"))
+    h.update(f"\0{ALL_CHALLENGED_PHRASE}\0{ALL_CHALLENGED_THRESHOLD}".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+_CLAIM_RANGE_RE = re.compile(r"(\d+)(?:\s*(?:-|–|—|through|to)\s*(\d+))?", re.IGNORECASE)
+_MAX_CLAIM_RANGE = 1000
+
+# ALL_CHALLENGED_PHRASE의 모든 부분 문자열과 문자 집합. 줄이 부분 문자열이면 partial_ratio가 100이고,
+# 문구와 겹치는 문자가 하나도 없으면 0이므로 두 경우 모두 퍼지 비교 없이 결정됩니다.
+_PHRASE_SUBSTRINGS = frozenset(
+    ALL_CHALLENGED_PHRASE[i:j]
+    for i in range(len(ALL_CHALLENGED_PHRASE))
+    for j in range(i + 1, len(ALL_CHALLENGED_PHRASE) + 1)
+)
+_PHRASE_CHARS = frozenset(ALL_CHALLENGED_PHRASE)
+# 문구보다 긴 줄은 여러 줄을 이어 붙인 블록으로 먼저 걸러냅니다. 어떤 줄이 기준(80)을 넘으면 그 줄을 담은 블록의
+# partial_ratio는 최소 30/42(≈71.4)이므로, 블록 점수가 이보다 낮으면 블록 안의 줄은 모두 기준 이하입니다.
+_BLOCK_CUTOFF = 71
+_BLOCK_LINES = 64
+
+
+def expand_claim_ranges(spec: str) -> List[int]:
+    """"1-5, 7", "1–3 and 9", "2 through 4" 같은 청구항 범위를 번호 목록으로 펼칩니다(지나치게 큰 범위는 양 끝만)."""
+    numbers: List[int] = []
+    for m in _CLAIM_RANGE_RE.finditer(spec):
+        lo = int(m.group(1))
+        hi = int(m.group(2)) if m.group(2) else lo
+        lo, hi = min(lo, hi), max(lo, hi)
+        numbers.extend(range(lo, hi + 1) if hi - lo <= _MAX_CLAIM_RANGE else (lo, hi))
+    return list(dict.fromkeys(numbers))
+
+
+def _mentions_all_challenged(text: str) -> bool:
+    """
+    어떤 줄이든 partial_ratio(줄.lower(), ALL_CHALLENGED_PHRASE) > ALL_CHALLENGED_THRESHOLD인지.
+
+    줄마다 퍼지 비교를 하는 대신 (1) 문구가 그대로 있는지, (2) 줄이 문구의 부분 문자열인지 먼저 확인하고,
+    (3) 남은 줄 중 문구와 겹치는 문자가 있는 줄만 중복을 없애고, 긴 줄은 블록 단위로 걸러낸 뒤
+    rapidfuzz의 extractOne으로 한 번에 점수를 냅니다.
+    결과는 줄 단위 비교와 같습니다(partial_ratio는 인자 순서에 대해 대칭).
+    """
+    from rapidfuzz import fuzz, process
+
+    lowered = text.lower()
+    if ALL_CHALLENGED_PHRASE in lowered:
+        return True
+    candidates = set()
+    for line in lowered.splitlines():
+        if line in _PHRASE_SUBSTRINGS:
+            return True
+        if not _PHRASE_CHARS.isdisjoint(line):
+            candidates.add(line)
+    short = [line for line in candidates if len(line) < len(ALL_CHALLENGED_PHRASE)]
+    long_lines = [line for line in candidates if len(line) >= len(ALL_CHALLENGED_PHRASE)]
+    for i in range(0, len(long_lines), _BLOCK_LINES):
+        block = long_lines[i : i + _BLOCK_LINES]
+        if fuzz.partial_ratio(ALL_CHALLENGED_PHRASE, "\n".join(block), score_cutoff=_BLOCK_CUTOFF):
+            short.extend(block)
+    if not short:
+        return False
+    best = process.extractOne(
+        ALL_CHALLENGED_PHRASE, short, scorer=fuzz.partial_ratio, score_cutoff=ALL_CHALLENGED_THRESHOLD
+    )
+    return best is not None and best[1] > ALL_CHALLENGED_THRESHOLD
+
+
+def extract_claims(text: str) -> ClaimFindings:
+    return ClaimFindings(unpatentable=CLAIM_PATTERN.findall(text), all_challenged=_mentions_all_challenged(text))
 
 
 def fuzzy_claims(text: str) -> List[str]:
-    claims = []
-    claim_match = re.findall(r"claim[s]?\s+(\d+(?:-\d+)?)\s+unpatentable", text, flags=re.IGNORECASE)
-    for c in claim_match:
-        claims.append(c)
+    return _claim_labels(extract_claims(text))
+
+
+def _claim_labels(findings: ClaimFindings) -> List[str]:
+    claims = list(findings.unpatentable)
     # 보정: "all challenged claims" 등 표현을 감지하면 ALL 표시
-    if any(fuzz.partial_ratio(line.lower(), "all challenged claims") > 80 for line in text.splitlines()):
+    if findings.all_challenged:
         claims.append("ALL_CHALLENGED")
     return list(dict.fromkeys(claims))  # 중복 제거
 
 
-def parse_decision(path: Path) -> ParsedDecision:
-    text = extract_text_from_pdf(path)
-    statutes = detect_statutes(text)
-    claims = fuzzy_claims(text)
-    tokens = len(text.split())
-    if claims:
+def decision_from_text(text: str, *, keep_text: bool = True) -> ParsedDecision:
+    """추출된 텍스트에서 결정문 메타데이터를 뽑습니다. keep_text=False이면 text/token_count를 비워 둡니다."""
+    return _decision(text, SCANNER.scan(text), keep_text=keep_text)
+
+
+def _decision(text: str, scan: CitationScan, *, keep_text: bool) -> ParsedDecision:
+    statutes = _statute_basis(scan)
+    findings = extract_claims(text)
+    if _claim_labels(findings):
         statutes = statutes or ["103"]  # 클레임 언급만 있을 경우 기본값 가정
-    return ParsedDecision(text=text, statute_basis=statutes, token_count=tokens)
+    return ParsedDecision(
+        text=text if keep_text else None,
+        statute_basis=statutes,
+        token_count=len(text.split()) if keep_text else None,
+        citations=scan.summary(),
+        unpatentable_claims=findings.claim_numbers(),
+        all_challenged=findings.all_challenged,
+    )
+
+
+def head_tail_pages(head_pages: int, tail_pages: int) -> List[int]:
+    """iter_pdf_pages에 넘길 앞 head_pages, 뒤 tail_pages 페이지 번호(뒤쪽은 음수)."""
+    return [*range(head_pages), *range(-tail_pages, 0)]
+
+
+def extract_head_tail_text(path: Path, *, head_pages: int = 3, tail_pages: int = 2) -> str:
+    return "\n".join(page_text for _, page_text in iter_pdf_pages(path, head_tail_pages(head_pages, tail_pages)))
+
+
+def parse_decision(path: Path) -> ParsedDecision:
+    # 페이지를 추출하는 대로 스캐너에 넣어, 조문/인용 스캔을 위해 이어 붙인 본문을 다시 훑지 않습니다.
+    stream = SCANNER.stream()
+    pages = []
+    for _, page_text in iter_pdf_pages(path):
+        pages.append(page_text)
+        stream.feed(page_text)
+    decision = _decision("\n".join(pages), stream.close(), keep_text=True)
+    decision.pages = len(pages)
+    return decision
+
+
+def parse_decision_metadata(path: Path, *, head_pages: int = 3, tail_pages: int = 2) -> ParsedDecision:
+    """
+    앞 head_pages, 뒤 tail_pages 페이지만 추출해 statute_basis·citations를 뽑습니다(본문 text/token_count는 None).
+
+    심판 근거 조문과 청구항 판단은 보통 첫 페이지들과 결론 페이지에 나오므로, 가운데 페이지를 건너뛰어
+    긴 결정문일수록 전체 추출보다 몇 배 빠릅니다. 가운데에만 나오는 조문은 놓칠 수 있습니다.
+    """
+    pages = [page_text for _, page_text in iter_pdf_pages(path, head_tail_pages(head_pages, tail_pages))]
+    decision = decision_from_text("\n".join(pages), keep_text=False)
+    decision.pages = len(pages)
+    return decision
+
+
+def _parse_path(
+    path: str, mode: str = "full", head_pages: int = 3, tail_pages: int = 2
+) -> Union[ParsedDecision, ParseError]:
+    # 워커에는 PDF 바이트 대신 경로만 넘기고, 예외도 결과로 돌려 한 건의 실패가 map 전체를 끊지 않게 합니다.
+    started = time.perf_counter()
+    try:
+        if mode == "metadata":
+            decision = parse_decision_metadata(Path(path), head_pages=head_pages, tail_pages=tail_pages)
+        else:
+            decision = parse_decision(Path(path))
+    except Exception as exc:  # noqa: BLE001
+        return ParseError(str(exc))
+    # 워커 프로세스의 지표는 부모에 보이지 않으므로 소요 시간을 결과에 실어 보냅니다.
+    decision.parse_seconds = time.perf_counter() - started
+    return decision
+
+
+def make_parse_executor(workers: int) -> Optional[ProcessPoolExecutor]:
+    """
+    workers > 1이면 PDF 파싱용 프로세스 풀을 만듭니다(1 이하이면 None → 현재 프로세스에서 파싱).
+
+    파이프라인은 다른 스레드가 도는 중에 풀을 쓰므로 fork 대신 spawn으로 워커를 띄웁니다.
+    """
+    if workers <= 1:
+        return None
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def parse_decisions(
+    paths: Sequence[Path],
+    *,
+    executor: Optional[Executor] = None,
+    mode: str = "full",
+    head_pages: int = 3,
+    tail_pages: int = 2,
+) -> Iterator[Union[ParsedDecision, ParseError]]:
+    """
+    여러 PDF를 파싱해 제출 순서대로 결과(또는 ParseError)를 내보냅니다.
 
+    executor가 주어지면 병렬로 파싱하되 순서는 유지되므로 JSONL 출력이 실행마다 동일합니다.
+    mode="metadata"이면 parse_decision_metadata(앞/뒤 페이지만)로 파싱합니다.
+    """
+    if mode not in PARSE_MODES:
+        raise ValueError(f"지원하지 않는 파싱 모드입니다: {mode!r}")
+    parse = partial(_parse_path, mode=mode, head_pages=head_pages, tail_pages=tail_pages)
+    if executor is None:
+        for path in paths:
+            yield parse(str(path))
+        return
+    yield from executor.map(parse, [str(p) for p in paths])
@@ -7,6 +7,9 @@ import requests
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from .config import Settings
+from .http_cache import ResponseCache, shared_response_cache
+from .metrics import count_retry
+from .ratelimit import RateLimiter, shared_rate_limiter, wait_retry_after
 
 log = logging.getLogger(__name__)
 
@@ -19,8 +22,16 @@ class PatentsViewClient:
     - 키는 Settings.patentsview_api_key (환경 변수 PATENTSVIEW_API_KEY)로 주입합니다.
     """
 
-    def __init__(self, settings: Settings) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+    ) -> None:
         self.settings = settings
+        self.limiter = limiter or shared_rate_limiter(settings)
+        self.cache = cache or shared_response_cache(settings)
         self.session = requests.Session()
         self.session.headers.update(
             {
@@ -33,12 +44,28 @@ class PatentsViewClient:
             # 기본은 Authorization Bearer로 두고 필요 시 변경하도록 합니다.
             self.session.headers.update({"Authorization": f"Bearer {self.settings.patentsview_api_key}"})
 
-    @retry(wait=wait_exponential(multiplier=1, min=1, max=20), stop=stop_after_attempt(5))
     def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         if not self.settings.patentsview_base_url:
             raise ValueError("patentsview_base_url이 비어 있습니다.")
         url = f"{self.settings.patentsview_base_url.rstrip('/')}/{path.lstrip('/')}"
-        resp = self.session.get(url, params=params, timeout=self.settings.timeout, verify=self.settings.verify_tls)
+        if self.cache is not None:
+            hit, body = self.cache.get("GET", url, params)
+            if hit:
+                return body
+        body = self._request(url, params)
+        if self.cache is not None:
+            self.cache.put("GET", url, params, body)
+        return body
+
+    @retry(
+        wait=wait_retry_after(wait_exponential(multiplier=1, min=1, max=20)),
+        stop=stop_after_attempt(5),
+        before_sleep=count_retry("patentsview"),
+    )
+    def _request(self, url: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        with self.limiter.request(url, op="patentsview") as permit:
+            resp = self.session.get(url, params=params, timeout=self.settings.timeout, verify=self.settings.verify_tls)
+            permit.observe(resp.status_code, resp.headers.get("Retry-After"))
         if resp.status_code >= 400:
             log.warning("PatentsView API 오류 status=%s url=%s body=%s", resp.status_code, url, resp.text[:500])
         resp.raise_for_status()
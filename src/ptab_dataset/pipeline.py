@@ -2,21 +2,240 @@ from __future__ import annotations
 
 import argparse
 import logging
+import queue
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
-from rich import print  # noqa: T201
-from tqdm import trange
-
-from .api import PTABClient
 from .config import Settings
-from .downloader import DecisionDownloader
-from .parser import parse_decision
+from .metrics import METRICS
+from .state import DOWNLOADED, PARSED, StateStore
 from .storage import Storage
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+if TYPE_CHECKING:
+    from .api import PTABClient
+    from .parse_cache import ParseCache
+    from .parser import ParsedDecision, ParseError
+
+# HTTP(requests/tenacity), PDF(pypdf/rapidfuzz), 콘솔(rich/tqdm) 스택은 실제로 쓰는 함수 안에서 불러옵니다.
+# 파싱 워커(spawn)도 이 모듈을 다시 import하므로, 모듈 import만으로는 무거운 의존성을 싣지 않습니다.
 log = logging.getLogger(__name__)
 
+# 단계 사이 큐에서 "더 이상 작업 없음"을 알리는 표식
+_DONE = object()
+_POLL_SECONDS = 0.2
+
+
+def extract_decision_urls(docs: List[Dict[str, Any]]) -> List[str]:
+    decision_urls = []
+    for doc in docs:
+        bag = doc.get("patentTrialDocumentDataBag", [])
+        for item in bag:
+            if item.get("documentTypeDescriptionText") == "Final Written Decision":
+                decision_urls.append(item.get("documentLinkText"))
+                break
+    return decision_urls
+
+
+def _decision_record(url: str, digest: str, parsed: ParsedDecision) -> Dict[str, Any]:
+    return {
+        "url": url,
+        "sha256": digest,
+        "statute_basis": parsed.statute_basis,
+        "token_count": parsed.token_count,
+        "citations": parsed.citations,
+        "unpatentable_claims": parsed.unpatentable_claims,
+        "all_challenged": parsed.all_challenged,
+        "text": parsed.text,
+    }
+
+
+def _parse_options(settings: Settings) -> Dict[str, Any]:
+    return {
+        "mode": settings.parse_mode,
+        "head_pages": settings.metadata_head_pages,
+        "tail_pages": settings.metadata_tail_pages,
+    }
+
+
+def _print(message: str) -> None:
+    from rich import print as rich_print
+
+    rich_print(message)
+
+
+def _open_parse_cache(settings: Settings) -> Optional[ParseCache]:
+    from .parse_cache import ParseCache
+
+    return ParseCache(Path(settings.raw_dir) / ParseCache.FILENAME) if settings.parse_cache else None
+
+
+def _parse_files(
+    files: List[Tuple[str, str, Path]], executor: Any, settings: Settings, cache: Optional[ParseCache]
+) -> Iterator[Union[ParsedDecision, ParseError]]:
+    # files는 (url, sha256, 경로) 목록. 캐시가 있으면 sha256으로 먼저 찾고 없는 것만 파싱합니다.
+    from .parse_cache import cached_parse_decisions
+    from .parser import parse_decisions
+
+    paths = [f[2] for f in files]
+    if cache is None:
+        return parse_decisions(paths, executor=executor, **_parse_options(settings))
+    return cached_parse_decisions(paths, [f[1] for f in files], cache, executor=executor, **_parse_options(settings))
+
+
+def _pending(
+    state: StateStore, urls: List[str], *, replay: bool = False
+) -> Tuple[List[str], List[Tuple[str, str, Path]]]:
+    """
+    urls를 (내려받을 URL, 이미 받아 둔 (url, sha256, 경로))로 나눕니다(페이지가 아니라 문서 단위로 재개).
+
+    이전 실행에서 파싱·저장까지 끝난 문서는 건너뛰고, 다운로드까지 끝난 문서는 저장된 PDF로 바로 파싱합니다.
+    replay=True(오프라인 재생)이면 파싱된 문서도 건너뛰지 않고 저장된 PDF로 다시 파싱합니다.
+    """
+    rows = state.lookup(urls)
+    to_download: List[str] = []
+    ready: List[Tuple[str, str, Path]] = []
+    skipped = 0
+    kept = (DOWNLOADED, PARSED) if replay else (DOWNLOADED,)
+    for url in urls:
+        row = rows.get(url)
+        if row is not None and row["state"] == PARSED and not replay:
+            skipped += 1
+        elif row is not None and row["state"] in kept and row["path"] and Path(row["path"]).exists():
+            ready.append((url, row["sha256"], Path(row["path"])))
+        else:
+            to_download.append(url)
+    if skipped:
+        log.info("이미 처리된 문서 %s건을 건너뜁니다.", skipped)
+        METRICS.inc("documents_total", skipped, stage="skipped")
+    if ready:
+        log.info("이미 받아 둔 문서 %s건은 다시 받지 않고 파싱합니다.", len(ready))
+    return to_download, ready
+
+
+def _record_parsed(parsed: ParsedDecision) -> None:
+    METRICS.inc("documents_total", stage="parsed")
+    if parsed.parse_seconds is None:
+        return
+    METRICS.observe("parse_seconds", parsed.parse_seconds)
+    if parsed.pages:
+        METRICS.inc("pdf_pages_total", parsed.pages)
+        METRICS.observe("parse_seconds_per_page", parsed.parse_seconds / parsed.pages)
+
+
+def _report_settings(settings: Settings) -> Dict[str, Any]:
+    # 보고서에 남길 설정(비교에 필요한 동시성/형식 값만, API 키 등은 제외).
+    keys = (
+        "fetch_workers",
+        "max_workers",
+        "parse_workers",
+        "queue_size",
+        "date_shard_days",
+        "async_downloads",
+        "parse_mode",
+        "parse_cache",
+        "output_format",
+    )
+    return {key: getattr(settings, key) for key in keys}
+
+
+def _export_metrics(settings: Settings, report_name: Optional[str] = None, **extra: Any) -> None:
+    # report_name이 있으면(실행 끝) JSON 보고서도 씁니다. Prometheus 텍스트 파일은 호출될 때마다 갱신합니다.
+    if settings.prometheus_textfile:
+        METRICS.write_prometheus(Path(settings.prometheus_textfile))
+    if report_name and settings.run_report:
+        path = METRICS.write_report(Path(settings.processed_dir) / "reports" / report_name, **extra)
+        log.info("실행 보고서: %s", path)
+
+
+class _StageQueue(queue.Queue):
+    """단계 사이 bounded 큐. 이름은 큐 깊이/대기 시간 지표의 라벨로 쓰입니다."""
+
+    def __init__(self, name: str, maxsize: int) -> None:
+        super().__init__(maxsize=maxsize)
+        self.name = name
+
+
+def _put(q: _StageQueue, item: Any, stop: threading.Event) -> bool:
+    # 하류 단계가 실패해 멈춘 경우 bounded 큐에서 영원히 막히지 않도록 주기적으로 stop을 확인합니다.
+    # 넣기까지 기다린 시간이 길면 하류 단계가 병목입니다(queue_wait_seconds{op="put"}).
+    with METRICS.timer("queue_wait_seconds", queue=q.name, op="put"):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                METRICS.set_gauge("queue_depth", q.qsize(), queue=q.name)
+                return True
+            except queue.Full:
+                continue
+    return False
+
+
+def _get(q: _StageQueue, stop: threading.Event) -> Any:
+    # 꺼내기까지 기다린 시간이 길면 상류 단계가 병목입니다(queue_wait_seconds{op="get"}).
+    with METRICS.timer("queue_wait_seconds", queue=q.name, op="get"):
+        while not stop.is_set():
+            try:
+                item = q.get(timeout=_POLL_SECONDS)
+                METRICS.set_gauge("queue_depth", q.qsize(), queue=q.name)
+                return item
+            except queue.Empty:
+                continue
+    return _DONE
+
+
+class _Stage(threading.Thread):
+    """
+    예외를 잡아 두었다가 메인 스레드에서 다시 올릴 수 있게 하는 단계 스레드.
+
+    실패한 단계도 하류 큐에 _DONE을 넣으므로, 이미 넘어간 페이지는 끝까지 처리된 뒤 예외가 올라갑니다.
+    """
+
+    def __init__(self, name: str, target: Callable[[], None]) -> None:
+        super().__init__(name=name, daemon=True)
+        self._target_fn = target
+        self.error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        try:
+            self._target_fn()
+        except BaseException as exc:  # noqa: BLE001
+            self.error = exc
+
+
+def _sharded_pages(
+    client: PTABClient,
+    *,
+    since: str,
+    until: str | None,
+    shard_days: int,
+    start_page: int,
+    max_pages: int,
+    rows: int,
+    workers: int,
+) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    iter_sharded_decision_pages의 (구간, 구간 안 페이지) 결과를 1부터 이어지는 페이지 번호로 바꿔 내보냅니다.
+
+    체크포인트와 출력 파일은 이 번호를 쓰므로 start_page 앞의 페이지는 조회만 하고 건너뜁니다.
+    """
+    from .api import iter_sharded_decision_pages
+
+    if max_pages <= 0:
+        return
+    shards = iter_sharded_decision_pages(
+        client, since=since, until=until, shard_days=shard_days, rows=rows, workers=workers
+    )
+    try:
+        for page, (_, _, docs) in enumerate(shards, start=1):
+            if page < start_page:
+                continue
+            yield page, docs
+            if page >= start_page + max_pages - 1:
+                return
+    finally:
+        shards.close()
+
 
 def run_pipeline(
     *,
@@ -26,73 +245,466 @@ def run_pipeline(
     rows: int,
     dry_run: bool,
     override_api_key: str | None,
+    fetch_workers: int | None = None,
+    download_workers: int | None = None,
+    parse_workers: int | None = None,
+    queue_size: int | None = None,
+    date_shard_days: int | None = None,
+    async_downloads: bool | None = None,
+    http_cache: bool | None = None,
+    offline: bool | None = None,
+    output_format: str | None = None,
+    shard_compression: str | None = None,
+    parse_mode: str | None = None,
+    prometheus_textfile: str | None = None,
+    start_page: int | None = None,
+    processed_dir: str | None = None,
 ) -> None:
+    """
+    조회 → 다운로드 → 파싱/저장 파이프라인을 실행합니다.
+
+    start_page를 주지 않으면 상태 저장소의 last_page 다음 페이지부터 조회합니다. offline=True이면 캐시된
+    페이지를 처음부터 다시 재생하도록 last_page를 무시하고(기본 1페이지부터), 이미 파싱된 문서도 다시 파싱해
+    페이지 출력을 새로 씁니다. processed_dir을 주면 출력과 상태 저장소를 그 디렉터리에 둡니다.
+    """
     settings = Settings.from_env(override_api_key=override_api_key)
+    if fetch_workers is not None:
+        settings.fetch_workers = fetch_workers
+    if download_workers is not None:
+        settings.max_workers = download_workers
+    if parse_workers is not None:
+        settings.parse_workers = parse_workers
+    if queue_size is not None:
+        settings.queue_size = queue_size
+    if date_shard_days is not None:
+        settings.date_shard_days = date_shard_days
+    if async_downloads is not None:
+        settings.async_downloads = async_downloads
+    if http_cache is not None:
+        settings.http_cache = http_cache
+    if offline is not None:
+        settings.offline = offline
+    if output_format is not None:
+        settings.output_format = output_format
+    if shard_compression is not None:
+        settings.shard_compression = shard_compression
+    if parse_mode is not None:
+        settings.parse_mode = parse_mode
+    if prometheus_textfile is not None:
+        settings.prometheus_textfile = prometheus_textfile
+    if processed_dir is not None:
+        settings.processed_dir = processed_dir
+    replay = settings.offline
+
+    from tqdm import tqdm
+
+    from .api import PTABClient, iter_decision_pages
+
+    METRICS.reset()
     storage = Storage(settings)
     client = PTABClient(settings)
-    downloader = DecisionDownloader(settings)
-
-    start_page = storage.load_checkpoint() + 1
-    retry_queue: List[Dict] = []
-
-    for page in trange(start_page, start_page + max_pages, desc="pages"):
-        resp = client.search_decisions(since=since, until=until, page=page, rows=rows)
-        docs = resp.get("results", [])
-        if not docs:
-            log.info("더 이상 결과가 없습니다. page=%s", page)
-            break
-
-        decision_urls = []
-        for doc in docs:
-            bag = doc.get("patentTrialDocumentDataBag", [])
-            for item in bag:
-                if item.get("documentTypeDescriptionText") == "Final Written Decision":
-                    decision_urls.append(item.get("documentLinkText"))
-                    break
-
-        if dry_run:
-            log.info("page=%s decisions=%s (dry-run)", page, len(decision_urls))
+
+    # last_page는 새 페이지 조회를 어디서 시작할지에 대한 힌트입니다. 무엇을 다시 처리할지는 문서 상태로 정합니다.
+    # 오프라인 재생은 캐시된 페이지를 처음부터 다시 읽으므로 힌트를 쓰지 않습니다.
+    if start_page is None:
+        start_page = 1 if replay else storage.load_checkpoint() + 1
+    if settings.date_shard_days > 0:
+        pages = _sharded_pages(
+            client,
+            since=since,
+            until=until,
+            shard_days=settings.date_shard_days,
+            start_page=start_page,
+            max_pages=max_pages,
+            rows=rows,
+            workers=settings.fetch_workers,
+        )
+    else:
+        pages = iter_decision_pages(
+            client,
+            since=since,
+            until=until,
+            start_page=start_page,
+            max_pages=max_pages,
+            rows=rows,
+            workers=settings.fetch_workers,
+        )
+
+    if dry_run:
+        for page, docs in tqdm(pages, total=max_pages, desc="pages"):
+            log.info("page=%s decisions=%s (dry-run)", page, len(extract_decision_urls(docs)))
             storage.save_checkpoint(page)
-            continue
+        storage.close()
+        _print("[green]파이프라인이 완료되었습니다.[/green]")
+        return
 
-        downloaded = downloader.batch_download(decision_urls)
-        processed_records = []
-        for dl in downloaded:
-            try:
-                file_path = downloader.persist(dl, ext=".pdf")
-                parsed = parse_decision(file_path)
-                processed_records.append(
-                    {
-                        "url": dl["url"],
-                        "sha256": dl["sha256"],
-                        "statute_basis": parsed.statute_basis,
-                        "token_count": parsed.token_count,
-                        "text": parsed.text,
-                    }
+    from .downloader import DecisionDownloader
+    from .parser import ParseError, make_parse_executor
+
+    state = storage.state
+    # 이전 실행에서 발견·다운로드만 되고 저장되지 않은 문서는 페이지 조회 전에 한 묶음(page=None)으로 먼저 처리합니다.
+    # 오프라인 재생은 그 문서들이 든 페이지도 다시 읽으므로 따로 묶지 않습니다.
+    resumed = [] if replay else [row["url"] for row in state.unfinished()]
+    if resumed:
+        log.info("이전 실행에서 끝나지 않은 문서 %s건을 다시 처리합니다.", len(resumed))
+    resumed_set = set(resumed)
+
+    def download_failed(url: str, exc: Exception) -> None:
+        METRICS.inc("documents_total", stage="download_failed")
+        state.mark_failed(url, "download", str(exc))
+
+    # 조회 → 다운로드 → 파싱/저장의 3단계를 bounded 큐로 연결합니다.
+    # 페이지 N을 파싱하는 동안 N+1을 다운로드하고 N+2를 조회하므로 총 소요 시간이
+    # (네트워크 대기 + 파싱)의 합이 아니라 둘 중 큰 쪽에 가까워집니다.
+    stop = threading.Event()
+    url_q = _StageQueue("url", max(1, settings.queue_size))
+    file_q = _StageQueue("file", max(1, settings.queue_size))
+
+    def fetch_stage() -> None:
+        try:
+            if resumed and not _put(url_q, (None, resumed), stop):
+                return
+            for page, docs in pages:
+                decision_urls = extract_decision_urls(docs)
+                state.discover(page, decision_urls)
+                # 재개 묶음에 이미 들어간 문서는 이 페이지에서 다시 처리하지 않습니다.
+                decision_urls = [url for url in decision_urls if url not in resumed_set]
+                METRICS.inc("pages_total", stage="fetched")
+                METRICS.inc("documents_total", len(decision_urls), stage="discovered")
+                METRICS.trace("fetch", page=page, documents=len(decision_urls))
+                if not _put(url_q, (page, decision_urls), stop):
+                    return
+        finally:
+            pages.close()
+            _put(url_q, _DONE, stop)
+
+    def record_download(page: Optional[int], files: List[Tuple[str, str, Path]], started: float) -> None:
+        seconds = time.perf_counter() - started
+        METRICS.observe("stage_seconds", seconds, stage="download")
+        METRICS.inc("documents_total", len(files), stage="downloaded")
+        METRICS.trace("download", page=page, documents=len(files), seconds=round(seconds, 6))
+
+    def download_pages() -> None:
+        downloader = DecisionDownloader(settings)
+        while (item := _get(url_q, stop)) is not _DONE:
+            page, decision_urls = item
+            started = time.perf_counter()
+            to_download, files = _pending(state, decision_urls, replay=replay)
+            for dl in downloader.batch_download(to_download, on_error=download_failed):
+                try:
+                    path = downloader.persist(dl, ext=".pdf")
+                except Exception as exc:  # noqa: BLE001
+                    log.warning("저장 실패 url=%s err=%s", dl["url"], exc)
+                    download_failed(dl["url"], exc)
+                    continue
+                state.mark_downloaded(dl["url"], dl["sha256"], path)
+                files.append((dl["url"], dl["sha256"], path))
+            record_download(page, files, started)
+            if not _put(file_q, (page, files), stop):
+                return
+
+    async def download_pages_async() -> None:
+        # 선택 의존성(aiohttp)이므로 비동기 모드일 때만 불러옵니다.
+        import asyncio
+
+        from .async_http import AsyncDecisionDownloader, AsyncHTTP
+
+        async with AsyncHTTP(settings) as http:
+            downloader = AsyncDecisionDownloader(settings, http)
+            while (item := await asyncio.to_thread(_get, url_q, stop)) is not _DONE:
+                page, decision_urls = item
+                started = time.perf_counter()
+                to_download, files = _pending(state, decision_urls, replay=replay)
+                downloaded = await downloader.batch_download(to_download, on_error=download_failed)
+                for dl in downloaded:
+                    state.mark_downloaded(dl["url"], dl["sha256"], Path(dl["path"]))
+                    files.append((dl["url"], dl["sha256"], Path(dl["path"])))
+                record_download(page, files, started)
+                if not await asyncio.to_thread(_put, file_q, (page, files), stop):
+                    return
+
+    def download_stage() -> None:
+        try:
+            if settings.async_downloads:
+                import asyncio
+
+                asyncio.run(download_pages_async())
+            else:
+                download_pages()
+        finally:
+            _put(file_q, _DONE, stop)
+
+    stages = [_Stage("fetch", fetch_stage), _Stage("download", download_stage)]
+    for stage in stages:
+        stage.start()
+
+    parse_ex = make_parse_executor(settings.parse_workers)
+    parse_cache = _open_parse_cache(settings)
+    completed = False
+    try:
+        with tqdm(total=max_pages, desc="pages") as bar:
+            while (item := _get(file_q, stop)) is not _DONE:
+                page, files = item
+                started = time.perf_counter()
+                processed_records = []
+                # 결과는 제출 순서대로 돌아오므로 페이지 내 레코드 순서가 유지됩니다.
+                for (url, digest, _), parsed in zip(files, _parse_files(files, parse_ex, settings, parse_cache)):
+                    if isinstance(parsed, ParseError):
+                        log.warning("파싱 실패 url=%s err=%s", url, parsed)
+                        METRICS.inc("documents_total", stage="parse_failed")
+                        state.mark_failed(url, "parse", str(parsed))
+                        continue
+                    _record_parsed(parsed)
+                    processed_records.append(_decision_record(url, digest, parsed))
+                parsed_at = time.perf_counter()
+
+                parsed_urls = [rec["url"] for rec in processed_records]
+                if page is None:
+                    # 재개 묶음은 페이지가 아니므로 별도 파일에 저장하고 last_page는 건드리지 않습니다.
+                    stem = Path(settings.processed_dir) / f"decisions_resume_{time.strftime('%Y%m%dT%H%M%S')}"
+                    storage.save_decisions(processed_records, stem)
+                    state.mark_parsed(parsed_urls)
+                else:
+                    stem = Path(settings.processed_dir) / f"decisions_page_{page}"
+                    storage.save_decisions(processed_records, stem, replace=replay)
+                    # 출력이 저장된 뒤에 문서 parsed 표시와 last_page를 한 트랜잭션으로 남깁니다.
+                    state.page_done(page, parsed_urls)
+                    METRICS.inc("pages_total", stage="saved")
+                saved_at = time.perf_counter()
+                METRICS.observe("stage_seconds", parsed_at - started, stage="parse")
+                METRICS.observe("stage_seconds", saved_at - parsed_at, stage="save")
+                METRICS.trace(
+                    "save",
+                    page=page,
+                    documents=len(processed_records),
+                    parse_seconds=round(parsed_at - started, 6),
+                    save_seconds=round(saved_at - parsed_at, 6),
                 )
-            except Exception as exc:  # noqa: BLE001
-                log.warning("파싱 실패 url=%s err=%s", dl["url"], exc)
-                retry_queue.append({"url": dl["url"], "reason": str(exc)})
+                _export_metrics(settings)
+                if page is not None:
+                    bar.update(1)
+        completed = True
+    finally:
+        stop.set()
+        for stage in stages:
+            stage.join()
+        if parse_ex is not None:
+            parse_ex.shutdown()
+        if parse_cache is not None:
+            parse_cache.close()
+        failed = len(state.failures())
+        _export_metrics(
+            settings,
+            f"run_{time.strftime('%Y%m%dT%H%M%S')}.json",
+            command="run",
+            completed=completed and all(stage.error is None for stage in stages),
+            config=_report_settings(settings),
+            documents=state.counts(),
+        )
+        storage.close()
+
+    for stage in stages:
+        if stage.error is not None:
+            raise stage.error
 
-        out_path = Path(settings.processed_dir) / f"decisions_page_{page}.jsonl"
-        storage.save_jsonl(processed_records, out_path)
-        storage.save_checkpoint(page)
+    if failed:
+        _print(f"[yellow]실패 큐에 {failed}건이 있습니다(--retry-failed로 재시도).[/yellow]")
+    _print("[green]파이프라인이 완료되었습니다.[/green]")
 
-    if retry_queue:
-        storage.save_retry_queue(retry_queue)
-        print(f"[yellow]재시도 큐 {len(retry_queue)}건이 기록되었습니다.[/yellow]")
-    print("[green]파이프라인이 완료되었습니다.[/green]")
+
+def retry_failed(
+    *,
+    override_api_key: str | None,
+    max_attempts: int = 3,
+    download_workers: int | None = None,
+    parse_workers: int | None = None,
+    output_format: str | None = None,
+    shard_compression: str | None = None,
+    parse_mode: str | None = None,
+    prometheus_textfile: str | None = None,
+    processed_dir: str | None = None,
+) -> None:
+    """
+    상태 저장소의 실패 큐(시도 횟수 < max_attempts)를 다시 처리합니다.
+
+    다운로드에서 실패한 문서는 스레드 풀(max_workers)로 동시에 다시 받고, 파싱에서 실패한 문서는 저장된 PDF를 그대로 씁니다.
+    파싱은 parse_workers 프로세스로 나눠 수행하며, 성공한 레코드는 processed_dir/decisions_retry_<시각>에 저장합니다.
+    다시 실패한 문서는 시도 횟수가 늘어난 채 큐에 남습니다.
+    """
+    settings = Settings.from_env(override_api_key=override_api_key)
+    if download_workers is not None:
+        settings.max_workers = download_workers
+    if parse_workers is not None:
+        settings.parse_workers = parse_workers
+    if output_format is not None:
+        settings.output_format = output_format
+    if shard_compression is not None:
+        settings.shard_compression = shard_compression
+    if parse_mode is not None:
+        settings.parse_mode = parse_mode
+    if prometheus_textfile is not None:
+        settings.prometheus_textfile = prometheus_textfile
+    if processed_dir is not None:
+        settings.processed_dir = processed_dir
+
+    METRICS.reset()
+    storage = Storage(settings)
+    state = storage.state
+    items = state.failures(max_attempts=max_attempts)
+    if not items:
+        storage.close()
+        _print("[green]재시도할 실패 항목이 없습니다.[/green]")
+        return
+
+    from .downloader import DecisionDownloader
+    from .parser import ParseError, make_parse_executor
+
+    files = []
+    to_download = []
+    for item in items:
+        if item["failed_stage"] == "parse" and item["path"] and Path(item["path"]).exists():
+            files.append((item["url"], item["sha256"], Path(item["path"])))
+        else:
+            to_download.append(item["url"])
+
+    records: List[Dict[str, Any]] = []
+    parse_ex = make_parse_executor(settings.parse_workers)
+    parse_cache = _open_parse_cache(settings)
+    completed = False
+    try:
+        downloader = DecisionDownloader(settings)
+
+        def download_failed(url: str, exc: Exception) -> None:
+            METRICS.inc("documents_total", stage="download_failed")
+            state.mark_failed(url, "download", str(exc))
+
+        with METRICS.timer("stage_seconds", stage="download"):
+            for dl in downloader.batch_download(to_download, on_error=download_failed):
+                try:
+                    path = downloader.persist(dl, ext=".pdf")
+                except Exception as exc:  # noqa: BLE001
+                    log.warning("저장 실패 url=%s err=%s", dl["url"], exc)
+                    download_failed(dl["url"], exc)
+                    continue
+                state.mark_downloaded(dl["url"], dl["sha256"], path)
+                METRICS.inc("documents_total", stage="downloaded")
+                files.append((dl["url"], dl["sha256"], path))
+
+        with METRICS.timer("stage_seconds", stage="parse"):
+            for (url, digest, _), parsed in zip(files, _parse_files(files, parse_ex, settings, parse_cache)):
+                if isinstance(parsed, ParseError):
+                    log.warning("파싱 실패 url=%s err=%s", url, parsed)
+                    METRICS.inc("documents_total", stage="parse_failed")
+                    state.mark_failed(url, "parse", str(parsed))
+                    continue
+                _record_parsed(parsed)
+                records.append(_decision_record(url, digest, parsed))
+
+        if records:
+            stem = Path(settings.processed_dir) / f"decisions_retry_{time.strftime('%Y%m%dT%H%M%S')}"
+            with METRICS.timer("stage_seconds", stage="save"):
+                storage.save_decisions(records, stem)
+                state.mark_parsed([rec["url"] for rec in records])
+        completed = True
+    finally:
+        if parse_ex is not None:
+            parse_ex.shutdown()
+        if parse_cache is not None:
+            parse_cache.close()
+        remaining = len(state.failures())
+        _export_metrics(
+            settings,
+            f"retry_{time.strftime('%Y%m%dT%H%M%S')}.json",
+            command="retry",
+            completed=completed,
+            config=_report_settings(settings),
+            documents=state.counts(),
+        )
+        storage.close()
+
+    _print(f"[green]재시도 {len(items)}건 중 {len(records)}건을 처리했습니다.[/green]")
+    if remaining:
+        _print(f"[yellow]실패 큐에 {remaining}건이 남아 있습니다.[/yellow]")
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="PTAB 무효 심판 데이터셋 구축 파이프라인")
-    parser.add_argument("--since", required=True, help="YYYY-MM-DD 형식의 시작일")
+    parser.add_argument("--since", help="YYYY-MM-DD 형식의 시작일(--retry-failed가 아니면 필수)")
     parser.add_argument("--until", help="YYYY-MM-DD 형식의 종료일")
     parser.add_argument("--max-pages", type=int, default=1, help="조회할 최대 페이지 수")
     parser.add_argument("--rows", type=int, default=100, help="페이지당 행 수")
+    parser.add_argument(
+        "--start-page", type=int, help="조회를 시작할 페이지(기본: 마지막으로 저장한 페이지 다음, --offline이면 1)"
+    )
+    parser.add_argument("--processed-dir", help="출력과 상태 저장소(state.sqlite3)를 둘 디렉터리(기본: data/processed)")
     parser.add_argument("--dry-run", action="store_true", help="다운로드/저장을 수행하지 않고 요약만 출력")
     parser.add_argument("--api-key", help="USPTO API 키(환경 변수 대신 인자로 주입)")
+    parser.add_argument("--fetch-workers", type=int, help="동시에 미리 조회할 페이지 수")
+    parser.add_argument("--download-workers", type=int, help="PDF 다운로드 동시 요청 수(max_workers)")
+    parser.add_argument("--parse-workers", type=int, help="PDF 파싱 프로세스 수(1이면 메인 프로세스에서 파싱)")
+    parser.add_argument("--queue-size", type=int, help="단계 사이 큐에 쌓아 둘 최대 페이지 수")
+    parser.add_argument(
+        "--date-shard-days",
+        type=int,
+        help="since~until을 이 일수 단위 구간으로 나눠 구간별 첫 페이지를 함께 조회(페이지 번호는 구간을 이어 붙인 순서)",
+    )
+    parser.add_argument(
+        "--async-downloads",
+        action="store_true",
+        default=None,
+        help="스레드 대신 aiohttp 연결 풀로 PDF를 내려받기(선택 의존성 aiohttp 필요)",
+    )
+    parser.add_argument(
+        "--http-cache", action="store_true", default=None, help="search-decisions 응답을 raw_dir/http_cache에 캐시"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        default=None,
+        help="네트워크 없이 HTTP 캐시와 다운로드 인덱스만으로 재실행(replay-only)",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=["jsonl", "parquet", "shards"],
+        help="결정문 저장 형식(parquet: pyarrow 필요, zstd 압축 컬럼형 / shards: 압축 샤드 + sha256/url 인덱스)",
+    )
+    parser.add_argument(
+        "--shard-compression", choices=["zstd", "gzip", "none"], help="shards 형식의 압축(zstd는 zstandard 필요)"
+    )
+    parser.add_argument(
+        "--parse-mode",
+        choices=["full", "metadata"],
+        help="metadata: 앞/뒤 페이지만 읽어 statute_basis만 추출(본문 text 없음, 전체 추출보다 빠름)",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="조회 없이 상태 저장소의 실패 큐(다운로드/파싱 실패)만 다시 처리",
+    )
+    parser.add_argument("--max-attempts", type=int, default=3, help="--retry-failed에서 이 횟수 이상 실패한 문서는 제외")
+    parser.add_argument(
+        "--prometheus-textfile",
+        help="실행 지표를 페이지마다 이 경로에 Prometheus 텍스트 형식으로 갱신(JSON 보고서는 processed_dir/reports)",
+    )
     args = parser.parse_args()
+    # 로깅 설정은 라이브러리 import가 아니라 CLI 진입점에서만 합니다.
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+
+    if args.retry_failed:
+        retry_failed(
+            override_api_key=args.api_key,
+            max_attempts=args.max_attempts,
+            download_workers=args.download_workers,
+            parse_workers=args.parse_workers,
+            output_format=args.output_format,
+            shard_compression=args.shard_compression,
+            parse_mode=args.parse_mode,
+            prometheus_textfile=args.prometheus_textfile,
+            processed_dir=args.processed_dir,
+        )
+        return
+    if not args.since:
+        parser.error("--since가 필요합니다.")
 
     run_pipeline(
         since=args.since,
@@ -101,9 +713,22 @@ def main() -> None:
         rows=args.rows,
         dry_run=args.dry_run,
         override_api_key=args.api_key,
+        fetch_workers=args.fetch_workers,
+        download_workers=args.download_workers,
+        parse_workers=args.parse_workers,
+        queue_size=args.queue_size,
+        date_shard_days=args.date_shard_days,
+        async_downloads=args.async_downloads,
+        http_cache=args.http_cache,
+        offline=args.offline,
+        start_page=args.start_page,
+        processed_dir=args.processed_dir,
+        output_format=args.output_format,
+        shard_compression=args.shard_compression,
+        parse_mode=args.parse_mode,
+        prometheus_textfile=args.prometheus_textfile,
     )
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+from tenacity import RetryCallState
+from tenacity.wait import wait_base
+
+from .config import Settings
+from .metrics import METRICS
+
+log = logging.getLogger(__name__)
+
+# 429/5xx 이후 Retry-After가 없을 때 호스트 전체를 잠시 멈추는 기본 시간(초)
+_DEFAULT_PENALTY_SECONDS = 1.0
+_POLL_SECONDS = 0.05
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After 헤더(초 또는 HTTP-date)를 대기 초로 바꿉니다. 해석할 수 없으면 None."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def retry_after_from_exception(exc: Optional[BaseException]) -> Optional[float]:
+    # requests.HTTPError는 .response.headers, aiohttp.ClientResponseError는 .headers를 가집니다.
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or getattr(exc, "headers", None)
+    if not headers:
+        return None
+    return parse_retry_after(headers.get("Retry-After"))
+
+
+class wait_retry_after(wait_base):
+    """
+    tenacity wait 전략: 마지막 예외에 Retry-After가 있으면 그 시간만큼, 없으면 fallback 전략대로 기다립니다.
+    """
+
+    def __init__(self, fallback: wait_base, *, max_wait: float = 300.0) -> None:
+        self.fallback = fallback
+        self.max_wait = max_wait
+
+    def __call__(self, retry_state: RetryCallState) -> float:
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        delay = retry_after_from_exception(exc)
+        if delay is not None:
+            return min(delay, self.max_wait)
+        return self.fallback(retry_state)
+
+
+class HostLimiter:
+    """
+    한 호스트에 대한 token bucket(초당 요청 수) + 적응형 동시성 상한(AIMD).
+
+    - rate <= 0이면 초당 요청 수 제한 없이 동시성 상한만 적용합니다.
+    - 429/5xx가 나면 동시성 상한을 절반으로 줄이고(최소 1), 429는 Retry-After 동안 호스트 전체를 멈춥니다.
+    - 성공 응답마다 상한을 1/limit씩 늘려, 상한 한 번 분량의 성공마다 1씩 회복합니다(최대 max_concurrency).
+    """
+
+    def __init__(self, host: str, *, rate: float, burst: float, max_concurrency: int) -> None:
+        self.host = host
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = float(self.max_concurrency)
+        self.tokens = self.burst
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._last_refill = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _try_acquire(self) -> float:
+        """슬롯을 얻으면 0, 아니면 다시 시도할 때까지 기다릴 초를 돌려줍니다. _cond를 잡은 상태에서 호출합니다."""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.in_flight >= int(self.limit):
+            return _POLL_SECONDS
+        if self.rate > 0:
+            self.tokens = min(self.burst, self.tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            if self.tokens < 1.0:
+                return (1.0 - self.tokens) / self.rate
+            self.tokens -= 1.0
+        self.in_flight += 1
+        return 0.0
+
+    def acquire(self) -> None:
+        with self._cond:
+            while (delay := self._try_acquire()) > 0:
+                self._cond.wait(timeout=delay)
+
+    async def acquire_async(self) -> None:
+        while True:
+            with self._cond:
+                delay = self._try_acquire()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    def release(self, status: Optional[int], retry_after: Optional[str] = None) -> None:
+        """
+        요청 하나를 마치고 결과를 반영합니다. status가 None이면 연결 오류 등 응답 없이 실패한 경우입니다.
+        """
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            throttled = status == 429
+            failed = status is None or throttled or status >= 500
+            if failed:
+                new_limit = max(1.0, self.limit / 2)
+                if new_limit < self.limit:
+                    log.info("동시성 축소 host=%s status=%s limit=%.0f→%.0f", self.host, status, self.limit, new_limit)
+                self.limit = new_limit
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+            if throttled:
+                delay = parse_retry_after(retry_after)
+                pause = _DEFAULT_PENALTY_SECONDS if delay is None else delay
+                self.paused_until = max(self.paused_until, time.monotonic() + pause)
+                # 토큰도 비워서 멈춤이 끝난 직후 한꺼번에 몰리지 않게 합니다.
+                self.tokens = 0.0
+            self._cond.notify_all()
+
+
+class _Permit:
+    """limiter.request() 블록 안에서 응답 상태를 기록하는 용도."""
+
+    def __init__(self) -> None:
+        self.status: Optional[int] = None
+        self.retry_after: Optional[str] = None
+
+    def observe(self, status: int, retry_after: Optional[str] = None) -> None:
+        self.status = status
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """
+    호스트별 HostLimiter 모음. 같은 프로세스의 API 클라이언트/다운로더가 하나를 공유합니다.
+
+    초당 요청 수는 Settings.rate_limits(호스트 → req/s)에서, 없으면 Settings.default_rate_limit에서 가져옵니다.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self._hosts: Dict[str, HostLimiter] = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url: str) -> HostLimiter:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            limiter = self._hosts.get(host)
+            if limiter is None:
+                rate = self.settings.rate_limits.get(host, self.settings.default_rate_limit)
+                limiter = HostLimiter(
+                    host,
+                    rate=rate,
+                    burst=self.settings.rate_limit_burst or max(1.0, rate),
+                    max_concurrency=self.settings.max_concurrency_per_host,
+                )
+                self._hosts[host] = limiter
+            return limiter
+
+    @contextmanager
+    def request(self, url: str, *, op: str = "http") -> Iterator[_Permit]:
+        """
+        호스트 슬롯을 얻은 뒤 블록을 실행합니다. op는 지표 라벨(예: "ptab_api", "download")입니다.
+
+        슬롯 대기 시간(rate_limit_wait_seconds), 블록 실행 시간(http_request_seconds), 상태 코드별 응답 수
+        (http_responses_total, 응답 없이 실패하면 status="error")를 기록합니다.
+        """
+        limiter = self.for_url(url)
+        started = time.perf_counter()
+        limiter.acquire()
+        permit = _Permit()
+        acquired = time.perf_counter()
+        try:
+            yield permit
+        finally:
+            limiter.release(permit.status, permit.retry_after)
+            _record(op, limiter, permit.status, started, acquired)
+
+    @asynccontextmanager
+    async def request_async(self, url: str, *, op: str = "http") -> AsyncIterator[_Permit]:
+        limiter = self.for_url(url)
+        started = time.perf_counter()
+        await limiter.acquire_async()
+        permit = _Permit()
+        acquired = time.perf_counter()
+        try:
+            yield permit
+        finally:
+            limiter.release(permit.status, permit.retry_after)
+            _record(op, limiter, permit.status, started, acquired)
+
+
+def _record(op: str, limiter: HostLimiter, status: Optional[int], started: float, acquired: float) -> None:
+    now = time.perf_counter()
+    host = limiter.host
+    METRICS.observe("rate_limit_wait_seconds", acquired - started, op=op, host=host)
+    METRICS.observe("http_request_seconds", now - acquired, op=op, host=host)
+    METRICS.inc("http_responses_total", op=op, host=host, status="error" if status is None else status)
+    METRICS.set_gauge("host_concurrency_limit", int(limiter.limit), host=host)
+
+
+_shared: Dict[tuple, RateLimiter] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_rate_limiter(settings: Settings) -> RateLimiter:
+    """
+    프로세스 전체에서 공유하는 RateLimiter. 속도 제한 설정(rate_limits, default_rate_limit, rate_limit_burst,
+    max_concurrency_per_host)이 같은 settings끼리 같은 인스턴스를 받습니다.
+    """
+    key = (
+        tuple(sorted(settings.rate_limits.items())),
+        settings.default_rate_limit,
+        settings.rate_limit_burst,
+        settings.max_concurrency_per_host,
+    )
+    with _shared_lock:
+        limiter = _shared.get(key)
+        if limiter is None:
+            limiter = RateLimiter(settings)
+            _shared[key] = limiter
+        return limiter
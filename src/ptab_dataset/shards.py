@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - 선택 의존성
+    zstandard = None
+
+_SUFFIXES = {"zstd": ".jsonl.zst", "gzip": ".jsonl.gz", "none": ".jsonl"}
+
+
+def _check_compression(compression: str) -> None:
+    if compression not in _SUFFIXES:
+        raise ValueError(f"지원하지 않는 압축 방식입니다: {compression!r} (zstd, gzip, none)")
+    if compression == "zstd" and zstandard is None:
+        raise ImportError("zstd 샤드에는 zstandard가 필요합니다: pip install 'ptab-dataset[zstd]'")
+
+
+def _compress(data: bytes, compression: str, level: int) -> bytes:
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    return data
+
+
+def _decompress(data: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    if compression == "gzip":
+        return gzip.decompress(data)
+    return data
+
+
+class ShardedJsonlWriter:
+    """
+    크기 상한이 있는 (압축) JSONL 샤드 + sha256/url → 위치 인덱스를 쓰는 writer.
+
+    - 샤드: `<prefix>-00000.jsonl.zst`처럼 번호가 붙고, 압축 후 크기가 max_shard_bytes를 넘으면 다음 샤드로 넘어갑니다.
+    - 블록: 레코드를 block_bytes 정도씩 모아 독립된 zstd 프레임 / gzip 멤버 하나로 압축합니다.
+      이어 붙인 프레임/멤버도 표준 형식이라 `zstdcat`, `zcat`으로 그대로 읽힙니다.
+    - 인덱스: `<prefix>.index.jsonl`에 레코드마다 {sha256, url, shard, offset, length, pos, size}를 추가 기록하며
+      같은 키는 마지막 줄이 우선합니다. offset/length는 샤드 안 블록의 바이트 범위, pos/size는 블록을 풀었을 때
+      레코드의 위치이므로 한 건은 seek 한 번 + 블록 하나 해제로 읽습니다(무압축이면 레코드 자체의 범위).
+
+    flush()(=한 블록 내려쓰기) 때 샤드를 먼저 쓰고 인덱스를 나중에 쓰므로, 중단되면 인덱스에 없는 꼬리만 남고
+    다음에 열 때 잘라냅니다. 같은 디렉터리를 다시 열면 마지막 샤드에 이어서 씁니다.
+    """
+
+    def __init__(
+        self,
+        out_dir: Path,
+        *,
+        prefix: str = "decisions",
+        compression: str = "zstd",
+        level: int = 3,
+        max_shard_bytes: int = 256 * 1024 * 1024,
+        block_bytes: int = 1024 * 1024,
+        keys: Sequence[str] = ("sha256", "url"),
+    ) -> None:
+        _check_compression(compression)
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.compression = compression
+        self.level = level
+        self.max_shard_bytes = max_shard_bytes
+        self.block_bytes = block_bytes
+        self.keys = tuple(keys)
+        self.index_path = self.out_dir / f"{prefix}.index.jsonl"
+        self._block = bytearray()
+        self._block_entries: List[Dict[str, Any]] = []
+        self._shard_no, self._shard_size = self._resume()
+        self._known: Optional[Dict[str, Set[Any]]] = None
+        self._shard_f: Optional[io.BufferedWriter] = None
+        self._index_f = self.index_path.open("a", encoding="utf-8")
+
+    def shard_name(self, shard_no: int) -> str:
+        return f"{self.prefix}-{shard_no:05d}{_SUFFIXES[self.compression]}"
+
+    def _resume(self) -> Tuple[int, int]:
+        # 인덱스에 기록된 마지막 샤드와 그 끝 위치를 찾고, 그 뒤에 남은 중단된 꼬리는 잘라냅니다.
+        last_shard, end = None, 0
+        for entry in _read_index(self.index_path):
+            if last_shard is None or entry["shard"] > last_shard:
+                last_shard, end = entry["shard"], 0
+            if entry["shard"] == last_shard:
+                end = max(end, entry["offset"] + entry["length"])
+        if self.index_path.exists() and self.index_path.stat().st_size:
+            with self.index_path.open("rb+") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # 중단된 마지막 줄 뒤에 이어 쓰지 않도록 줄을 끝내 둡니다.
+                    f.write(b"\n")
+        if last_shard is None:
+            return 0, 0
+        shard_no = int(last_shard[len(self.prefix) + 1 :].split(".", 1)[0])
+        path = self.out_dir / last_shard
+        # 압축 방식이 바뀌었거나 샤드 파일이 없어졌으면 새 샤드부터 씁니다(한 샤드 안에서는 방식이 같아야 합니다).
+        if last_shard != self.shard_name(shard_no) or not path.exists() or path.stat().st_size < end:
+            return shard_no + 1, 0
+        if path.stat().st_size > end:
+            with path.open("r+b") as f:
+                f.truncate(end)
+        return shard_no, end
+
+    def has(self, **key: Any) -> bool:
+        """`has(sha256=...)`: 같은 키의 레코드를 이미 썼는지(인덱스에 있거나 아직 내려쓰지 않은 블록에 있는지)."""
+        ((name, value),) = key.items()
+        if self._known is None:
+            # 처음 물을 때 인덱스를 한 번 읽고, 그 뒤로는 write()가 갱신합니다.
+            self._known = {k: set() for k in self.keys}
+            for entry in _read_index(self.index_path):
+                for k in self.keys:
+                    if entry.get(k) is not None:
+                        self._known[k].add(entry[k])
+        return value is not None and value in self._known.get(name, ())
+
+    def write(self, record: Dict[str, Any]) -> None:
+        data = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        entry = {k: record.get(k) for k in self.keys}
+        if self._known is not None:
+            for k, value in entry.items():
+                if value is not None:
+                    self._known[k].add(value)
+        entry["pos"] = len(self._block)
+        entry["size"] = len(data)
+        self._block += data
+        self._block_entries.append(entry)
+        if len(self._block) >= self.block_bytes:
+            self.flush()
+
+    def write_many(self, records: Iterable[Dict[str, Any]]) -> None:
+        for rec in records:
+            self.write(rec)
+
+    def flush(self) -> None:
+        """모인 레코드를 블록 하나로 압축해 샤드에 쓰고 인덱스에 반영합니다."""
+        if not self._block_entries:
+            return
+        data = _compress(bytes(self._block), self.compression, self.level)
+        if self._shard_size > 0 and self._shard_size + len(data) > self.max_shard_bytes:
+            self._close_shard()
+            self._shard_no += 1
+            self._shard_size = 0
+        if self._shard_f is None:
+            self._shard_f = (self.out_dir / self.shard_name(self._shard_no)).open("ab")
+        offset = self._shard_size
+        self._shard_f.write(data)
+        self._shard_f.flush()
+        os.fsync(self._shard_f.fileno())
+        self._shard_size += len(data)
+
+        shard = self.shard_name(self._shard_no)
+        lines = []
+        for entry in self._block_entries:
+            if self.compression == "none":
+                # 무압축이면 블록 전체가 아니라 레코드 자체의 범위를 기록합니다.
+                entry.update(shard=shard, offset=offset + entry["pos"], length=entry["size"], pos=0)
+            else:
+                entry.update(shard=shard, offset=offset, length=len(data))
+            lines.append(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._index_f.write("".join(lines))
+        self._index_f.flush()
+        self._block = bytearray()
+        self._block_entries = []
+
+    def _close_shard(self) -> None:
+        if self._shard_f is not None:
+            self._shard_f.close()
+            self._shard_f = None
+
+    def close(self) -> None:
+        self.flush()
+        self._close_shard()
+        self._index_f.close()
+
+    def __enter__(self) -> "ShardedJsonlWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _read_index(path: Path) -> Iterator[Dict[str, Any]]:
+    if not path.exists():
+        return
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # 중단된 마지막 줄 등은 무시합니다.
+                continue
+
+
+def _compression_of(name: str) -> str:
+    for compression, suffix in _SUFFIXES.items():
+        if compression != "none" and name.endswith(suffix):
+            return compression
+    return "none"
+
+
+class ShardedJsonlReader:
+    """
+    ShardedJsonlWriter 출력 읽기.
+
+    - get(sha256=...) / get(url=...): 인덱스로 찾은 블록 하나만 읽어 레코드 한 건을 돌려줍니다.
+    - shards() / iter_shard(): 샤드 단위로 전체를 흘려 읽으므로 샤드별로 나눠 병렬 처리할 수 있습니다.
+    """
+
+    def __init__(self, out_dir: Path, *, prefix: str = "decisions") -> None:
+        self.out_dir = Path(out_dir)
+        self.prefix = prefix
+        self.index_path = self.out_dir / f"{prefix}.index.jsonl"
+        self._by_key: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+        for entry in _read_index(self.index_path):
+            for key, value in entry.items():
+                if key in ("shard", "offset", "length", "pos", "size") or value is None:
+                    continue
+                self._by_key.setdefault(key, {})[value] = entry
+
+    def __len__(self) -> int:
+        return max((len(v) for v in self._by_key.values()), default=0)
+
+    def locate(self, **key: Any) -> Optional[Dict[str, Any]]:
+        ((name, value),) = key.items()
+        return self._by_key.get(name, {}).get(value)
+
+    def get(self, **key: Any) -> Optional[Dict[str, Any]]:
+        """`get(sha256=...)` 또는 `get(url=...)`. 인덱스에 없으면 None."""
+        entry = self.locate(**key)
+        if entry is None:
+            return None
+        with (self.out_dir / entry["shard"]).open("rb") as f:
+            f.seek(entry["offset"])
+            block = f.read(entry["length"])
+        data = _decompress(block, _compression_of(entry["shard"]))
+        return json.loads(data[entry["pos"] : entry["pos"] + entry["size"]])
+
+    def shards(self) -> List[Path]:
+        return sorted(p for p in self.out_dir.glob(f"{self.prefix}-*.jsonl*") if not p.name.endswith(".tmp"))
+
+    def iter_shard(self, path: Path) -> Iterator[Dict[str, Any]]:
+        yield from iter_shard(path)
+
+
+def iter_shard(path: Path) -> Iterator[Dict[str, Any]]:
+    """샤드 하나의 레코드를 순서대로 읽습니다(여러 zstd 프레임/gzip 멤버를 이어서 해제)."""
+    path = Path(path)
+    compression = _compression_of(path.name)
+    with path.open("rb") as raw:
+        if compression == "zstd":
+            _check_compression(compression)
+            stream: Any = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+        elif compression == "gzip":
+            stream = gzip.GzipFile(fileobj=raw)
+        else:
+            stream = raw
+        for line in io.TextIOWrapper(stream, encoding="utf-8"):
+            if line.strip():
+                yield json.loads(line)
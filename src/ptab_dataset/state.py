@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+# 문서 상태: 조회 단계에서 발견 → PDF 저장 → 파싱·출력 저장 완료, 또는 어느 단계에서든 실패
+DISCOVERED = "discovered"
+DOWNLOADED = "downloaded"
+PARSED = "parsed"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    url TEXT PRIMARY KEY,
+    page INTEGER,
+    state TEXT NOT NULL,
+    sha256 TEXT,
+    path TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    failed_stage TEXT,
+    last_error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_state ON documents (state);
+CREATE TABLE IF NOT EXISTS pages (
+    page INTEGER PRIMARY KEY,
+    done_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_MARK_PARSED = "UPDATE documents SET state = ?, failed_stage = NULL, last_error = NULL, updated_at = ? WHERE url = ?"
+_SET_LAST_PAGE = (
+    "INSERT INTO meta (key, value) VALUES ('last_page', ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value"
+)
+# page_done은 last_page를 뒤로 돌리지 않습니다(앞 페이지부터 다시 재생해도 조회 힌트가 유지되도록).
+_ADVANCE_LAST_PAGE = (
+    "INSERT INTO meta (key, value) VALUES ('last_page', ?) ON CONFLICT(key) DO UPDATE SET value = "
+    "CAST(MAX(CAST(value AS INTEGER), CAST(excluded.value AS INTEGER)) AS TEXT)"
+)
+
+
+class StateStore:
+    """
+    파이프라인 진행 상태를 담는 SQLite(WAL) 저장소.
+
+    - documents: URL별 상태(discovered/downloaded/parsed/failed), sha256·경로, 시도 횟수, 마지막 오류
+    - pages: 출력까지 끝난 페이지
+    - meta: last_page(기존 checkpoint.json과 같은 의미). 재개 지점은 documents의 미완료 문서(unfinished)이고,
+      last_page는 새 페이지를 어디서부터 조회할지에 대한 힌트일 뿐입니다.
+
+    모든 변경은 트랜잭션 하나로 커밋되고(synchronous=FULL), 단계 스레드들이 함께 쓰도록 연결 하나를 잠금으로 보호합니다.
+    처음 열 때 processed_dir의 checkpoint.json이 있으면 last_page를 가져옵니다.
+    """
+
+    FILENAME = "state.sqlite3"
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+        self._import_checkpoint(self.path.parent / "checkpoint.json")
+
+    def _import_checkpoint(self, ckpt: Path) -> None:
+        if ckpt.exists() and self._get_meta("last_page") is None:
+            last_page = json.loads(ckpt.read_text(encoding="utf-8")).get("last_page", 0)
+            self.set_last_page(int(last_page))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -- 페이지/체크포인트 ----------------------------------------------------------
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row["value"]
+
+    def last_page(self) -> int:
+        value = self._get_meta("last_page")
+        return int(value) if value is not None else 0
+
+    def set_last_page(self, page: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(_SET_LAST_PAGE, (str(page),))
+
+    def page_done(self, page: int, parsed: Iterable[str] = ()) -> None:
+        """페이지 출력이 끝났음을 그 페이지에서 파싱된 URL들의 parsed 표시와 함께 한 트랜잭션으로 기록합니다."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(_MARK_PARSED, [(PARSED, now, url) for url in parsed])
+            self._conn.execute(
+                "INSERT INTO pages (page, done_at) VALUES (?, ?) "
+                "ON CONFLICT(page) DO UPDATE SET done_at = excluded.done_at",
+                (page, now),
+            )
+            self._conn.execute(_ADVANCE_LAST_PAGE, (str(page),))
+
+    # -- 문서 상태 --------------------------------------------------------------------
+
+    def discover(self, page: int, urls: Iterable[str]) -> None:
+        """새 URL을 discovered로 등록합니다(이미 아는 URL의 상태는 건드리지 않음)."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO documents (url, page, state, updated_at) VALUES (?, ?, ?, ?) ON CONFLICT(url) DO NOTHING",
+                [(url, page, DISCOVERED, now) for url in urls],
+            )
+
+    def mark_downloaded(self, url: str, sha256: str, path: Path) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO documents (url, state, sha256, path, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET state = excluded.state, sha256 = excluded.sha256, "
+                "path = excluded.path, updated_at = excluded.updated_at",
+                (url, DOWNLOADED, sha256, str(path), time.time()),
+            )
+
+    def mark_parsed(self, urls: Iterable[str]) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(_MARK_PARSED, [(PARSED, now, url) for url in urls])
+
+    def mark_failed(self, url: str, stage: str, error: str) -> None:
+        """실패를 기록하고 시도 횟수를 1 늘립니다. stage는 "download" 또는 "parse"."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO documents (url, state, attempts, failed_stage, last_error, updated_at) "
+                "VALUES (?, ?, 1, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET state = excluded.state, attempts = attempts + 1, "
+                "failed_stage = excluded.failed_stage, last_error = excluded.last_error, "
+                "updated_at = excluded.updated_at",
+                (url, FAILED, stage, error, time.time()),
+            )
+
+    def parsed_among(self, urls: Iterable[str]) -> Set[str]:
+        """urls 중 이미 파싱·저장까지 끝난 URL 집합(재실행 시 건너뛸 대상)."""
+        return {url for url, row in self.lookup(urls).items() if row["state"] == PARSED}
+
+    def lookup(self, urls: Iterable[str]) -> Dict[str, Dict]:
+        """urls 중 상태 저장소에 있는 문서의 행(url → dict)."""
+        urls = list(urls)
+        found: Dict[str, Dict] = {}
+        with self._lock:
+            for i in range(0, len(urls), 500):
+                batch = urls[i : i + 500]
+                rows = self._conn.execute(
+                    f"SELECT * FROM documents WHERE url IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                found.update((row["url"], dict(row)) for row in rows)
+        return found
+
+    def unfinished(self) -> List[Dict]:
+        """발견·다운로드됐지만 아직 파싱·저장되지 않은 문서(페이지 순). 재실행 시 조회 전에 먼저 다시 처리합니다."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM documents WHERE state IN (?, ?) ORDER BY page IS NULL, page, updated_at",
+                (DISCOVERED, DOWNLOADED),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def failures(self, *, max_attempts: Optional[int] = None) -> List[Dict]:
+        """실패 큐: 시도 횟수가 max_attempts 미만인 failed 문서(오래된 순)."""
+        sql = "SELECT * FROM documents WHERE state = ?"
+        args: List = [FAILED]
+        if max_attempts is not None:
+            sql += " AND attempts < ?"
+            args.append(max_attempts)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY updated_at", args).fetchall()
+        return [dict(row) for row in rows]
+
+    def get(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM documents WHERE url = ?", (url,)).fetchone()
+        return None if row is None else dict(row)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) AS n FROM documents GROUP BY state").fetchall()
+        return {row["state"]: row["n"] for row in rows}
@@ -2,34 +2,96 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Optional
 
 from .config import Settings
+from .state import StateStore
 
 
 class Storage:
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
+        self._shards: Optional[Any] = None
         Path(settings.raw_dir).mkdir(parents=True, exist_ok=True)
         Path(settings.processed_dir).mkdir(parents=True, exist_ok=True)
+        # 체크포인트(last_page)와 문서별 상태·실패 큐는 processed_dir/state.sqlite3에 트랜잭션으로 기록합니다.
+        self.state = StateStore(Path(settings.processed_dir) / StateStore.FILENAME)
 
-    def save_jsonl(self, records: Iterable[Dict], path: Path) -> None:
+    def save_jsonl(self, records: Iterable[Dict], path: Path, *, append: bool = True) -> None:
         path.parent.mkdir(parents=True, exist_ok=True)
-        with path.open("a", encoding="utf-8") as f:
+        with path.open("a" if append else "w", encoding="utf-8") as f:
             for rec in records:
                 f.write(json.dumps(rec, ensure_ascii=False) + "\n")
 
+    def save_parquet(self, records: Iterable[Dict], path: Path, *, schema: Optional[Any] = None) -> int:
+        # 선택 의존성(pyarrow)이므로 parquet 출력일 때만 불러옵니다.
+        from .columnar import write_parquet
+
+        return write_parquet(
+            records,
+            path,
+            schema=schema,
+            row_group_size=self.settings.parquet_row_group_size,
+            compression=self.settings.parquet_compression,
+        )
+
+    def save_decisions(self, records: List[Dict], stem: Path, *, replace: bool = False) -> Path:
+        """
+        Settings.output_format에 맞춰 결정문 레코드를 저장하고 실제 파일 경로를 돌려줍니다.
+
+        stem은 확장자 없는 경로(예: processed_dir/decisions_page_3)이고, 형식에 따라 .jsonl/.parquet이 붙습니다.
+        "shards" 형식은 페이지와 무관하게 stem과 같은 디렉터리의 decisions_shards/에 이어 쓰고 그 디렉터리를 돌려줍니다.
+        replace=True이면 jsonl 파일에 이어 쓰지 않고 새로 쓰고, shards에서는 이미 인덱스에 있는 sha256을 건너뜁니다
+        (오프라인 재생이 같은 페이지를 다시 저장할 때 레코드가 중복되거나 인덱스가 새 위치로 바뀌지 않도록).
+        """
+        if self.settings.output_format == "shards":
+            path = stem.parent / "decisions_shards"
+            writer = self._shard_writer(path)
+            if replace:
+                records = [rec for rec in records if not writer.has(sha256=rec.get("sha256"))]
+            writer.write_many(records)
+            # 체크포인트 전에 샤드/인덱스까지 내려써 두어야 재시작 시 페이지가 빠지지 않습니다.
+            writer.flush()
+        elif self.settings.output_format == "parquet":
+            from .columnar import decision_schema
+
+            path = stem.with_name(stem.name + ".parquet")
+            self.save_parquet(records, path, schema=decision_schema())
+        elif self.settings.output_format == "jsonl":
+            path = stem.with_name(stem.name + ".jsonl")
+            self.save_jsonl(records, path, append=not replace)
+        else:
+            raise ValueError(f"지원하지 않는 출력 형식입니다: {self.settings.output_format!r}")
+        return path
+
+    def _shard_writer(self, path: Path) -> Any:
+        from .shards import ShardedJsonlWriter
+
+        if self._shards is not None and self._shards.out_dir != path:
+            self._shards.close()
+            self._shards = None
+        if self._shards is None:
+            self._shards = ShardedJsonlWriter(
+                path,
+                compression=self.settings.shard_compression,
+                max_shard_bytes=self.settings.shard_max_bytes,
+            )
+        return self._shards
+
+    def close(self) -> None:
+        if self._shards is not None:
+            self._shards.close()
+            self._shards = None
+        self.state.close()
+
     def save_checkpoint(self, page: int) -> None:
-        ckpt = Path(self.settings.processed_dir) / "checkpoint.json"
-        ckpt.write_text(json.dumps({"last_page": page}), encoding="utf-8")
+        self.state.set_last_page(page)
 
     def load_checkpoint(self) -> int:
-        ckpt = Path(self.settings.processed_dir) / "checkpoint.json"
-        if ckpt.exists():
-            return json.loads(ckpt.read_text(encoding="utf-8")).get("last_page", 0)
-        return 0
+        return self.state.last_page()
 
     def save_retry_queue(self, items: List[Dict]) -> None:
-        path = Path(self.settings.raw_dir) / "retry_queue.jsonl"
-        self.save_jsonl(items, path)
+        # 예전 retry_queue.jsonl 대신 상태 저장소의 실패 큐에 기록합니다(pipeline --retry-failed가 읽어 재시도).
+        for item in items:
+            self.state.mark_failed(item["url"], item.get("stage", "download"), item.get("reason", ""))
 
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import re
+from typing import Any, List, Optional, Protocol, Tuple
+
+# Han, kana, bopomofo, hangul and CJK compatibility ranges: one token per character.
+_CJK_RANGES = (
+    "\u2e80-\u2fdf"  # CJK radicals
+    "\u3040-\u30ff"  # hiragana, katakana
+    "\u3100-\u312f"  # bopomofo
+    "\u3130-\u318f"  # hangul compatibility jamo
+    "\u31a0-\u31ff"  # bopomofo ext., strokes, katakana ext.
+    "\u3400-\u4dbf"  # CJK ext. A
+    "\u4e00-\u9fff"  # CJK unified ideographs
+    "\uac00-\ud7af"  # hangul syllables
+    "\uf900-\ufaff"  # CJK compatibility ideographs
+    "\uff66-\uff9f"  # half-width katakana
+)
+
+_SIMPLE_TOKEN_RE = re.compile(rf"[{_CJK_RANGES}]|[^\W{_CJK_RANGES}]+|[^\w\s]")
+
+
+class Tokenizer(Protocol):
+    """Minimal interface the token-budget chunker needs.
+
+    `token_spans` returns the (start, end) character offsets of the tokens in
+    `text`, in order. `name` identifies the tokenizer in build manifests.
+    """
+
+    name: str
+
+    def token_spans(self, text: str) -> List[Tuple[int, int]]: ...
+
+
+class SimpleTokenizer:
+    """Fast offline fallback: word runs, single punctuation marks and single CJK characters.
+
+    One token per CJK character is close to what subword tokenizers produce
+    for ja/zh/ko text. For English, word counts are an under-estimate of
+    subword counts, so leave some headroom in `max_tokens`.
+    """
+
+    name = "simple"
+
+    def token_spans(self, text: str) -> List[Tuple[int, int]]:
+        return [m.span() for m in _SIMPLE_TOKEN_RE.finditer(text)]
+
+    def tokens(self, text: str) -> List[str]:
+        return _SIMPLE_TOKEN_RE.findall(text)
+
+
+class HFTokenizer:
+    """Adapter for Hugging Face *fast* tokenizers, which provide offset mappings.
+
+    Pass an already loaded tokenizer, or use `load_tokenizer("hf:<name-or-path>")`.
+    """
+
+    def __init__(self, tokenizer: Any, name: Optional[str] = None) -> None:
+        self.tokenizer = tokenizer
+        self.name = name or f"hf:{getattr(tokenizer, 'name_or_path', type(tokenizer).__name__)}"
+
+    def token_spans(self, text: str) -> List[Tuple[int, int]]:
+        enc = self.tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        return [(s, e) for s, e in enc["offset_mapping"] if e > s]
+
+
+def load_tokenizer(spec: str) -> Tokenizer:
+    """Build a tokenizer from a CLI-style spec: `simple` or `hf:<name-or-path>`.
+
+    Hugging Face tokenizers are loaded with `local_files_only=True`, so the
+    model files must already be cached or on disk.
+    """
+
+    if spec == "simple":
+        return SimpleTokenizer()
+    if spec.startswith("hf:"):
+        try:
+            from transformers import AutoTokenizer
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("hf: tokenizers require the `transformers` package") from exc
+        path = spec[3:]
+        return HFTokenizer(AutoTokenizer.from_pretrained(path, use_fast=True, local_files_only=True), name=spec)
+    raise ValueError(f"Unknown tokenizer spec: {spec!r} (expected 'simple' or 'hf:<name-or-path>')")
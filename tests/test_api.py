@@ -0,0 +1,73 @@
+"""Search pagination helpers: date shards and the date-sharded page walk in the pipeline."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from ptab_dataset import pipeline
+from ptab_dataset.api import PTABClient, date_shards, iter_sharded_decision_pages
+from ptab_dataset.benchmark import StandInServer
+from ptab_dataset.config import Settings
+from ptab_dataset.state import StateStore
+
+
+def test_date_shards_cover_range_with_inclusive_ends() -> None:
+    assert date_shards("2024-01-01", "2024-01-10", 4) == [
+        ("2024-01-01", "2024-01-04"),
+        ("2024-01-05", "2024-01-08"),
+        ("2024-01-09", "2024-01-10"),
+    ]
+    # Month and leap-day boundaries fall inside shards like any other day.
+    assert date_shards("2024-02-28", "2024-03-01", 2) == [("2024-02-28", "2024-02-29"), ("2024-03-01", "2024-03-01")]
+
+
+def test_date_shards_single_day_and_empty_range() -> None:
+    assert date_shards("2024-05-05", "2024-05-05", 30) == [("2024-05-05", "2024-05-05")]
+    assert date_shards("2024-05-06", "2024-05-05", 30) == []
+    with pytest.raises(ValueError):
+        date_shards("2024-05-01", "2024-05-05", 0)
+
+
+def test_sharded_pages_walk_every_shard(tmp_path: Path) -> None:
+    # The stand-in server ignores the date filter, so each shard sees the same three decisions (two pages of two).
+    with StandInServer([b"%PDF"], decisions=3) as server:
+        client = PTABClient(Settings(api_key="test", base_url=server.base_url, raw_dir=str(tmp_path)))
+        pages = list(iter_sharded_decision_pages(client, since="2024-01-01", until="2024-01-10", shard_days=5, rows=2))
+
+    assert [(shard, page, len(docs)) for shard, page, docs in pages] == [
+        (("2024-01-01", "2024-01-05"), 1, 2),
+        (("2024-01-01", "2024-01-05"), 2, 1),
+        (("2024-01-06", "2024-01-10"), 1, 2),
+        (("2024-01-06", "2024-01-10"), 2, 1),
+    ]
+
+
+def test_pipeline_date_shards_number_pages_across_shards(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    processed = tmp_path / "processed"
+    with StandInServer([b"%PDF"], decisions=3) as server:
+        settings = Settings(
+            api_key="test",
+            base_url=server.base_url,
+            raw_dir=str(tmp_path / "raw"),
+            processed_dir=str(processed),
+            date_shard_days=5,
+            run_report=False,
+        )
+        monkeypatch.setattr(Settings, "from_env", classmethod(lambda cls, **_: settings))
+        kwargs = dict(since="2024-01-01", until="2024-01-10", rows=2, dry_run=True, override_api_key=None)
+
+        pipeline.run_pipeline(max_pages=3, **kwargs)
+        assert _last_page(processed) == 3
+        # Resuming continues with the fourth page overall (the second shard's second page).
+        pipeline.run_pipeline(max_pages=10, **kwargs)
+        assert _last_page(processed) == 4
+
+
+def _last_page(processed: Path) -> int:
+    state = StateStore(processed / StateStore.FILENAME)
+    try:
+        return state.last_page()
+    finally:
+        state.close()
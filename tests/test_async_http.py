@@ -0,0 +1,131 @@
+"""aiohttp clients against the local stand-in server: same answers as the blocking clients, shared download index."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+from pathlib import Path
+
+import aiohttp
+import pytest
+from tenacity import stop_after_attempt
+
+from ptab_dataset import pipeline
+from ptab_dataset.api import PTABClient
+from ptab_dataset.async_http import AsyncDecisionDownloader, AsyncHTTP, AsyncPatentsViewClient, AsyncPTABClient
+from ptab_dataset.benchmark import StandInServer, make_pdf, synthetic_decision_pages
+from ptab_dataset.config import Settings
+from ptab_dataset.downloader import DecisionDownloader
+from ptab_dataset.ratelimit import RateLimiter
+
+PDFS = [bytes(range(256)) * 40, b"%PDF-1.4 second document\n" * 300]
+
+
+@pytest.fixture
+def server():
+    with StandInServer(PDFS, decisions=5) as stand_in:
+        yield stand_in
+
+
+def _settings(tmp_path: Path, server: StandInServer, **overrides) -> Settings:
+    return Settings(
+        api_key="test", base_url=server.base_url, raw_dir=str(tmp_path), download_chunk_size=1024, **overrides
+    )
+
+
+def test_async_search_matches_sync(tmp_path: Path, server: StandInServer) -> None:
+    settings = _settings(tmp_path, server)
+
+    async def search() -> list:
+        async with AsyncHTTP(settings, limiter=RateLimiter(settings)) as http:
+            client = AsyncPTABClient(settings, http)
+            return await asyncio.gather(*(client.search_decisions(page=p, rows=2) for p in (1, 2, 3)))
+
+    expected = [PTABClient(settings).search_decisions(page=p, rows=2) for p in (1, 2, 3)]
+    assert asyncio.run(search()) == expected
+
+
+def test_async_patentsview_client_uses_its_base_url(tmp_path: Path, server: StandInServer) -> None:
+    settings = _settings(tmp_path, server, patentsview_base_url=f"{server.base_url}/", patentsview_api_key="pv")
+
+    async def get() -> dict:
+        async with AsyncHTTP(settings, limiter=RateLimiter(settings)) as http:
+            return await AsyncPatentsViewClient(settings, http).get("/search-decisions", {"page": 1, "rows": 2})
+
+    assert asyncio.run(get()) == server.search_page(1, 2)
+
+
+def test_async_downloads_share_index_with_sync(tmp_path: Path, server: StandInServer) -> None:
+    settings = _settings(tmp_path, server)
+    urls = [f"{server.base_url}/pdf/{i}" for i in range(3)]
+
+    async def download() -> list:
+        async with AsyncHTTP(settings, limiter=RateLimiter(settings)) as http:
+            return await AsyncDecisionDownloader(settings, http).batch_download(urls)
+
+    items = asyncio.run(download())
+    assert [item["sha256"] for item in items] == [hashlib.sha256(PDFS[i % 2]).hexdigest() for i in range(3)]
+    assert all(Path(item["path"]).read_bytes() == PDFS[i % 2] for i, item in enumerate(items))
+    assert list(tmp_path.glob("*.part")) == []
+
+    # The blocking downloader reads the same download_index.jsonl and makes no requests.
+    requests_made = server.requests
+    again = DecisionDownloader(settings, limiter=RateLimiter(settings)).batch_download(urls)
+    assert server.requests == requests_made
+    assert [item["path"] for item in again] == [item["path"] for item in items]
+
+
+def test_async_failed_download_leaves_no_partial_file(tmp_path: Path, server: StandInServer) -> None:
+    settings = _settings(tmp_path, server, download_index=False)
+    once = AsyncDecisionDownloader.download_to_disk.retry_with(stop=stop_after_attempt(1), reraise=True)
+
+    async def download() -> None:
+        async with AsyncHTTP(settings, limiter=RateLimiter(settings)) as http:
+            await once(AsyncDecisionDownloader(settings, http), f"{server.base_url}/missing")
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(download())
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_async_unsolicited_304_is_an_error(tmp_path: Path, server: StandInServer, not_modified_url: str) -> None:
+    settings = _settings(tmp_path, server, download_index=False)
+    once = AsyncDecisionDownloader.download_to_disk.retry_with(stop=stop_after_attempt(1), reraise=True)
+
+    async def download() -> None:
+        async with AsyncHTTP(settings, limiter=RateLimiter(settings)) as http:
+            await once(AsyncDecisionDownloader(settings, http), not_modified_url)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(download())
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_pipeline_async_downloads_match_threaded(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    pdfs = [make_pdf(synthetic_decision_pages(random.Random(seed), pages=2)) for seed in range(3)]
+    outputs = {}
+    with StandInServer(pdfs, decisions=5) as server:
+        for async_downloads in (False, True):
+            processed = tmp_path / f"processed-{async_downloads}"
+            settings = Settings(
+                api_key="test",
+                base_url=server.base_url,
+                raw_dir=str(tmp_path / f"raw-{async_downloads}"),
+                processed_dir=str(processed),
+                async_downloads=async_downloads,
+                run_report=False,
+            )
+            monkeypatch.setattr(Settings, "from_env", classmethod(lambda cls, **_: settings))
+            pipeline.run_pipeline(
+                since="2024-01-01", until=None, max_pages=3, rows=2, dry_run=False, override_api_key=None
+            )
+            outputs[async_downloads] = [
+                json.loads(line)
+                for path in sorted(processed.glob("decisions_page_*.jsonl"))
+                for line in path.read_text(encoding="utf-8").splitlines()
+            ]
+
+    assert len(outputs[False]) == 5
+    assert outputs[True] == outputs[False]
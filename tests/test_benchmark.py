@@ -0,0 +1,25 @@
+"""Baseline comparison: throughput is compared after normalising by each run's calibration time."""
+
+from __future__ import annotations
+
+from ptab_dataset.benchmark import compare
+
+
+def _run(items_per_second: float, calibration: float, peak_bytes: int = 1000) -> dict:
+    row = {
+        "items_per_second": items_per_second,
+        "normalized_throughput": items_per_second * calibration,
+        "peak_bytes": peak_bytes,
+    }
+    return {"scale": "small", "calibration_seconds": calibration, "stages": {"chunk_text": row}}
+
+
+def test_slower_machine_is_not_a_regression() -> None:
+    # Half the raw throughput on a machine that runs the calibration work half as fast.
+    assert compare(_run(500.0, 0.02), _run(1000.0, 0.01)) == []
+
+
+def test_slower_code_on_same_machine_is_a_regression() -> None:
+    (regression,) = compare(_run(500.0, 0.01), _run(1000.0, 0.01))
+    assert (regression.stage, regression.metric) == ("chunk_text", "normalized_throughput")
+    assert compare(_run(1000.0, 0.01, peak_bytes=2000), _run(1000.0, 0.01))[0].metric == "peak_bytes"
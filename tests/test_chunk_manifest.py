@@ -0,0 +1,84 @@
+"""Incremental `build_chunk_jsonl`: the manifest decides what is re-chunked, and the output always
+matches a from-scratch build."""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from ptab_dataset.benchmark import synthetic_patent_txt
+from ptab_dataset.chunk_build import build_chunk_jsonl
+
+
+@pytest.fixture
+def sources(tmp_path: Path) -> List[Path]:
+    rng = random.Random(9)
+    src = tmp_path / "txt"
+    src.mkdir()
+    paths = []
+    for i, lang in enumerate(["en", "ja", "zh", "ko", "en"]):
+        path = src / f"doc_{i}.txt"
+        path.write_text(synthetic_patent_txt(rng, lang, i, paragraphs=10), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def _full_build(paths: List[Path], tmp_path: Path, **kwargs) -> bytes:
+    out = tmp_path / "full" / "chunks.jsonl"
+    build_chunk_jsonl([p for p in paths if p.exists()], out, **kwargs)
+    return out.read_bytes()
+
+
+def test_unchanged_sources_are_reused(sources: List[Path], tmp_path: Path) -> None:
+    out = tmp_path / "out" / "chunks.jsonl"
+    first = build_chunk_jsonl(sources, out, incremental=True)
+    assert (first.rechunked, first.reused) == (len(sources), 0)
+    before = out.read_bytes()
+
+    again = build_chunk_jsonl(sources, out, incremental=True)
+    assert (again.rechunked, again.reused, again.removed) == (0, len(sources), 0)
+    assert again.chunks == first.chunks
+    assert out.read_bytes() == before
+
+    manifest = json.loads(out.with_name("chunks.jsonl.manifest.json").read_text(encoding="utf-8"))
+    assert manifest["output_size"] == len(before)
+    assert sorted(manifest["sources"]) == sorted(str(p) for p in sources)
+
+
+def test_changed_touched_and_removed_sources(sources: List[Path], tmp_path: Path) -> None:
+    out = tmp_path / "out" / "chunks.jsonl"
+    build_chunk_jsonl(sources, out, incremental=True)
+
+    sources[1].write_text(sources[1].read_text(encoding="utf-8") + "\nAppended paragraph.\n", encoding="utf-8")
+    st = sources[2].stat()
+    os.utime(sources[2], ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))  # same bytes, new mtime
+    sources[3].unlink()
+
+    stats = build_chunk_jsonl(sources[:3] + sources[4:], out, incremental=True)
+    assert (stats.rechunked, stats.reused, stats.removed) == (1, 3, 1)
+    assert out.read_bytes() == _full_build(sources, tmp_path)
+
+
+def test_parameter_change_rebuilds_everything(sources: List[Path], tmp_path: Path) -> None:
+    out = tmp_path / "out" / "chunks.jsonl"
+    build_chunk_jsonl(sources, out, incremental=True)
+
+    stats = build_chunk_jsonl(sources, out, incremental=True, max_chars=600, overlap=50)
+    assert (stats.rechunked, stats.reused) == (len(sources), 0)
+    assert out.read_bytes() == _full_build(sources, tmp_path, max_chars=600, overlap=50)
+
+
+def test_output_not_matching_manifest_rebuilds(sources: List[Path], tmp_path: Path) -> None:
+    out = tmp_path / "out" / "chunks.jsonl"
+    build_chunk_jsonl(sources, out, incremental=True)
+    expected = out.read_bytes()
+    out.write_bytes(expected[: len(expected) // 2])
+
+    stats = build_chunk_jsonl(sources, out, incremental=True)
+    assert (stats.rechunked, stats.reused) == (len(sources), 0)
+    assert out.read_bytes() == expected
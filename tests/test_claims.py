@@ -0,0 +1,66 @@
+"""Claim extraction: golden set against the original `fuzzy_claims`, plus the widened claim lists.
+
+golden/fuzzy_claims.json holds `{name, text, expected}` cases; `expected` is
+the output of the per-line rapidfuzz implementation before the prefiltered
+matcher (`git show 1346d8d:src/ptab_dataset/parser.py`). The cases use only
+the forms the old `CLAIM_PATTERN` already understood, so the result must not
+change.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from ptab_dataset.parser import decision_from_text, expand_claim_ranges, extract_claims, fuzzy_claims
+
+GOLDEN = json.loads((Path(__file__).parent / "golden" / "fuzzy_claims.json").read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("case", GOLDEN, ids=lambda case: case["name"])
+def test_fuzzy_claims_matches_golden(case: dict) -> None:
+    assert fuzzy_claims(case["text"]) == case["expected"]
+
+
+def test_golden_set_covers_both_outcomes() -> None:
+    outcomes = {tuple(case["expected"]) for case in GOLDEN}
+    assert () in outcomes
+    assert ("ALL_CHALLENGED",) in outcomes
+    assert any(len(expected) > 1 for expected in outcomes)
+
+
+@pytest.mark.parametrize(
+    "text, spec, numbers",
+    [
+        ("We conclude claims 1-5, 7 are unpatentable.", "1-5, 7", [1, 2, 3, 4, 5, 7]),
+        ("Claims 1–3 and 9 unpatentable under § 103.", "1–3 and 9", [1, 2, 3, 9]),
+        ("claims 2 through 4 unpatentable", "2 through 4", [2, 3, 4]),
+        ("claims 6, 8, and 10 were unpatentable", "6, 8, and 10", [6, 8, 10]),
+        ("claim 12 is unpatentable", "12", [12]),
+    ],
+)
+def test_claim_lists(text: str, spec: str, numbers: list) -> None:
+    findings = extract_claims(text)
+    assert findings.unpatentable == [spec]
+    assert findings.claim_numbers() == numbers
+
+
+def test_decision_carries_claim_numbers() -> None:
+    text = "Claims 4-6, 1 are unpatentable.\nClaims 2 and 6 unpatentable.\nAll challenged claims are unpatentable."
+    parsed = decision_from_text(text, keep_text=False)
+    assert parsed.unpatentable_claims == [1, 2, 4, 5, 6]
+    assert parsed.all_challenged is True
+    assert parsed.statute_basis == ["103"]
+
+
+def test_decision_without_claims() -> None:
+    parsed = decision_from_text("Patent Owner's motion to amend is denied.")
+    assert parsed.unpatentable_claims == []
+    assert parsed.all_challenged is False
+
+
+def test_expand_claim_ranges_caps_huge_ranges() -> None:
+    assert expand_claim_ranges("1-100000") == [1, 100000]
+    assert expand_claim_ranges("5-3, 4") == [3, 4, 5]
@@ -0,0 +1,83 @@
+"""Streaming PDF downloads against the local stand-in server."""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+import pytest
+import requests
+from tenacity import stop_after_attempt
+
+from ptab_dataset.benchmark import StandInServer
+from ptab_dataset.config import Settings
+from ptab_dataset.downloader import DecisionDownloader
+from ptab_dataset.ratelimit import RateLimiter
+
+# Larger than download_chunk_size so the body arrives in several chunks.
+PDFS = [bytes(range(256)) * 40, b"%PDF-1.4 second document\n" * 300]
+
+
+@pytest.fixture
+def server():
+    with StandInServer(PDFS, decisions=len(PDFS)) as stand_in:
+        yield stand_in
+
+
+def _downloader(tmp_path: Path, server: StandInServer, **overrides) -> DecisionDownloader:
+    settings = Settings(
+        api_key="test", base_url=server.base_url, raw_dir=str(tmp_path), download_chunk_size=1024, **overrides
+    )
+    return DecisionDownloader(settings, limiter=RateLimiter(settings))
+
+
+def test_download_to_disk_is_content_addressed(tmp_path: Path, server: StandInServer) -> None:
+    downloader = _downloader(tmp_path, server, download_index=False)
+    item = downloader.download_to_disk(f"{server.base_url}/pdf/0")
+
+    digest = hashlib.sha256(PDFS[0]).hexdigest()
+    assert item["sha256"] == digest
+    assert Path(item["path"]) == tmp_path / f"{digest}.pdf"
+    assert Path(item["path"]).read_bytes() == PDFS[0]
+    assert "content" not in item
+
+    # Same bytes under another URL land on the same file; no partial files are left behind.
+    again = downloader.download_to_disk(f"{server.base_url}/pdf/2")
+    assert again["path"] == item["path"]
+    assert list(tmp_path.glob("*.part")) == []
+
+
+def test_streaming_matches_in_memory_download(tmp_path: Path, server: StandInServer) -> None:
+    url = f"{server.base_url}/pdf/1"
+    streamed = _downloader(tmp_path / "stream", server, download_index=False).download_to_disk(url)
+    buffered = _downloader(tmp_path / "memory", server, download_index=False).download_one(url)
+    assert streamed["sha256"] == buffered["sha256"] == hashlib.sha256(PDFS[1]).hexdigest()
+    assert Path(streamed["path"]).read_bytes() == buffered["content"]
+
+
+def test_failed_download_leaves_no_partial_file(tmp_path: Path, server: StandInServer) -> None:
+    downloader = _downloader(tmp_path, server, download_index=False)
+    once = DecisionDownloader.download_to_disk.retry_with(stop=stop_after_attempt(1), reraise=True)
+    with pytest.raises(requests.HTTPError):
+        once(downloader, f"{server.base_url}/missing")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_index_skips_known_urls(tmp_path: Path, server: StandInServer) -> None:
+    urls = [f"{server.base_url}/pdf/{i}" for i in range(2)]
+    first = _downloader(tmp_path, server).batch_download(urls)
+    requests_made = server.requests
+
+    second = _downloader(tmp_path, server).batch_download(urls)
+    assert server.requests == requests_made
+    assert [item["path"] for item in second] == [item["path"] for item in first]
+
+
+@pytest.mark.parametrize("method", ["download_to_disk", "download_one"])
+def test_unsolicited_304_is_an_error(tmp_path: Path, server: StandInServer, not_modified_url: str, method: str) -> None:
+    # Without an index entry there is nothing to fall back on, so a 304 must not become an empty e3b0c442....pdf.
+    downloader = _downloader(tmp_path, server, download_index=False)
+    once = getattr(DecisionDownloader, method).retry_with(stop=stop_after_attempt(1), reraise=True)
+    with pytest.raises(requests.HTTPError):
+        once(downloader, not_modified_url)
+    assert list(tmp_path.iterdir()) == []
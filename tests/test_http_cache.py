@@ -0,0 +1,138 @@
+"""HTTP response cache and offline replay of a cached run."""
+
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from ptab_dataset import pipeline
+from ptab_dataset.benchmark import StandInServer, make_pdf, synthetic_decision_pages
+from ptab_dataset.config import Settings
+from ptab_dataset.http_cache import CacheMiss, ResponseCache, cache_key
+from ptab_dataset.shards import ShardedJsonlReader, iter_shard
+from ptab_dataset.state import PARSED, StateStore
+
+
+def _records(processed: Path, pattern: str) -> list:
+    return [
+        json.loads(line)
+        for path in sorted(processed.glob(pattern))
+        for line in path.read_text(encoding="utf-8").splitlines()
+    ]
+
+
+def test_offline_replay_on_same_data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    pdfs = [make_pdf(synthetic_decision_pages(random.Random(seed), pages=2)) for seed in range(2)]
+    processed = tmp_path / "processed"
+    with StandInServer(pdfs, decisions=4) as server:
+        settings = Settings(
+            api_key="test",
+            base_url=server.base_url,
+            raw_dir=str(tmp_path / "raw"),
+            processed_dir=str(processed),
+            http_cache=True,
+            run_report=False,
+        )
+        monkeypatch.setattr(Settings, "from_env", classmethod(lambda cls, **_: settings))
+        pipeline.run_pipeline(since="2024-01-01", until=None, max_pages=2, rows=2, dry_run=False, override_api_key=None)
+        online = _records(processed, "decisions_page_*.jsonl")
+        requests = server.requests
+
+        # Same raw/processed dirs: the checkpoint already points at page 2 and every document is parsed.
+        pipeline.run_pipeline(
+            since="2024-01-01",
+            until=None,
+            max_pages=2,
+            rows=2,
+            dry_run=False,
+            override_api_key=None,
+            offline=True,
+        )
+        assert server.requests == requests
+
+    assert len(online) == 4
+    assert _records(processed, "decisions_page_*.jsonl") == online
+    state = StateStore(processed / StateStore.FILENAME)
+    try:
+        assert state.counts() == {PARSED: 4}
+        assert state.last_page() == 2
+    finally:
+        state.close()
+
+
+def test_offline_replay_twice_keeps_one_shard_record_per_document(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    pdfs = [make_pdf(synthetic_decision_pages(random.Random(seed), pages=2)) for seed in range(4)]
+    processed = tmp_path / "processed"
+    with StandInServer(pdfs, decisions=4) as server:
+        settings = Settings(
+            api_key="test",
+            base_url=server.base_url,
+            raw_dir=str(tmp_path / "raw"),
+            processed_dir=str(processed),
+            http_cache=True,
+            output_format="shards",
+            shard_compression="gzip",
+            run_report=False,
+        )
+        monkeypatch.setattr(Settings, "from_env", classmethod(lambda cls, **_: settings))
+        kwargs = dict(since="2024-01-01", until=None, max_pages=2, rows=2, dry_run=False, override_api_key=None)
+        pipeline.run_pipeline(**kwargs)
+        index = processed / "decisions_shards" / "decisions.index.jsonl"
+        online = index.read_text(encoding="utf-8")
+
+        for _ in range(2):
+            pipeline.run_pipeline(**kwargs, offline=True)
+
+    reader = ShardedJsonlReader(processed / "decisions_shards")
+    assert len(reader) == 4
+    assert sum(1 for shard in reader.shards() for _ in iter_shard(shard)) == 4
+    assert index.read_text(encoding="utf-8") == online
+
+
+def test_cache_key_ignores_filter_field_order_and_spacing() -> None:
+    filters = [
+        {"fieldName": "trialStatus", "fieldValue": "Terminated"},
+        {"fieldName": "decisionDate", "fieldValue": "[2024-01-01 TO *]"},
+    ]
+    reordered = [{"fieldValue": f["fieldValue"], "fieldName": f["fieldName"]} for f in filters]
+    url = "https://data.uspto.gov/apis/ptab-trials/search-decisions"
+    a = cache_key("GET", url, {"filters": json.dumps(filters), "page": 1, "rows": 100})
+    b = cache_key("get", url, {"rows": "100", "page": 1, "filters": json.dumps(reordered, indent=2)})
+    assert a == b
+    assert a != cache_key("GET", url, {"filters": json.dumps(filters), "page": 2, "rows": 100})
+    assert a != cache_key("GET", url, {"filters": json.dumps(filters[:1]), "page": 1, "rows": 100})
+
+
+def test_cache_round_trip_and_replay_miss(tmp_path: Path) -> None:
+    cache = ResponseCache(str(tmp_path), ttl=0, max_bytes=1 << 20)
+    cache.put("GET", "https://x/search", {"page": 1}, {"results": [1]})
+    assert cache.get("GET", "https://x/search", {"page": 1}) == (True, {"results": [1]})
+    assert cache.get("GET", "https://x/search", {"page": 2}) == (False, None)
+
+    replay = ResponseCache(str(tmp_path), ttl=1, max_bytes=1 << 20, replay_only=True)
+    assert replay.get("GET", "https://x/search", {"page": 1}) == (True, {"results": [1]})
+    with pytest.raises(CacheMiss):
+        replay.get("GET", "https://x/search", {"page": 2})
+
+
+def test_lru_eviction_keeps_size_under_limit(tmp_path: Path) -> None:
+    max_bytes = 8 * 1024
+    cache = ResponseCache(str(tmp_path), ttl=0, max_bytes=max_bytes)
+    rng = random.Random(0)
+    for page in range(40):
+        # Incompressible bodies so each entry is roughly 1 KiB on disk.
+        body = {"blob": "".join(rng.choice("0123456789abcdef") for _ in range(1500))}
+        cache.put("GET", "https://x/search", {"page": page}, body)
+        # Touch page 0 so it stays the most recently used entry.
+        cache.get("GET", "https://x/search", {"page": 0})
+        on_disk = sum(p.stat().st_size for p in tmp_path.glob("*/*.json.gz"))
+        assert on_disk <= max_bytes
+
+    assert cache.get("GET", "https://x/search", {"page": 0})[0]
+    assert cache.get("GET", "https://x/search", {"page": 39})[0]
+    assert not cache.get("GET", "https://x/search", {"page": 1})[0]
@@ -0,0 +1,21 @@
+"""Import-time guards for the lightweight entry points (see benchmark.IMPORT_CHECKS / IMPORT_BUDGETS).
+
+The budgets themselves are wall-clock limits and are enforced by `scripts/run_benchmarks.py --check`, not here.
+"""
+
+from __future__ import annotations
+
+from ptab_dataset.benchmark import IMPORT_BUDGETS, check_import_budgets, check_imports
+
+
+def test_budgets_cover_entry_points() -> None:
+    assert {"ptab_dataset.config", "ptab_dataset.chunking", "ptab_dataset.parser"} <= set(IMPORT_BUDGETS)
+
+
+def test_no_heavy_dependencies_at_import() -> None:
+    assert check_imports() == []
+
+
+def test_budget_violation_is_reported() -> None:
+    (violation,) = check_import_budgets({"ptab_dataset.parser": 1e-9}, repeat=1)
+    assert violation.startswith("ptab_dataset.parser: ")
@@ -0,0 +1,97 @@
+"""ParseCache: stale rows are dropped on open, and cached text is reused when only the rules changed."""
+
+from __future__ import annotations
+
+import random
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from ptab_dataset import parse_cache
+from ptab_dataset.benchmark import make_pdf, synthetic_decision_pages
+from ptab_dataset.parse_cache import ParseCache, cached_parse_decisions
+from ptab_dataset.parser import decision_from_text, parse_decisions
+
+TEXT = "Claims 1-3 and 5 are unpatentable under 35 U.S.C. § 103 over Smith, U.S. Patent No. 7,123,456 (Ex. 1003)."
+
+
+def _rows(path: Path, table: str) -> list:
+    conn = sqlite3.connect(str(path))
+    try:
+        return conn.execute(f"SELECT * FROM {table}").fetchall()
+    finally:
+        conn.close()
+
+
+def test_stale_ruleset_rows_are_dropped(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / ParseCache.FILENAME
+    current = parse_cache.ruleset_hash()
+    monkeypatch.setattr(parse_cache, "ruleset_hash", lambda: "old-rules")
+    cache = ParseCache(path)
+    cache.put("a" * 64, "full", TEXT, decision_from_text(TEXT))
+    cache.close()
+    assert [row[2] for row in _rows(path, "results")] == ["old-rules"]
+
+    monkeypatch.setattr(parse_cache, "ruleset_hash", lambda: current)
+    cache = ParseCache(path)
+    assert _rows(path, "results") == []
+    assert len(_rows(path, "texts")) == 1
+
+    # The result is recomputed from the cached text (no PDF needed) and stored under the new rules.
+    parsed = cache.get("a" * 64, "full")
+    assert (cache.hits, cache.text_hits, cache.misses) == (0, 1, 0)
+    assert parsed == decision_from_text(TEXT)
+    assert [row[2] for row in _rows(path, "results")] == [current]
+    assert cache.get("a" * 64, "full") == parsed
+    assert cache.hits == 1
+    cache.close()
+
+
+def test_stale_extractor_texts_are_dropped(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / ParseCache.FILENAME
+    cache = ParseCache(path)
+    cache.put("b" * 64, "head3-tail2", TEXT, decision_from_text(TEXT, keep_text=False))
+    cache.close()
+
+    monkeypatch.setattr(parse_cache, "EXTRACTOR_VERSION", parse_cache.EXTRACTOR_VERSION + 1)
+    cache = ParseCache(path)
+    assert _rows(path, "texts") == []
+    # Results keyed by the same rules survive; metadata-mode hits do not need the text.
+    assert cache.get("b" * 64, "head3-tail2") == decision_from_text(TEXT, keep_text=False)
+    assert cache.get("b" * 64, "full") is None
+    cache.close()
+
+
+def test_legacy_results_table_is_rebuilt(tmp_path: Path) -> None:
+    path = tmp_path / ParseCache.FILENAME
+    conn = sqlite3.connect(str(path))
+    conn.execute(
+        "CREATE TABLE results (sha256 TEXT, source TEXT, ruleset TEXT, statute_basis TEXT, token_count INTEGER)"
+    )
+    conn.commit()
+    conn.close()
+
+    cache = ParseCache(path)
+    cache.put("c" * 64, "full", TEXT, decision_from_text(TEXT))
+    assert cache.get("c" * 64, "full").unpatentable_claims == [1, 2, 3, 5]
+    cache.close()
+
+
+def test_cached_parse_matches_uncached(tmp_path: Path) -> None:
+    rng = random.Random(20)
+    paths = []
+    for i in range(3):
+        paths.append(tmp_path / f"d{i}.pdf")
+        paths[-1].write_bytes(make_pdf(synthetic_decision_pages(rng, pages=2)))
+    digests = [f"{i:064x}" for i in range(3)]
+    expected = [(p.text, p.statute_basis, p.citations) for p in parse_decisions(paths)]
+
+    cache = ParseCache(tmp_path / ParseCache.FILENAME)
+    try:
+        for _ in range(2):
+            got = [(p.text, p.statute_basis, p.citations) for p in cached_parse_decisions(paths, digests, cache)]
+            assert got == expected
+        assert (cache.misses, cache.hits) == (3, 3)
+    finally:
+        cache.close()
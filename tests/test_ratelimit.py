@@ -0,0 +1,17 @@
+"""shared_rate_limiter: one limiter per distinct rate-limit configuration."""
+
+from __future__ import annotations
+
+from ptab_dataset.config import Settings
+from ptab_dataset.ratelimit import shared_rate_limiter
+
+
+def test_shared_limiter_is_keyed_by_rate_settings() -> None:
+    slow = Settings(api_key="test", rate_limits={"example.invalid": 0.5}, max_concurrency_per_host=2)
+    same = Settings(api_key="other", rate_limits={"example.invalid": 0.5}, max_concurrency_per_host=2)
+    fast = Settings(api_key="test", rate_limits={"example.invalid": 50.0}, max_concurrency_per_host=8)
+
+    assert shared_rate_limiter(slow) is shared_rate_limiter(same)
+    assert shared_rate_limiter(fast) is not shared_rate_limiter(slow)
+    host = shared_rate_limiter(fast).for_url("https://example.invalid/x")
+    assert (host.rate, host.max_concurrency) == (50.0, 8)
@@ -0,0 +1,72 @@
+"""Sharded JSONL writer/reader: index lookups, shard rollover, resume after an interrupted write."""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from ptab_dataset.shards import ShardedJsonlReader, ShardedJsonlWriter, iter_shard
+
+
+def _record(i: int) -> dict:
+    # Hex digests compress poorly, so the shard size limit is actually reached.
+    text = " ".join(hashlib.sha256(f"{i}-{n}".encode()).hexdigest() for n in range(8 + i % 5))
+    return {"url": f"https://example.invalid/{i}", "sha256": f"{i:064x}", "text": text}
+
+
+@pytest.mark.parametrize("compression", ["zstd", "gzip", "none"])
+def test_index_lookup_returns_matching_record(tmp_path: Path, compression: str) -> None:
+    records = [_record(i) for i in range(60)]
+    # Small blocks and shards so the index spans several blocks and shards.
+    with ShardedJsonlWriter(tmp_path, compression=compression, block_bytes=2048, max_shard_bytes=8192) as writer:
+        writer.write_many(records)
+
+    reader = ShardedJsonlReader(tmp_path)
+    assert len(reader) == len(records)
+    assert len(reader.shards()) > 1
+    for rec in records:
+        assert reader.get(sha256=rec["sha256"]) == rec
+        assert reader.get(url=rec["url"]) == rec
+    assert reader.get(sha256="missing") is None
+    assert [rec for shard in reader.shards() for rec in iter_shard(shard)] == records
+
+
+def test_later_write_wins_and_reopen_appends(tmp_path: Path) -> None:
+    with ShardedJsonlWriter(tmp_path, compression="gzip") as writer:
+        writer.write_many([_record(1), _record(2)])
+    updated = dict(_record(1), text="revised")
+    with ShardedJsonlWriter(tmp_path, compression="gzip") as writer:
+        writer.write(updated)
+
+    reader = ShardedJsonlReader(tmp_path)
+    assert reader.get(sha256=updated["sha256"]) == updated
+    assert reader.get(sha256=_record(2)["sha256"]) == _record(2)
+    assert len(reader.shards()) == 1
+
+
+def test_unindexed_tail_is_truncated_on_reopen(tmp_path: Path) -> None:
+    with ShardedJsonlWriter(tmp_path, compression="none") as writer:
+        writer.write(_record(1))
+    (shard,) = ShardedJsonlReader(tmp_path).shards()
+    # A crash after writing shard bytes but before the index line leaves garbage at the end.
+    with shard.open("ab") as f:
+        f.write(b'{"url": "partial')
+    with ShardedJsonlWriter(tmp_path, compression="none") as writer:
+        writer.write(_record(2))
+
+    reader = ShardedJsonlReader(tmp_path)
+    assert list(iter_shard(shard)) == [_record(1), _record(2)]
+    assert reader.get(url=_record(2)["url"]) == _record(2)
+
+
+def test_has_sees_indexed_and_pending_records(tmp_path: Path) -> None:
+    with ShardedJsonlWriter(tmp_path, compression="gzip") as writer:
+        writer.write(_record(1))
+    with ShardedJsonlWriter(tmp_path, compression="gzip") as writer:
+        assert writer.has(sha256=_record(1)["sha256"])
+        assert not writer.has(sha256=_record(2)["sha256"])
+        writer.write(_record(2))
+        assert writer.has(url=_record(2)["url"])
+        assert not writer.has(sha256=None)
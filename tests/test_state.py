@@ -0,0 +1,124 @@
+"""StateStore transitions and attempt counts, and document-level resume in the pipeline."""
+
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from ptab_dataset import pipeline
+from ptab_dataset.benchmark import StandInServer, make_pdf, synthetic_decision_pages
+from ptab_dataset.config import Settings
+from ptab_dataset.state import DISCOVERED, DOWNLOADED, FAILED, PARSED, StateStore
+
+
+@pytest.fixture
+def state(tmp_path: Path):
+    store = StateStore(tmp_path / StateStore.FILENAME)
+    yield store
+    store.close()
+
+
+def test_document_lifecycle(state: StateStore, tmp_path: Path) -> None:
+    state.discover(1, ["a", "b"])
+    assert state.get("a")["state"] == DISCOVERED
+    assert state.get("a")["page"] == 1
+
+    state.mark_downloaded("a", "sha-a", tmp_path / "a.pdf")
+    row = state.get("a")
+    assert (row["state"], row["sha256"], row["path"]) == (DOWNLOADED, "sha-a", str(tmp_path / "a.pdf"))
+
+    # Rediscovering a known URL leaves its state alone.
+    state.discover(3, ["a"])
+    assert state.get("a")["state"] == DOWNLOADED
+    assert state.get("a")["page"] == 1
+
+    state.page_done(1, ["a"])
+    assert state.get("a")["state"] == PARSED
+    assert state.last_page() == 1
+    assert state.parsed_among(["a", "b", "missing"]) == {"a"}
+    assert state.counts() == {PARSED: 1, DISCOVERED: 1}
+
+
+def test_failures_count_attempts(state: StateStore) -> None:
+    state.discover(1, ["a", "b"])
+    state.mark_failed("a", "download", "timeout")
+    state.mark_failed("a", "download", "HTTP 503")
+    state.mark_failed("b", "parse", "bad xref")
+    state.mark_failed("c", "download", "unknown url")
+
+    row = state.get("a")
+    assert (row["state"], row["attempts"]) == (FAILED, 2)
+    assert (row["failed_stage"], row["last_error"]) == ("download", "HTTP 503")
+    assert [item["url"] for item in state.failures()] == ["a", "b", "c"]
+    assert [item["url"] for item in state.failures(max_attempts=2)] == ["b", "c"]
+
+    # A later success clears the error but keeps the attempt count.
+    state.mark_parsed(["b"])
+    row = state.get("b")
+    assert (row["state"], row["attempts"], row["last_error"]) == (PARSED, 1, None)
+
+
+def test_unfinished_lists_discovered_and_downloaded(state: StateStore, tmp_path: Path) -> None:
+    state.discover(2, ["p2"])
+    state.discover(1, ["p1", "done", "bad"])
+    state.mark_downloaded("p1", "sha-p1", tmp_path / "p1.pdf")
+    state.page_done(1, ["done"])
+    state.mark_failed("bad", "parse", "boom")
+    assert [row["url"] for row in state.unfinished()] == ["p1", "p2"]
+
+
+def test_imports_legacy_checkpoint(tmp_path: Path) -> None:
+    (tmp_path / "checkpoint.json").write_text(json.dumps({"last_page": 7}), encoding="utf-8")
+    store = StateStore(tmp_path / StateStore.FILENAME)
+    try:
+        assert store.last_page() == 7
+    finally:
+        store.close()
+
+
+def test_pending_splits_by_state(state: StateStore, tmp_path: Path) -> None:
+    pdf = tmp_path / "kept.pdf"
+    pdf.write_bytes(b"%PDF-")
+    state.discover(1, ["new", "kept", "lost", "done"])
+    state.mark_downloaded("kept", "sha-kept", pdf)
+    state.mark_downloaded("lost", "sha-lost", tmp_path / "deleted.pdf")
+    state.page_done(1, ["done"])
+
+    to_download, ready = pipeline._pending(state, ["new", "kept", "lost", "done", "unknown"])
+    assert to_download == ["new", "lost", "unknown"]
+    assert ready == [("kept", "sha-kept", pdf)]
+
+
+def test_run_resumes_unfinished_documents(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    pdf = make_pdf(synthetic_decision_pages(random.Random(0), pages=2))
+    with StandInServer([pdf], decisions=4) as server:
+        settings = Settings(
+            api_key="test",
+            base_url=server.base_url,
+            raw_dir=str(tmp_path / "raw"),
+            processed_dir=str(tmp_path / "processed"),
+            run_report=False,
+        )
+        monkeypatch.setattr(Settings, "from_env", classmethod(lambda cls, **_: settings))
+
+        # A previous run discovered page 1, downloaded nothing and crashed after moving the page hint past the end.
+        urls = [f"{server.base_url}/pdf/{i}" for i in range(2)]
+        state = StateStore(tmp_path / "processed" / StateStore.FILENAME)
+        state.discover(1, urls)
+        state.set_last_page(9)
+        state.close()
+
+        pipeline.run_pipeline(since="2024-01-01", until=None, max_pages=1, rows=2, dry_run=False, override_api_key=None)
+
+        state = StateStore(tmp_path / "processed" / StateStore.FILENAME)
+        try:
+            assert state.counts() == {PARSED: 2}
+            assert state.last_page() == 9
+        finally:
+            state.close()
+    (out,) = (tmp_path / "processed").glob("decisions_resume_*.jsonl")
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert sorted(rec["url"] for rec in records) == urls
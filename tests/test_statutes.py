@@ -0,0 +1,30 @@
+"""Statute detection: golden cases (including justified-text spacing) and page-streamed scanning.
+
+golden/detect_statutes.json holds `{name, text, expected}` cases for `detect_statutes`.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from ptab_dataset.parser import SCANNER, detect_statutes
+
+GOLDEN = json.loads((Path(__file__).parent / "golden" / "detect_statutes.json").read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("case", GOLDEN, ids=lambda case: case["name"])
+def test_detect_statutes_matches_golden(case: dict) -> None:
+    assert detect_statutes(case["text"]) == case["expected"]
+
+
+@pytest.mark.parametrize("split", [3, 12, 30])
+def test_wide_spacing_across_page_boundary(split: int) -> None:
+    # Page breaks land inside the run of spaces; streaming must find the same hits as one scan.
+    text = "x" * 900 + " under 35 U.S.C." + " " * 38 + "§ 103 over Smith."
+    cut = text.index("U.S.C.") + 6 + split
+    pages = [text[:cut], text[cut:]]
+    assert SCANNER.scan_pages(pages).hits == SCANNER.scan("\n".join(pages)).hits
+    assert [hit.label for hit in SCANNER.scan_pages(pages).hits if hit.kind == "statute"] == ["103"]
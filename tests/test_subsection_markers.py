@@ -0,0 +1,37 @@
+"""Golden-file test for `add_subsection_markers`.
+
+Each `<name>.<lang>.in.txt` under golden/subsection_markers is a DESCRIPTION
+input; the matching `.out.txt` was produced by the original implementation
+(eleven sequential `re.sub(..., count=1)` passes, see `git show
+0d89fce:src/ptab_dataset/chunking.py`). The single-scan injector must
+reproduce it byte for byte, quirks included.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from ptab_dataset.chunking import add_subsection_markers
+
+GOLDEN_DIR = Path(__file__).parent / "golden" / "subsection_markers"
+CASES = sorted(GOLDEN_DIR.glob("*.in.txt"))
+
+
+def _read(path: Path) -> str:
+    # newline="" keeps CRLF inputs intact.
+    with path.open(encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+def test_golden_cases_present() -> None:
+    langs = {path.name.split(".")[-3] for path in CASES}
+    assert {"en", "ja", "zh", "ko"} <= langs
+
+
+@pytest.mark.parametrize("path", CASES, ids=lambda p: p.name[: -len(".in.txt")])
+def test_matches_golden_output(path: Path) -> None:
+    lang = path.name.split(".")[-3]
+    expected = _read(path.with_name(path.name.replace(".in.txt", ".out.txt")))
+    assert add_subsection_markers(_read(path), lang) == expected
@@ -0,0 +1,87 @@
+"""Token-budget chunking: budgets hold, overlaps are exact and every token is covered."""
+
+from __future__ import annotations
+
+import random
+import re
+
+import pytest
+
+from ptab_dataset.benchmark import synthetic_patent_txt
+from ptab_dataset.chunking import chunk_token_spans, parse_repo_txt
+from ptab_dataset.tokenization import SimpleTokenizer, load_tokenizer
+
+TOKENIZER = SimpleTokenizer()
+
+
+def _text(lang: str, seed: int = 13) -> str:
+    # DESCRIPTION paragraphs run from a few dozen tokens to several times the smallest budget.
+    _, sections = parse_repo_txt(synthetic_patent_txt(random.Random(seed), lang, 0, paragraphs=20))
+    return sections["DESCRIPTION"]
+
+
+def _count(text: str) -> int:
+    return len(TOKENIZER.token_spans(text))
+
+
+@pytest.mark.parametrize("lang", ["en", "ja", "zh", "ko"])
+@pytest.mark.parametrize("max_tokens, overlap_tokens", [(64, 0), (128, 16), (200, 64)])
+def test_chunks_fit_budget_and_overlap_exactly(lang: str, max_tokens: int, overlap_tokens: int) -> None:
+    base, spans = chunk_token_spans(_text(lang), TOKENIZER, max_tokens=max_tokens, overlap_tokens=overlap_tokens)
+    assert len(spans) > 2
+    assert all(_count(base[start:end]) <= max_tokens for start, end in spans)
+
+    # Each chunk repeats the last `overlap_tokens` of the tokens the previous chunk added itself (all of them if it
+    # added fewer, none if it added none).
+    own = _count(base[slice(*spans[0])])
+    for (_, prev_end), (start, end) in zip(spans, spans[1:]):
+        shared = _count(base[start:prev_end]) if start < prev_end else 0
+        assert shared == min(overlap_tokens, own)
+        own = _count(base[start:end]) - shared
+
+    covered = [False] * len(base)
+    for start, end in spans:
+        covered[start:end] = [True] * (end - start)
+    assert all(covered[s] for s, _ in TOKENIZER.token_spans(base))
+
+
+class WordTokenizer:
+    """Words only: punctuation-only paragraphs have no tokens."""
+
+    name = "words"
+
+    def token_spans(self, text: str) -> list:
+        return [m.span() for m in re.finditer(r"\w+", text)]
+
+
+def test_overlap_from_chunk_without_tokens_is_skipped() -> None:
+    text = "* * *\n\n" + " ".join(f"w{i}" for i in range(20))
+    base, spans = chunk_token_spans(text, WordTokenizer(), max_tokens=10, overlap_tokens=4)
+    assert base[slice(*spans[0])] == "* * *"
+    # The first window of the long paragraph starts on its own first word, not back in the separator chunk.
+    assert base[slice(*spans[1])].split() == [f"w{i}" for i in range(6)]
+
+
+def test_short_previous_chunk_is_repeated_from_its_first_token() -> None:
+    text = "-- alpha beta\n\n" + " ".join(f"w{i}" for i in range(20))
+    base, spans = chunk_token_spans(text, WordTokenizer(), max_tokens=10, overlap_tokens=4)
+    assert base[slice(*spans[0])] == "-- alpha beta"
+    # Only the two words the previous chunk contributed are repeated; its untokenized "--" prefix is not.
+    assert base[slice(*spans[1])].split() == ["alpha", "beta"] + [f"w{i}" for i in range(6)]
+
+
+def test_chunk_boundaries_fall_on_token_edges() -> None:
+    base, spans = chunk_token_spans(_text("en"), TOKENIZER, max_tokens=50, overlap_tokens=10)
+    starts = {s for s, _ in TOKENIZER.token_spans(base)}
+    ends = {e for _, e in TOKENIZER.token_spans(base)}
+    assert all(start in starts and end in ends for start, end in spans)
+
+
+def test_invalid_overlap_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        chunk_token_spans("text", TOKENIZER, max_tokens=16, overlap_tokens=16)
+
+
+def test_simple_tokenizer_splits_cjk_per_character() -> None:
+    assert TOKENIZER.tokens("基板 electrode-layer 전극。") == ["基", "板", "electrode", "-", "layer", "전", "극", "。"]
+    assert load_tokenizer("simple").name == "simple"